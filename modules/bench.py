@@ -0,0 +1,259 @@
+import difflib
+import shutil
+import time
+from pathlib import Path
+
+try:
+    from .common import StageEnvironment, build_cli_parser
+    from .denoise import DENOISERS, OnnxDenoiserBackend
+    from .pcm_cache import load_audio
+    from .transcribe import (
+        BACKENDS,
+        COMPUTE_TYPES,
+        WHISPER_MODELS,
+        TranscribeOptions,
+        load_transcriber,
+        transcribe_audio,
+    )
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import StageEnvironment, build_cli_parser
+    from denoise import DENOISERS, OnnxDenoiserBackend
+    from pcm_cache import load_audio
+    from transcribe import (
+        BACKENDS,
+        COMPUTE_TYPES,
+        WHISPER_MODELS,
+        TranscribeOptions,
+        load_transcriber,
+        transcribe_audio,
+    )
+
+
+def _snr_db(reference, candidate) -> float:
+    """Signal-to-noise ratio of `candidate` measured against `reference`, in dB."""
+    import numpy as np
+
+    length = min(reference.shape[-1], candidate.shape[-1])
+    reference = reference[:length].astype(np.float64)
+    error = reference - candidate[:length].astype(np.float64)
+    noise_energy = float(np.sum(error * error))
+    if noise_energy == 0.0:
+        return float("inf")
+    return 10.0 * np.log10(float(np.sum(reference * reference)) / noise_energy)
+
+
+def _word_agreement(reference, candidate) -> float:
+    """Share of matching words between two transcripts (case and punctuation insensitive)."""
+
+    def _normalise(segments):
+        return ["".join(ch for ch in word["word"].lower() if ch.isalnum()) for segment in segments for word in segment["words"]]
+
+    return difflib.SequenceMatcher(a=_normalise(reference), b=_normalise(candidate), autojunk=False).ratio()
+
+
+def _read_audio(input_file: Path, sample_rate: int, env: StageEnvironment):
+    """Mono samples at `sample_rate` from the shared PCM cache."""
+    try:
+        audio, _ = load_audio(input_file, sample_rate, 1)
+    except RuntimeError as e:
+        env.abort(str(e))
+    return audio
+
+
+def _benchmark_transcribers(parsed, env: StageEnvironment, input_file: Path) -> None:
+    backends = parsed.backends or list(BACKENDS)
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        env.abort(f"Unknown backend(s): {', '.join(unknown)}. Choose from: {', '.join(BACKENDS)}")
+    # The PyTorch model is the reference the other backends are scored against.
+    if "openai-whisper" not in backends:
+        backends.insert(0, "openai-whisper")
+
+    audio = _read_audio(input_file, 16000, env)
+    if parsed.seconds > 0:
+        audio = audio[: int(parsed.seconds * 16000)]
+    duration = audio.shape[-1] / 16000
+
+    outputs = {}
+    rows = []
+    for backend in backends:
+        options = TranscribeOptions(
+            model=parsed.whisper_model,
+            backend=backend,
+            compute_type=parsed.compute_type,
+            batch_size=parsed.batch_size if backend == "faster-whisper" else 1,
+        )
+        print(f"⏱️  post -bench: {options.label} on {duration:.1f}s of audio...")
+        start_time = time.time()
+        try:
+            model = load_transcriber(options)
+        except ImportError as e:
+            print(f"⏭  post -bench: skipping '{backend}' ({e}).")
+            continue
+        load_seconds = time.time() - start_time
+
+        start_time = time.time()
+        for _ in range(parsed.repeat):
+            segments = transcribe_audio(model, audio, options)
+        process_seconds = (time.time() - start_time) / parsed.repeat
+        outputs[backend] = segments
+
+        agreement = None
+        if backend != "openai-whisper" and "openai-whisper" in outputs:
+            agreement = _word_agreement(outputs["openai-whisper"], segments)
+        rows.append((options.label, load_seconds, process_seconds, process_seconds / duration, agreement))
+
+    if not rows:
+        env.abort("No transcription backend could be benchmarked. Install stable-ts / faster-whisper first.")
+
+    print()
+    print(f"{'backend':<44} {'load':>8} {'process':>9} {'RTF':>7} {'words vs torch':>15}")
+    for label, load_seconds, process_seconds, rtf, agreement in rows:
+        agreement_text = "—" if agreement is None else f"{agreement:.1%}"
+        print(f"{label:<44} {load_seconds:>7.2f}s {process_seconds:>8.2f}s {rtf:>7.3f} {agreement_text:>15}")
+
+    fastest = min(rows, key=lambda row: row[3])
+    print(f"\n🏁 post -bench: fastest transcription backend is {fastest[0]} (RTF {fastest[3]:.3f}).")
+
+
+def _benchmark_denoisers(parsed, env: StageEnvironment, input_file: Path) -> None:
+    models = parsed.models or list(DENOISERS.keys())
+    unknown = [name for name in models if name not in DENOISERS]
+    if unknown:
+        env.abort(f"Unknown denoiser(s): {', '.join(unknown)}. Choose from: {', '.join(DENOISERS)}")
+
+    # PyTorch references are always needed to score the ONNX outputs.
+    for name in list(models):
+        backend = DENOISERS[name]
+        if isinstance(backend, OnnxDenoiserBackend) and backend.reference_model not in models:
+            models.insert(models.index(name), backend.reference_model)
+
+    outputs = {}
+    rows = []
+    extracted = {}
+    for name in models:
+        backend = DENOISERS[name]
+        try:
+            backend.check_dependencies(env)
+        except SystemExit:
+            print(f"⏭  post -bench: skipping '{name}' (dependencies missing).")
+            continue
+
+        rate = backend.required_sample_rate
+        if rate not in extracted:
+            audio = _read_audio(input_file, rate, env)
+            if parsed.seconds > 0:
+                audio = audio[: int(parsed.seconds * rate)]
+            extracted[rate] = audio
+        audio = extracted[rate]
+        duration = audio.shape[-1] / rate
+
+        backend.configure(
+            quantize=parsed.quantize,
+            intra_op_threads=parsed.intra_op_threads,
+            inter_op_threads=parsed.inter_op_threads,
+        )
+        print(f"⏱️  post -bench: {backend.name} on {duration:.1f}s of audio...")
+        load_seconds = backend.load()
+        # Warm up on a short slice so one-off graph optimisation does not skew the timing.
+        backend.enhance(audio[: min(audio.shape[-1], rate)])
+        start_time = time.time()
+        for _ in range(parsed.repeat):
+            enhanced = backend.enhance(audio)
+        process_seconds = (time.time() - start_time) / parsed.repeat
+        outputs[name] = enhanced
+
+        snr = None
+        if isinstance(backend, OnnxDenoiserBackend) and backend.reference_model in outputs:
+            snr = _snr_db(outputs[backend.reference_model], enhanced)
+        rows.append((name, load_seconds, process_seconds, process_seconds / duration, snr))
+
+    if not rows:
+        env.abort("No denoiser could be benchmarked. Install the model dependencies first.")
+
+    print()
+    print(f"{'model':<18} {'load':>8} {'process':>9} {'RTF':>7} {'SNR vs torch':>13}")
+    for name, load_seconds, process_seconds, rtf, snr in rows:
+        snr_text = "—" if snr is None else ("identical" if snr == float("inf") else f"{snr:.1f} dB")
+        print(f"{name:<18} {load_seconds:>7.2f}s {process_seconds:>8.2f}s {rtf:>7.3f} {snr_text:>13}")
+
+    fastest = min(rows, key=lambda row: row[3])
+    print(f"\n🏁 post -bench: fastest denoiser is '{fastest[0]}' (RTF {fastest[3]:.3f}).")
+
+
+def run(args):
+    """
+    Benchmark the denoiser (or, with --transcribe, transcription) backends on a real recording.
+
+    Each selected model denoises the same extracted audio. The report lists model load
+    time, processing time, real-time factor (processing time / audio duration, lower is
+    faster) and, for ONNX variants, the SNR of their output against the PyTorch model
+    they were exported from.
+
+    With --transcribe, each Whisper backend transcribes the same 16 kHz audio and the
+    report shows word agreement with the PyTorch (openai-whisper) transcript instead.
+
+    Dependencies:
+        - ffmpeg for audio extraction
+        - The dependencies of every benchmarked model (missing ones are skipped)
+
+    Usage:
+        post -bench video-rough.mp4
+        post -bench video-rough.mp4 --models deepfilter deepfilter-onnx --quantize --seconds 60
+        post -bench video-rough.mp4 --transcribe --whisper-model small --compute-type int8 --batch-size 8
+    """
+    parser = build_cli_parser(
+        stage="bench",
+        summary="Compare real-time factor and output quality of the denoiser or transcription backends.",
+    )
+    parser.add_argument("file", help="Video or audio file to benchmark on.")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=None,
+        help=f"Denoisers to compare; all of {', '.join(DENOISERS)} when omitted.",
+    )
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=0.0,
+        help="Only benchmark the first N seconds of audio (0 = whole file).",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per model.")
+    parser.add_argument("--quantize", action="store_true", help="Quantize the ONNX models to int8.")
+    parser.add_argument("--intra-op-threads", type=int, default=0, help="Intra-op threads (0 = default).")
+    parser.add_argument("--inter-op-threads", type=int, default=0, help="Inter-op threads (0 = default).")
+    parser.add_argument(
+        "--transcribe",
+        action="store_true",
+        help="Benchmark the transcription backends instead of the denoisers.",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=None,
+        help=f"Transcription backends to compare; all of {', '.join(BACKENDS)} when omitted.",
+    )
+    parser.add_argument("--whisper-model", default="medium", choices=WHISPER_MODELS, help="Whisper model size.")
+    parser.add_argument("--compute-type", default="int8", choices=COMPUTE_TYPES, help="faster-whisper compute type.")
+    parser.add_argument("--batch-size", type=int, default=1, help="faster-whisper batched decoding size.")
+    parsed = parser.parse_args(args)
+
+    env = StageEnvironment.create(stage="bench", directory=parsed.dir, auto_confirm=parsed.yes)
+    if parsed.repeat < 1:
+        env.abort("--repeat must be at least 1.")
+    if parsed.batch_size < 1:
+        env.abort("--batch-size must be at least 1.")
+    if shutil.which("ffmpeg") is None:
+        env.abort("Required dependency 'ffmpeg' was not found on PATH. Install FFmpeg and try again.")
+
+    input_file = Path(parsed.file).expanduser()
+    if not input_file.is_absolute():
+        input_file = env.directory / input_file
+    if not input_file.is_file():
+        env.abort(f"Input file '{input_file}' does not exist.")
+
+    if parsed.transcribe:
+        _benchmark_transcribers(parsed, env, input_file)
+    else:
+        _benchmark_denoisers(parsed, env, input_file)
@@ -0,0 +1,543 @@
+"""
+Remotion invocations for `post -captions`.
+
+Captions cover only part of a video's running time, so by default only the frames in
+which a caption line is visible are rendered, and each of those only once:
+`frame_segments` mirrors the timing of CaptionScene/Word to find stretches where nothing
+moves (lines without karaoke, the time before and after a karaoke sweep, short pauses).
+`SparseCaptionComposition` renders the listed frames back to back, and
+`assemble_caption_track` puts them back on the full timeline with ffmpeg's concat
+demuxer, holding one frame for each static stretch (`duration` entries) and one
+transparent frame for each gap. Every ProRes frame is a keyframe, so cutting and
+joining is lossless (`-c copy`); the result is a variable-frame-rate .mov. The active
+ranges are also written next to the caption file (`<captions>.ranges.json`) together
+with an `overlay=enable=...` expression for compositing with ffmpeg.
+
+Caption lines only ever occupy a strip of the frame, so with a `caption_band` the
+compositions are rendered at that strip's height (`bandTop`/`bandHeight` props) and the
+sidecar records the y offset at which the strip goes back onto the video.
+
+No caption group crosses a grouping window, so each window's ranges only depend on
+that window's groups: `SegmentedCaptionRender` renders a window as soon as it is
+grouped, while later windows are still being generated.
+"""
+
+import json
+import math
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+REMOTION_DIR = Path(__file__).parent.parent / "remotion"
+CAPTION_COMPOSITION = "CaptionComposition"
+SPARSE_CAPTION_COMPOSITION = "SparseCaptionComposition"
+RANGES_SUFFIX = ".ranges.json"
+# Gaps between caption lines up to this many frames are rendered rather than cut out.
+SPARSE_MERGE_GAP_FRAMES = 6
+# Static stretches shorter than this are rendered frame by frame rather than held.
+HOLD_MIN_FRAMES = 3
+# Karaoke timing of CaptionScene.tsx / Word.tsx, mirrored by `frame_segments`.
+KARAOKE_MIN_LINE_SECONDS = 0.5
+KARAOKE_LIGHT_WIDTH = 0.7
+KARAOKE_UNREACHED_OPACITY = 0.35
+# Frames whose word opacities agree to this many decimals are identical in 10-bit alpha.
+OPACITY_DECIMALS = 4
+# CaptionScene puts the top of each line box this far up from the bottom of the video...
+CAPTION_MARGIN_RATIO = 0.27
+# ...and the box is 100px text (Inter, normal line height) + 2 x 40px padding + border: ~205px.
+CAPTION_BAND_HEIGHT = 224
+# ProRes 4444 keeps the alpha channel.
+PRORES_ALPHA_ARGS = ['--codec', 'prores', '--prores-profile', '4444', '--pixel-format', 'yuva444p10le']
+
+
+def caption_band(video_info: dict) -> Tuple[int, int]:
+    """`(top, height)` of the rows of the video that caption lines can cover (see CaptionScene)."""
+    video_height = video_info['height']
+    top = video_height - math.floor(video_height * CAPTION_MARGIN_RATIO)
+    height = min(CAPTION_BAND_HEIGHT, video_height - top)
+    return top, height - height % 2  # ProRes wants even dimensions
+
+
+def caption_props(
+    groups: Sequence[Sequence[dict]],
+    video_info: dict,
+    duration_frames: int,
+    band: Optional[Tuple[int, int]] = None,
+) -> dict:
+    """Remotion props (wrapped in 'inputProps') for word groups of one caption video, optionally band-sized."""
+    props = {
+        'inputProps': {
+            'groups': [list(group) for group in groups],
+            'videoWidth': video_info['width'],
+            'videoHeight': video_info['height'],
+            'fps': video_info['fps'],
+            'durationInFrames': duration_frames
+        }
+    }
+    if band is not None:
+        props['inputProps']['bandTop'], props['inputProps']['bandHeight'] = band
+    return props
+
+
+def sparse_caption_props(
+    word_groups: Sequence[Sequence[dict]],
+    video_info: dict,
+    duration_frames: int,
+    ranges: Sequence[Tuple[int, int]],
+    band: Optional[Tuple[int, int]] = None,
+) -> dict:
+    """`caption_props` plus the `[start, end)` ranges `SparseCaptionComposition` plays back to back."""
+    props = caption_props(word_groups, video_info, duration_frames, band)
+    props['inputProps']['ranges'] = [[start, end] for start, end in ranges]
+    return props
+
+
+def active_frame_ranges(
+    word_groups: Sequence[Sequence[dict]],
+    fps: float,
+    first_frame: int = 0,
+    stop_frame: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """
+    `[start, end)` frame ranges in which some caption line is on screen.
+
+    Mirrors `CaptionScene`: a line is shown from floor(first word start * fps) up to,
+    not including, floor(last word end * fps). Ranges are clipped to
+    `[first_frame, stop_frame)`, and gaps of up to SPARSE_MERGE_GAP_FRAMES are merged.
+    """
+    spans = []
+    for group in word_groups:
+        if not group:
+            continue
+        start = max(math.floor(group[0]['start'] * fps), first_frame)
+        end = math.floor(group[-1]['end'] * fps)
+        if stop_frame is not None:
+            end = min(end, stop_frame)
+        if end > start:
+            spans.append((start, end))
+    spans.sort()
+
+    ranges: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if ranges and start - ranges[-1][1] <= SPARSE_MERGE_GAP_FRAMES:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def _karaoke_opacities(line: dict, frame: int, fps: float) -> Tuple[float, ...]:
+    """Word opacities of a karaoke line at `frame`, as Word.tsx computes them."""
+    progress = min(1.0, max(0.0, (frame / fps - line['start_time']) / line['duration']))
+    light = -KARAOKE_LIGHT_WIDTH + progress * (1 + 2 * KARAOKE_LIGHT_WIDTH)
+    opacities = []
+    for ratio in line['ratios']:
+        distance = ratio - light
+        if distance <= 0:
+            opacity = 1.0  # reached and active words are equally bright
+        elif distance <= KARAOKE_LIGHT_WIDTH:
+            opacity = 1.0 - distance / KARAOKE_LIGHT_WIDTH * (1.0 - KARAOKE_UNREACHED_OPACITY)
+        else:
+            opacity = KARAOKE_UNREACHED_OPACITY
+        opacities.append(round(opacity, OPACITY_DECIMALS))
+    return tuple(opacities)
+
+
+def frame_segments(
+    word_groups: Sequence[Sequence[dict]],
+    fps: float,
+    ranges: Sequence[Tuple[int, int]],
+) -> List[Tuple[int, int, bool]]:
+    """
+    Split `[start, end)` frame ranges into `(start, end, held)` segments.
+
+    A held segment is a stretch of at least HOLD_MIN_FRAMES identical frames: the same
+    lines on screen and, for karaoke lines, the same word opacities. Only its first frame
+    needs rendering. The other segments change from frame to frame.
+    """
+    lines = []
+    for index, group in enumerate(word_groups):
+        if not group:
+            continue
+        line_start, line_end = group[0]['start'], group[-1]['end']
+        start_frame = math.floor(line_start * fps)
+        count = len(group)
+        lines.append({
+            'index': index,
+            'start': start_frame,
+            'end': math.floor(line_end * fps),
+            'karaoke': line_end - line_start >= KARAOKE_MIN_LINE_SECONDS,
+            'start_time': start_frame / fps,
+            'duration': line_end - start_frame / fps,
+            'ratios': [(position + 0.5) / count if count > 1 else 0.5 for position in range(count)],
+        })
+    lines.sort(key=lambda line: line['start'])
+
+    segments: List[Tuple[int, int, bool]] = []
+
+    def add(start: int, end: int, held: bool) -> None:
+        if not held and segments and not segments[-1][2] and segments[-1][1] == start:
+            segments[-1] = (segments[-1][0], end, False)
+        else:
+            segments.append((start, end, held))
+
+    following = 0
+    visible: List[dict] = []
+    for range_start, range_end in ranges:
+        run_start, run_state = range_start, None
+        for frame in range(range_start, range_end + 1):
+            state = None
+            if frame < range_end:
+                while following < len(lines) and lines[following]['start'] <= frame:
+                    visible.append(lines[following])
+                    following += 1
+                visible = [line for line in visible if line['end'] > frame]
+                state = tuple(
+                    (line['index'], _karaoke_opacities(line, frame, fps) if line['karaoke'] else None)
+                    for line in sorted(visible, key=lambda line: line['index'])
+                )
+            if frame > run_start and (frame == range_end or state != run_state):
+                add(run_start, frame, frame - run_start >= HOLD_MIN_FRAMES)
+                run_start = frame
+            run_state = state
+    return segments
+
+
+def rendered_ranges(segments: Sequence[Tuple[int, int, bool]]) -> List[Tuple[int, int]]:
+    """The frames to render for `segments`: all of a changing segment, the first of a held one."""
+    return [(start, start + 1 if held else end) for start, end, held in segments]
+
+
+def remotion_render(
+    props: dict,
+    output: Path,
+    frames: Optional[Tuple[int, int]] = None,
+    serve_url: Optional[str] = None,
+    props_file: Optional[Path] = None,
+    quiet: bool = False,
+    composition: str = CAPTION_COMPOSITION,
+) -> None:
+    """
+    Render a caption composition to `output` (ProRes 4444 with alpha).
+
+    `frames` limits the render to an inclusive frame range, `serve_url` reuses a bundle
+    from `bundle_remotion`, and `props_file` passes the props through a file instead of
+    the command line. Raises RuntimeError when the render fails.
+    """
+    if not REMOTION_DIR.exists():
+        raise RuntimeError(f"Remotion directory not found at '{REMOTION_DIR}'")
+    if props_file is not None:
+        props_file.write_text(json.dumps(props), encoding='utf-8')
+        props_arg = str(props_file)
+    else:
+        props_arg = json.dumps(props)
+
+    cmd = ['npx', 'remotion', 'render']
+    if serve_url:
+        cmd.append(serve_url)
+    cmd += [composition, str(output.absolute()), *PRORES_ALPHA_ARGS, '--props', props_arg]
+    if frames is not None:
+        cmd.append(f"--frames={frames[0]}-{frames[1]}")
+
+    result = subprocess.run(cmd, cwd=REMOTION_DIR, capture_output=quiet, text=True)
+    if result.returncode != 0:
+        details = f": {result.stderr.strip()[-500:]}" if quiet and result.stderr else ""
+        raise RuntimeError(f"Remotion render failed with exit code {result.returncode}{details}")
+    if not output.exists():
+        raise RuntimeError(f"Remotion render completed but caption file not found at {output}")
+
+
+def bundle_remotion(out_dir: Path) -> Optional[str]:
+    """Bundle the Remotion project once so several renders skip re-bundling; None if bundling fails."""
+    result = subprocess.run(
+        ['npx', 'remotion', 'bundle', '--out-dir', str(out_dir.absolute())],
+        cwd=REMOTION_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0 or not (out_dir / "index.html").exists():
+        return None
+    return str(out_dir.absolute())
+
+
+def _ffmpeg(args: Sequence[str], what: str) -> None:
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to {what}: {result.stderr.strip()}")
+
+
+def transparent_clip(video_info: dict, frames: int, output: Path, band: Optional[Tuple[int, int]] = None) -> None:
+    """A fully transparent ProRes 4444 clip of `frames` frames, matching Remotion's output format."""
+    height = band[1] if band is not None else video_info['height']
+    _ffmpeg(
+        ['-f', 'lavfi', '-i', f"color=c=black@0.0:s={video_info['width']}x{height}:r={video_info['fps']}",
+         '-frames:v', str(frames), '-vf', 'format=yuva444p10le',
+         '-c:v', 'prores_ks', '-profile:v', '4444', '-pix_fmt', 'yuva444p10le', str(output)],
+        "create a transparent clip",
+    )
+
+
+def split_video_frames(video: Path, counts: Sequence[int], out_dir: Path) -> List[Path]:
+    """Cut an intra-frame video into consecutive pieces of `counts` frames, without re-encoding."""
+    if len(counts) == 1:
+        return [video]
+    boundaries = []
+    total = 0
+    for count in counts[:-1]:
+        total += count
+        boundaries.append(str(total))
+    pattern = out_dir / f"{video.stem}.%05d.mov"
+    _ffmpeg(
+        ['-i', str(video), '-map', '0:v', '-c', 'copy', '-f', 'segment', '-segment_format', 'mov',
+         '-segment_frames', ','.join(boundaries), '-reset_timestamps', '1', str(pattern)],
+        f"split '{video.name}'",
+    )
+    return [out_dir / f"{video.stem}.{number:05d}.mov" for number in range(len(counts))]
+
+
+def assemble_caption_track(
+    parts: Sequence[Tuple[Path, Sequence[Tuple[int, int, bool]]]],
+    video_info: dict,
+    duration_frames: int,
+    output: Path,
+    work_dir: Path,
+    band: Optional[Tuple[int, int]] = None,
+) -> None:
+    """
+    Rebuild the full-length caption video from sparse renders.
+
+    Each part is a render of `SparseCaptionComposition` with the `rendered_ranges` of its
+    `frame_segments`. Held segments and the gaps between segments are stretched from a
+    single frame with concat `duration` entries. Nothing is re-encoded.
+    """
+    fps = video_info['fps']
+    parts = sorted(parts, key=lambda part: part[1][0][0])
+    blank = work_dir / "blank.mov"
+    transparent_clip(video_info, 1, blank, band)
+
+    # (file, timeline start, timeline end, held)
+    entries: List[Tuple[Path, int, int, bool]] = []
+    position = 0
+    for video, segments in parts:
+        counts = [end - start for start, end in rendered_ranges(segments)]
+        for (start, end, held), piece in zip(segments, split_video_frames(video, counts, work_dir)):
+            if start > position:
+                entries.append((blank, position, start, True))
+            entries.append((piece, start, end, held))
+            position = end
+    if duration_frames > position:
+        entries.append((blank, position, duration_frames, True))
+    if entries and entries[-1][3] and entries[-1][2] - entries[-1][1] > 1:
+        # The last frame of a file lasts one frame whatever `duration` says: end on a real frame.
+        piece, start, end, _ = entries.pop()
+        entries += [(piece, start, end - 1, True), (piece, end - 1, end, False)]
+
+    def quoted(path: Path) -> str:
+        return str(path.absolute()).replace("'", "'\\''")
+
+    lines = []
+    for piece, start, end, held in entries:
+        lines.append(f"file '{quoted(piece)}'\n")
+        if held:
+            lines.append(f"duration {(end - start) / fps:.6f}\n")
+    list_file = work_dir / "track.concat.txt"
+    list_file.write_text("".join(lines), encoding='utf-8')
+    _ffmpeg(
+        ['-f', 'concat', '-safe', '0', '-i', str(list_file), '-c', 'copy', str(output)],
+        "assemble the caption track",
+    )
+
+
+def caption_ranges_path(output: Path) -> Path:
+    """`<captions>.ranges.json` next to the caption video."""
+    return output.with_name(f"{output.stem}{RANGES_SUFFIX}")
+
+
+def overlay_enable_expression(ranges: Sequence[Tuple[int, int]], fps: float) -> str:
+    """ffmpeg expression that is true while a caption is on screen (half-frame margins absorb rounding)."""
+    return "+".join(f"between(t,{(start - 0.5) / fps:.4f},{(end - 0.5) / fps:.4f})" for start, end in ranges) or "0"
+
+
+def write_caption_ranges(
+    output: Path,
+    ranges: Sequence[Tuple[int, int]],
+    fps: float,
+    duration_frames: int,
+    band: Optional[Tuple[int, int]] = None,
+) -> Path:
+    """
+    Record where the caption video has content.
+
+    Editors can use `ranges` as an edit list; ffmpeg can skip blending the empty frames with
+    `overlay=<overlay_position>:enable='<overlay_enable>'`. A band-sized caption video also
+    records its `band` (top and height in video pixels), to be placed at y = top.
+    """
+    path = caption_ranges_path(output)
+    data = {
+        "video": output.name,
+        "fps": fps,
+        "duration_frames": duration_frames,
+        "ranges": [[start, end] for start, end in ranges],
+        "seconds": [[round(start / fps, 3), round(end / fps, 3)] for start, end in ranges],
+        "overlay_enable": overlay_enable_expression(ranges, fps),
+        "overlay_position": f"x=0:y={band[0] if band is not None else 0}",
+    }
+    if band is not None:
+        data["band"] = {"top": band[0], "height": band[1]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def render_sparse_captions(
+    word_groups: Sequence[Sequence[dict]],
+    video_info: dict,
+    output: Path,
+    serve_url: Optional[str] = None,
+    band: Optional[Tuple[int, int]] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Render each distinct frame in which captions are visible once, then assemble the full-length track.
+
+    Returns the active frame ranges (also written to `<captions>.ranges.json`).
+    """
+    fps = video_info['fps']
+    duration_frames = int(video_info['duration'] * fps)
+    ranges = active_frame_ranges(word_groups, fps, 0, duration_frames)
+    segments = frame_segments(word_groups, fps, ranges)
+    work_dir = output.with_name(f"{output.stem}.parts")
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+    work_dir.mkdir(parents=True)
+    try:
+        parts = []
+        if segments:
+            packed = work_dir / "active.mov"
+            remotion_render(
+                sparse_caption_props(word_groups, video_info, duration_frames, rendered_ranges(segments), band),
+                packed,
+                serve_url=serve_url,
+                props_file=work_dir / "active.json",
+                composition=SPARSE_CAPTION_COMPOSITION,
+            )
+            parts.append((packed, segments))
+        assemble_caption_track(parts, video_info, duration_frames, output, work_dir, band)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    write_caption_ranges(output, ranges, fps, duration_frames, band)
+    rendered = sum(end - start for start, end in rendered_ranges(segments))
+    print(f"🎞️  Rendered {rendered} distinct frame(s) for {sum(end - start for start, end in ranges)} captioned frame(s)")
+    return ranges
+
+
+class SegmentedCaptionRender:
+    """
+    Render a caption video window by window while the grouping is still being generated.
+
+    `window_ready((first, stop), groups)` queues the distinct active frames of words
+    `first..stop-1` (clipped to the window's span: from the first word's start to the
+    next window's first word, or the end of the video); windows render one at a time on
+    a background thread, since each Remotion render already uses every core. `finish()`
+    waits for the renders and assembles the full-length track into `output`.
+    """
+
+    def __init__(self, words, video_info: dict, output: Path, band: Optional[Tuple[int, int]] = None) -> None:
+        self.words = words
+        self.video_info = video_info
+        self.output = output
+        self.band = band
+        self.fps = video_info['fps']
+        self.duration_frames = int(video_info['duration'] * self.fps)
+        self.parts_dir = output.with_name(f"{output.stem}.parts")
+        if self.parts_dir.exists():
+            shutil.rmtree(self.parts_dir)
+        self.parts_dir.mkdir(parents=True)
+        self.started = time.time()
+        self.render_seconds = 0.0
+        self._lock = threading.Lock()
+        self._parts: Dict[int, Tuple[Path, List[Tuple[int, int]], List[Tuple[int, int, bool]], Future]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="remotion")
+        # Bundle while the first windows are still being grouped.
+        self._bundle = self._pool.submit(bundle_remotion, self.parts_dir / "bundle")
+
+    def _frame_range(self, first: int, stop: int) -> Tuple[int, int]:
+        start = 0 if first == 0 else int(self.words[first]['start'] * self.fps)
+        end = self.duration_frames if stop >= len(self.words) else int(self.words[stop]['start'] * self.fps)
+        return start, min(end, self.duration_frames)
+
+    def window_ready(self, window: Tuple[int, int], groups: Sequence[dict]) -> None:
+        start, end = self._frame_range(*window)
+        word_groups = [[self.words[index] for index in group['indices']] for group in groups]
+        ranges = active_frame_ranges(word_groups, self.fps, start, end)
+        if not ranges:
+            return  # nothing of this window is visible for a whole frame
+        segments = frame_segments(word_groups, self.fps, ranges)
+        part = self.parts_dir / f"{start:08d}.mov"
+        future = self._pool.submit(self._render_part, part, ranges, segments, word_groups)
+        with self._lock:
+            self._parts[start] = (part, ranges, segments, future)
+
+    def _render_part(
+        self,
+        part: Path,
+        ranges: List[Tuple[int, int]],
+        segments: List[Tuple[int, int, bool]],
+        word_groups: List[List[dict]],
+    ) -> None:
+        render_start = time.time()
+        remotion_render(
+            sparse_caption_props(word_groups, self.video_info, self.duration_frames, rendered_ranges(segments), self.band),
+            part,
+            serve_url=self._bundle.result(),
+            props_file=part.with_suffix('.json'),
+            quiet=True,
+            composition=SPARSE_CAPTION_COMPOSITION,
+        )
+        self.render_seconds += time.time() - render_start
+        active = sum(end - start for start, end in ranges)
+        rendered = sum(end - start for start, end in rendered_ranges(segments))
+        print(
+            f"🎞️  Rendered caption frames {ranges[0][0]}-{ranges[-1][1] - 1} "
+            f"({active / self.fps:.1f}s on screen, {rendered} distinct frame(s)) at +{time.time() - self.started:.1f}s"
+        )
+
+    def finish(self) -> None:
+        """Wait for every window, then assemble the full-length track and its ranges sidecar."""
+        try:
+            with self._lock:
+                parts = sorted(self._parts.items())
+            for _, (_, _, _, future) in parts:
+                future.result()
+            assemble_caption_track(
+                [(part, segments) for _, (part, _, segments, _) in parts],
+                self.video_info,
+                self.duration_frames,
+                self.output,
+                self.parts_dir,
+                self.band,
+            )
+        finally:
+            self._pool.shutdown(wait=True)
+        ranges = [span for _, (_, part_ranges, _, _) in parts for span in part_ranges]
+        write_caption_ranges(self.output, ranges, self.fps, self.duration_frames, self.band)
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        rendered = sum(
+            end - start for _, (_, _, segments, _) in parts for start, end in rendered_ranges(segments)
+        )
+        print(
+            f"✅ Assembled {len(parts)} caption window(s) into '{self.output.name}': rendered {rendered} of "
+            f"{self.duration_frames} frames ({self.render_seconds:.1f}s rendering, "
+            f"{time.time() - self.started:.1f}s wall-clock incl. grouping)"
+        )
+
+    def abandon(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
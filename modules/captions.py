@@ -1,53 +1,207 @@
 import subprocess
 import json
+import time
+import asyncio
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
 
 try:
-    from .common import StageEnvironment, build_cli_parser, call_gpt5
+    from .caption_render import (
+        SegmentedCaptionRender,
+        active_frame_ranges,
+        caption_band,
+        caption_props,
+        remotion_render,
+        render_sparse_captions,
+        write_caption_ranges,
+    )
+    from .common import LlmClient, LlmError, StageEnvironment, build_cli_parser, llm_cache_report
+    from .grouping import (
+        ends_sentence,
+        group_words_locally,
+        load_grouping_snapshot,
+        plan_regroup,
+        write_grouping_snapshot,
+    )
+    from .wordstore import open_word_store
 except ImportError:
-    from common import StageEnvironment, build_cli_parser, call_gpt5
+    from caption_render import (
+        SegmentedCaptionRender,
+        active_frame_ranges,
+        caption_band,
+        caption_props,
+        remotion_render,
+        render_sparse_captions,
+        write_caption_ranges,
+    )
+    from common import LlmClient, LlmError, StageEnvironment, build_cli_parser, llm_cache_report
+    from grouping import (
+        ends_sentence,
+        group_words_locally,
+        load_grouping_snapshot,
+        plan_regroup,
+        write_grouping_snapshot,
+    )
+    from wordstore import open_word_store
 
 
 def load_words_from_json(json_path: Path):
     """
     Load word-level timing information from JSON file.
     
-    Returns a list of dictionaries with keys: 'word', 'start', 'end'
-    Times are in seconds (float).
+    Returns a read-only sequence of dictionaries with keys: 'word', 'start', 'end',
+    backed by the memory-mapped `.words.bin` sidecar (built from the JSON when missing
+    or stale). Empty words are filtered out. Times are in seconds (float).
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        words = json.load(f)
-    
-    # Filter out empty words
-    words = [w for w in words if w.get('word', '').strip()]
-    
-    return words
+    return open_word_store(json_path)
+
+
+# Grouping requests cover windows of roughly this many words ...
+GROUPING_WINDOW_WORDS = 200
+# ... and never more than this; oversize windows are cut at their longest pause.
+GROUPING_MAX_WINDOW_WORDS = 320
+# Pauses at least this long end a window even without sentence punctuation.
+GROUPING_BREAK_GAP_SECONDS = 0.8
+# Window requests in flight at once.
+GROUPING_CONCURRENCY = 4
 
 
-def generate_groupings_with_gpt(words):
+def split_grouping_windows(words, first: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split `words[first:stop]` into `(first, stop)` index windows for separate grouping requests.
+
+    A window closes at the first sentence end or long pause once it holds
+    GROUPING_WINDOW_WORDS words, so no caption line can straddle two windows.
+    """
+    stop = len(words) if stop is None else stop
+    windows: List[Tuple[int, int]] = []
+    for index in range(first, stop - 1):
+        length = index + 1 - first
+        gap = words[index + 1]['start'] - words[index]['end']
+        boundary = ends_sentence(words[index]['word']) or gap >= GROUPING_BREAK_GAP_SECONDS
+        if length >= GROUPING_WINDOW_WORDS and boundary:
+            windows.append((first, index + 1))
+            first = index + 1
+        elif length >= GROUPING_MAX_WINDOW_WORDS:
+            # No natural boundary: cut at the longest pause in the second half of the window.
+            candidates = range(first + GROUPING_MAX_WINDOW_WORDS // 2, index + 1)
+            cut = max(candidates, key=lambda i: words[i + 1]['start'] - words[i]['end']) + 1
+            windows.append((first, cut))
+            first = cut
+    if first < stop:
+        windows.append((first, stop))
+    return windows
+
+
+def encode_words_for_grouping(words, first: int, stop: int) -> str:
+    """One `index|word|start|end|gap` line per word (times in seconds, gap to the next word)."""
+    lines = []
+    for i in range(first, stop):
+        word = words[i]
+        gap = f"{words[i + 1]['start'] - word['end']:.2f}" if i + 1 < len(words) else ""
+        lines.append(f"{i}|{word['word']}|{word['start']:.2f}|{word['end']:.2f}|{gap}")
+    return '\n'.join(lines)
+
+
+def _parse_groupings(response: str, words, first: int, stop: int):
+    """Turn a grouping response into `{"indices", "text"}` dicts restricted to the window."""
+    response_data = json.loads(response)
+
+    # Extract groups array
+    if "groups" in response_data:
+        groupings = response_data["groups"]
+    elif "groupings" in response_data:
+        groupings = response_data["groupings"]
+    elif "lines" in response_data:
+        groupings = response_data["lines"]
+    else:
+        raise ValueError(f"Expected 'groups' key in response, got: {list(response_data.keys())}")
+
+    # Handle both new format (with indices/text) and old format (just arrays)
+    result = []
+    for group in groupings:
+        # New format: {"indices": [0, 1], "text": "..."}
+        if isinstance(group, dict) and "indices" in group:
+            indices = [idx for idx in group["indices"] if first <= idx < stop]
+            text = group.get("text", "")
+            if not text and indices:
+                # Generate text if not provided
+                text = ' '.join(words[idx]['word'] for idx in indices)
+        # Old format: [0, 1, 2]
+        elif isinstance(group, list):
+            indices = [idx for idx in group if first <= idx < stop]
+            text = ' '.join(words[idx]['word'] for idx in indices)
+        else:
+            continue
+        if indices:
+            result.append({
+                "indices": indices,
+                "text": text
+            })
+    return result
+
+
+async def _group_window(client: LlmClient, words, window: Tuple[int, int], system_prompt: str, label: str, use_cache: bool):
+    first, stop = window
+    transcript_text = encode_words_for_grouping(words, first, stop)
+    user_prompt = f"Please group these transcript words into optimal caption lines, considering both timing and meaning:\n\n{transcript_text}"
+    try:
+        response = await client.complete(
+            system_prompt,
+            user_prompt,
+            response_format={"type": "json_object"},
+            model="gpt-5-mini",
+            timeout=180,  # 3 minutes per window
+            use_cache=use_cache,
+            # Only cache replies that parse, so a malformed one is requested again next run.
+            validate=lambda content: _parse_groupings(content, words, first, stop),
+        )
+        return _parse_groupings(response.content, words, first, stop)
+    except (LlmError, json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
+        print(f"⚠️  GPT-5-mini grouping failed for {label} ({e if isinstance(e, LlmError) else f'{type(e).__name__}: {e}'})")
+        print(f"   Falling back to local grouping for words {first}-{stop - 1}...")
+        return group_words_locally(words, first, stop)
+
+
+async def _group_windows(words, windows, system_prompt: str, concurrency: int, use_cache: bool, on_window=None):
+    async with LlmClient(max_concurrency=concurrency) as client:
+        async def group_one(number: int, window: Tuple[int, int]):
+            groups = await _group_window(client, words, window, system_prompt, f"window {number}/{len(windows)}", use_cache)
+            if on_window is not None:
+                on_window(window, groups)
+            return groups
+
+        grouped = await asyncio.gather(*(group_one(number, window) for number, window in enumerate(windows, 1)))
+        print(f"📡 GPT-5-mini requests: {client.report()}")
+    return [group for window_groups in grouped for group in window_groups]
+
+
+def generate_groupings_with_gpt(
+    words,
+    concurrency: int = GROUPING_CONCURRENCY,
+    use_cache: bool = True,
+    regions: Optional[Sequence[Tuple[int, int]]] = None,
+    on_window: Optional[Callable[[Tuple[int, int], List[dict]], None]] = None,
+):
     """
     Group words into caption lines using GPT-5-mini for intelligent semantic grouping.
+
+    Long transcripts are split at sentence ends / long pauses into windows that are
+    grouped by concurrent requests (at most `concurrency` at a time), so latency follows
+    the longest window rather than the transcript length. A window whose request fails
+    falls back to the local grouper without affecting the others. Window responses are
+    cached, so regrouping an unchanged transcript (or its unchanged windows) is instant.
+
+    `regions` restricts grouping to those `(first, stop)` word ranges (see
+    `grouping.plan_regroup`); by default the whole transcript is grouped. `on_window`
+    is called with each `(first, stop)` window and its groups as soon as it is done,
+    so rendering can start before the last window comes back.
     
     Returns a list of grouping objects with 'indices' and 'text' fields.
     """
     if not words:
         return []
     
-    # Prepare the transcript with word indices, text, and timing for GPT-5
-    word_list = []
-    for i, word in enumerate(words):
-        start_time = word['start']
-        end_time = word['end']
-        duration = end_time - start_time
-        # Calculate gap to next word if it exists
-        if i < len(words) - 1:
-            gap = words[i + 1]['start'] - end_time
-            word_list.append(f"{i}: '{word['word']}' [{start_time:.2f}s - {end_time:.2f}s, duration: {duration:.2f}s, gap to next: {gap:.2f}s]")
-        else:
-            word_list.append(f"{i}: '{word['word']}' [{start_time:.2f}s - {end_time:.2f}s, duration: {duration:.2f}s]")
-    
-    transcript_text = '\n'.join(word_list)
-    
     # Read the captions guidelines
     guidelines_path = Path(__file__).parent / "captions-guidelines.md"
     if not guidelines_path.exists():
@@ -58,96 +212,44 @@ def generate_groupings_with_gpt(words):
     except Exception as e:
         raise RuntimeError(f"Failed to read captions guidelines: {e}")
     
-    user_prompt = f"Please group these transcript words into optimal caption lines, considering both timing and meaning:\n\n{transcript_text}"
-    
-    print(f"🤖 Calling GPT-5-mini to intelligently group {len(words)} words into caption lines...")
-    print(f"📤 Sending {len(transcript_text)} characters to GPT...")
+    if regions is None:
+        regions = [(0, len(words))]
+    windows = [window for first, stop in regions for window in split_grouping_windows(words, first, stop)]
+    if not windows:
+        return []
+    concurrency = max(1, min(concurrency, len(windows)))
+    word_count = sum(stop - first for first, stop in windows)
+    print(
+        f"🤖 Calling GPT-5-mini to intelligently group {word_count} words into caption lines "
+        f"({len(windows)} window(s), {concurrency} at a time)..."
+    )
     
+    start_time = time.time()
     try:
-        response = call_gpt5(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            response_format={"type": "json_object"},
-            model="gpt-5-mini",
-            timeout=180  # 3 minutes for longer transcripts
-        )
-        
-        print(f"📥 Received response, parsing JSON...")
-        
-        # Parse the response
-        try:
-            response_data = json.loads(response)
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse GPT response as JSON")
-            print(f"   Parse error: {e}")
-            print(f"   Raw response: {response[:500]}...")
-            raise
-        
-        # Extract groups array
-        if "groups" in response_data:
-            groupings = response_data["groups"]
-        elif "groupings" in response_data:
-            groupings = response_data["groupings"]
-        elif "lines" in response_data:
-            groupings = response_data["lines"]
-        else:
-            raise ValueError(f"Expected 'groups' key in response, got: {list(response_data.keys())}")
-        
-        # Handle both new format (with indices/text) and old format (just arrays)
+        result = asyncio.run(_group_windows(words, windows, system_prompt, concurrency, use_cache, on_window))
+    except LlmError as e:
+        print(f"⚠️  GPT-5-mini grouping unavailable ({e}); using the local grouper.")
         result = []
-        for group in groupings:
-            # New format: {"indices": [0, 1], "text": "..."}
-            if isinstance(group, dict) and "indices" in group:
-                indices = [idx for idx in group["indices"] if 0 <= idx < len(words)]
-                text = group.get("text", "")
-                if not text and indices:
-                    # Generate text if not provided
-                    text = ' '.join(words[idx]['word'] for idx in indices)
-                if indices:
-                    result.append({
-                        "indices": indices,
-                        "text": text
-                    })
-            # Old format: [0, 1, 2]
-            elif isinstance(group, list):
-                indices = [idx for idx in group if 0 <= idx < len(words)]
-                if indices:
-                    text = ' '.join(words[idx]['word'] for idx in indices)
-                    result.append({
-                        "indices": indices,
-                        "text": text
-                    })
-        
-        print(f"✅ GPT-5-mini grouped words into {len(result)} caption lines")
-        
-        # Show a sample of the groupings for verification
-        if result:
-            sample_count = min(3, len(result))
-            print(f"📋 Sample groupings (first {sample_count}):")
-            for i in range(sample_count):
-                group = result[i]
-                print(f"   {i+1}. indices={group['indices']} → \"{group['text']}\"")
-        
-        return result
-        
-    except (json.JSONDecodeError, ValueError, KeyError) as e:
-        print(f"⚠️  GPT-5-mini grouping failed")
-        print(f"   Error type: {type(e).__name__}")
-        print(f"   Error message: {e}")
-        print(f"   Falling back to simple grouping...")
-        # Fallback: simple grouping by small chunks
-        result = []
-        i = 0
-        while i < len(words):
-            chunk_size = min(4, len(words) - i)
-            indices = list(range(i, i + chunk_size))
-            text = ' '.join(words[idx]['word'] for idx in indices)
-            result.append({
-                "indices": indices,
-                "text": text
-            })
-            i += chunk_size
-        return result
+        for window in windows:
+            groups = group_words_locally(words, *window)
+            if on_window is not None:
+                on_window(window, groups)
+            result.extend(groups)
+    
+    print(
+        f"✅ GPT-5-mini grouped words into {len(result)} caption lines in {time.time() - start_time:.1f}s "
+        f"({llm_cache_report()})"
+    )
+    
+    # Show a sample of the groupings for verification
+    if result:
+        sample_count = min(3, len(result))
+        print(f"📋 Sample groupings (first {sample_count}):")
+        for i in range(sample_count):
+            group = result[i]
+            print(f"   {i+1}. indices={group['indices']} → \"{group['text']}\"")
+    
+    return result
 
 
 def get_video_info(video_path: Path):
@@ -203,19 +305,23 @@ def get_video_info(video_path: Path):
         raise RuntimeError(f"Failed to get video info: {e}")
 
 
-def save_grouping(grouping_path: Path, groupings):
+def save_grouping(grouping_path: Path, groupings, words=None):
     """
     Save the word grouping to a JSON file for reuse.
     
     Args:
         grouping_path: Path to save the grouping JSON
         groupings: List of dicts with 'indices' and 'text' fields
+        words: The words the indices refer to; recorded in `*-grouping.words.json` so a
+            later transcript change can be regrouped incrementally
     """
     grouping_data = {
         "groups": groupings
     }
     with open(grouping_path, 'w', encoding='utf-8') as f:
         json.dump(grouping_data, f, indent=2, ensure_ascii=False)
+    if words is not None:
+        write_grouping_snapshot(grouping_path, words)
     print(f"💾 Saved word grouping to '{grouping_path.name}'")
 
 
@@ -236,24 +342,20 @@ def render_captions_with_remotion(
     words_json: Path,
     grouping_json: Path,
     video_info: dict,
-    output_path: Path
+    output_path: Path,
+    dense: bool = False,
+    band_only: bool = False
 ):
     """
     Render captions using Remotion as a standalone file.
     
     Remotion renders a transparent video with animated captions (drop + karaoke effects).
     The output can be composited onto the original video in Final Cut Pro or other editors.
+    Only frames with a visible caption are rendered unless `dense` is set; `band_only`
+    renders just the strip of the frame the captions occupy (see `caption_band`).
     """
     print(f"🎬 Rendering captions with Remotion...")
     
-    # Get the remotion directory
-    remotion_dir = Path(__file__).parent.parent / "remotion"
-    if not remotion_dir.exists():
-        raise RuntimeError(f"Remotion directory not found at '{remotion_dir}'")
-    
-    # Output will be the caption-only file (absolute path for Remotion)
-    caption_output = output_path.absolute()
-    
     # Calculate duration in frames
     duration_frames = int(video_info['duration'] * video_info['fps'])
     
@@ -268,64 +370,84 @@ def render_captions_with_remotion(
         if word_group:
             merged_groups.append(word_group)
     
-    # Build the remotion render command with merged data
-    # Remotion expects props wrapped in 'inputProps' key
-    props_data = {
-        'inputProps': {
-            'groups': merged_groups,
-            'videoWidth': video_info['width'],
-            'videoHeight': video_info['height'],
-            'fps': video_info['fps'],
-            'durationInFrames': duration_frames
-        }
-    }
-    
     print(f"📊 Rendering with:")
     print(f"   Groups: {len(merged_groups)}")
     print(f"   Dimensions: {video_info['width']}x{video_info['height']}")
     print(f"   FPS: {video_info['fps']}")
     print(f"   Duration: {duration_frames} frames ({video_info['duration']:.2f}s)")
+    band = caption_band(video_info) if band_only else None
+    if band is not None:
+        print(f"   Caption band: {video_info['width']}x{band[1]} at y={band[0]}")
     if merged_groups:
         sample = merged_groups[0][:2] if len(merged_groups[0]) > 2 else merged_groups[0]
         print(f"   Sample words: {[w['word'] for w in sample]}...")
     
-    cmd = [
-        'npx',
-        'remotion',
-        'render',
-        'CaptionComposition',
-        str(caption_output),
-        '--codec', 'prores',
-        '--prores-profile', '4444',  # ProRes 4444 with alpha channel
-        '--pixel-format', 'yuva444p10le',  # Pixel format with alpha channel
-        '--props',
-        json.dumps(props_data)
-    ]
-    
+    # Output will be the caption-only file (absolute path for Remotion)
+    caption_output = output_path.absolute()
+    print(f"  Running: npx remotion render...")
+    print(f"  Output file: {caption_output}")
+    print()  # Empty line before Remotion output
     try:
-        print(f"  Running: npx remotion render...")
-        print(f"  Output file: {caption_output}")
-        print()  # Empty line before Remotion output
-        
-        result = subprocess.run(
-            cmd,
-            cwd=remotion_dir,
-            check=True
-        )
-        
-        print()  # Empty line after Remotion output
-        print(f"✅ Remotion render complete")
-        
-        # Check if the file was actually created
-        if not caption_output.exists():
-            print(f"❌ Caption file not found at: {caption_output}")
-            raise RuntimeError(f"Remotion render completed but caption file not found at {caption_output}")
-        
-        print(f"✅ Caption file created: {caption_output.name}")
-        
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Remotion render failed with exit code {e.returncode}")
-        raise RuntimeError(f"Remotion render failed")
+        if dense:
+            remotion_render(caption_props(merged_groups, video_info, duration_frames, band), caption_output)
+            ranges = active_frame_ranges(merged_groups, video_info['fps'], 0, duration_frames)
+            write_caption_ranges(caption_output, ranges, video_info['fps'], duration_frames, band)
+        else:
+            ranges = render_sparse_captions(merged_groups, video_info, caption_output, band=band)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise
+    print()  # Empty line after Remotion output
+    print(f"✅ Remotion render complete")
+    if not dense:
+        active = sum(end - start for start, end in ranges)
+        print(f"   Captions visible in {active} of {duration_frames} frames ({len(ranges)} range(s))")
+    print(f"✅ Caption file created: {caption_output.name}")
+
+
+def group_words(words, parsed, regions: Optional[Sequence[Tuple[int, int]]] = None):
+    """Group `words` (or only `regions` of them) with the grouper selected on the command line."""
+    if parsed.grouper == 'local':
+        start_time = time.time()
+        regions = regions if regions is not None else [(0, len(words))]
+        groupings = [group for first, stop in regions for group in group_words_locally(words, first, stop)]
+        print(f"✅ Local grouper made {len(groupings)} caption lines in {(time.time() - start_time) * 1000:.0f}ms")
+        return groupings
+    return generate_groupings_with_gpt(
+        words,
+        concurrency=parsed.concurrency,
+        use_cache=not parsed.no_cache,
+        regions=regions,
+    )
+
+
+def update_grouping(grouping_file: Path, groupings, words, parsed):
+    """
+    Bring a saved grouping in line with the current transcript.
+
+    The words saved with the grouping are aligned with `words`; groups whose words are
+    unchanged are kept (re-indexed) and only the changed neighbourhoods are grouped
+    again, so a small transcript edit costs a small regroup.
+    """
+    snapshot = load_grouping_snapshot(grouping_file)
+    if snapshot is None:
+        # Saved before snapshots existed: the user vouched for it, so record the current words.
+        write_grouping_snapshot(grouping_file, words)
+        return groupings
+
+    start_time = time.time()
+    plan = plan_regroup(snapshot, groupings, words)
+    if plan.unchanged:
+        return groupings
+    print(
+        f"🧩 Transcript changed since the grouping was saved: keeping {len(plan.carried)} of "
+        f"{len(groupings)} groups, regrouping {plan.regroup_words} of {len(words)} words "
+        f"in {len(plan.regions)} region(s)..."
+    )
+    groupings = plan.merge(group_words(words, parsed, regions=plan.regions) if plan.regions else [])
+    save_grouping(grouping_file, groupings, words)
+    print(f"✅ Updated grouping to {len(groupings)} caption lines in {time.time() - start_time:.1f}s")
+    return groupings
 
 
 def run(args):
@@ -352,10 +474,17 @@ def run(args):
     Output:
         - Produces `<title>-<take_id>-draft-captions.mov` with animated captions (transparent background)
         - Also produces `<title>-<take_id>-draft-grouping.json` for manual tweaking
+        - And `<title>-<take_id>-draft-captions.ranges.json`: the frame ranges with a visible
+          caption (only those are rendered, each distinct frame once) and an ffmpeg
+          `overlay=enable=` expression
+        - With `--band`, the .mov is only as tall as the caption band; the sidecar's
+          `band.top` is the y offset to place it at
         - The .mov file can be composited onto the original video in Final Cut Pro or other editors
     
     Grouping workflow:
         - If grouping file exists, prompts whether to regenerate (unless `--yes` auto-reuses)
+        - A reused grouping whose transcript changed since it was saved is updated
+          incrementally: unchanged groups are re-indexed, only changed spans are regrouped
         - You can manually edit the grouping JSON to adjust which words are grouped together
         - The text field is for human readability - Remotion uses the indices field
         - Just re-run the command after editing to re-render with new groupings
@@ -369,6 +498,38 @@ def run(args):
         nargs='?',
         help='Video file to add captions to (if not provided, looks for *-draft.mp4)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=GROUPING_CONCURRENCY,
+        help='Grouping requests sent to GPT at once (long transcripts are split into windows).'
+    )
+    parser.add_argument(
+        '--grouper',
+        choices=('gpt', 'local'),
+        default='gpt',
+        help="How new groupings are made: 'gpt' (GPT-5-mini) or 'local' (offline rule-based, instant; good for drafts)."
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Call GPT even when cached grouping responses for the same words exist.'
+    )
+    parser.add_argument(
+        '--single-render',
+        action='store_true',
+        help='Render once after grouping finishes instead of rendering windows while GPT is still grouping.'
+    )
+    parser.add_argument(
+        '--dense',
+        action='store_true',
+        help='Render every frame of the video in one pass, including frames without captions (implies --single-render).'
+    )
+    parser.add_argument(
+        '--band',
+        action='store_true',
+        help='Render only the horizontal strip the captions occupy; place it at the y offset recorded in *-captions.ranges.json.'
+    )
     parsed = parser.parse_args(args)
 
     env = StageEnvironment.create(
@@ -428,16 +589,49 @@ def run(args):
                 print(f"⚠️  Failed to load grouping: {e}")
                 print("Will generate new grouping instead...")
                 groupings = None
+            if groupings is not None:
+                groupings = update_grouping(grouping_file, groupings, load_words_from_json(json_file), parsed)
         else:
             print("🔄 Will generate new grouping...")
     
     # If we don't have groupings yet, generate them
+    streamed_render = None
     if groupings is None:
         print(f"🤖 Generating new word grouping...")
         words = load_words_from_json(json_file)
-        groupings = generate_groupings_with_gpt(words)
+        if parsed.grouper == 'gpt' and not (parsed.single_render or parsed.dense) and len(words):
+            # Render each window's frames as soon as GPT has grouped it.
+            streamed_render = SegmentedCaptionRender(
+                words,
+                video_info,
+                captions_video.absolute(),
+                band=caption_band(video_info) if parsed.band else None,
+            )
+            try:
+                groupings = generate_groupings_with_gpt(
+                    words,
+                    concurrency=parsed.concurrency,
+                    use_cache=not parsed.no_cache,
+                    on_window=streamed_render.window_ready,
+                )
+            except BaseException:
+                # Stop the render worker and remove the partial segments (also on Ctrl+C / abort).
+                streamed_render.abandon()
+                raise
+        else:
+            groupings = group_words(words, parsed)
         # Save the grouping for future reuse
-        save_grouping(grouping_file, groupings)
+        save_grouping(grouping_file, groupings, words)
+
+    if streamed_render is not None:
+        try:
+            streamed_render.finish()
+            print(f"✅ post -captions: successfully created '{captions_video.name}'")
+            print(f"   Transparent caption file ready for compositing in Final Cut Pro!")
+        except Exception as e:
+            streamed_render.abandon()
+            env.abort(f"Failed to render captions: {e}")
+        return
 
     # Step 2: Render with Remotion and composite
     try:
@@ -446,7 +640,9 @@ def run(args):
             json_file,
             grouping_file,
             video_info,
-            captions_video
+            captions_video,
+            dense=parsed.dense,
+            band_only=parsed.band
         )
         print(f"✅ post -captions: successfully created '{captions_video.name}'")
         print(f"   Transparent caption file ready for compositing in Final Cut Pro!")
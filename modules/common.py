@@ -1,9 +1,15 @@
 import argparse
+import asyncio
+import hashlib
+import json
 import os
+import random
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
-from openai import OpenAI
+from typing import Callable, Dict, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
 
 
 def build_cli_parser(stage: str, summary: str) -> argparse.ArgumentParser:
@@ -172,9 +178,335 @@ def find_preferred_rough_video(env: StageEnvironment) -> Path:
     raise AssertionError("unreachable")
 
 
-def call_gpt5(system_prompt: str, user_prompt: str, response_format=None, model: str = "gpt-5", timeout: int = 120) -> str:
+def post_cache_dir(*parts: str) -> Path:
+    """
+    Return a directory inside the shared on-disk cache, creating it when missing.
+
+    The cache lives in `~/.cache/post` unless `POST_CACHE_DIR` points somewhere else.
+
+    Parameters
+    ----------
+    parts:
+        Optional sub-directory names (e.g. "onnx") appended to the cache root.
+    """
+    root = Path(os.getenv("POST_CACHE_DIR", "~/.cache/post")).expanduser()
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+LLM_CACHE_VERSION = 1
+# Attempts per request; rate limits, timeouts, connection and server errors are retried.
+LLM_MAX_ATTEMPTS = 5
+LLM_BACKOFF_SECONDS = 1.0
+LLM_MAX_BACKOFF_SECONDS = 30.0
+# Requests an LlmClient keeps in flight at once.
+LLM_CONCURRENCY = 4
+
+_llm_cache_stats = {"hits": 0, "misses": 0}
+_llm_cache_lock = threading.Lock()
+
+
+def _llm_cache_enabled() -> bool:
+    """Off with POST_NO_LLM_CACHE, and for other endpoints (POST_LLM_BASE_URL): their replies are not OpenAI's."""
+    return not os.getenv("POST_NO_LLM_CACHE") and not llm_endpoint()[1]
+
+
+def _llm_cache_key(model: str, system_prompt: str, user_prompt: str, response_format) -> str:
+    identity = {
+        "version": LLM_CACHE_VERSION,
+        "model": model,
+        "system": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        "user": hashlib.sha256(user_prompt.encode("utf-8")).hexdigest(),
+        "response_format": response_format,
+    }
+    base_url = llm_endpoint()[1]
+    if base_url:
+        identity["base_url"] = base_url
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _llm_cache_lookup(key: str):
+    """Cached response content for `key`, or None when missing or older than the TTL."""
+    path = post_cache_dir("llm") / f"{key}.json"
+    ttl = float(os.getenv("POST_LLM_CACHE_TTL_DAYS", "30")) * 86400
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("created", 0) > ttl:
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)  # LRU bookkeeping
+    return entry.get("content")
+
+
+def _llm_cache_store(key: str, model: str, content: str) -> None:
+    root = post_cache_dir("llm")
+    path = root / f"{key}.json"
+    partial = root / f"{key}.{os.getpid()}.{threading.get_ident()}.partial"
+    partial.write_text(json.dumps({"model": model, "created": time.time(), "content": content}), encoding="utf-8")
+    partial.replace(path)
+
+    # Drop least recently used responses while the cache exceeds POST_LLM_CACHE_MB.
+    limit = float(os.getenv("POST_LLM_CACHE_MB", "200")) * 1024**2
+    entries = [(entry.stat().st_mtime, entry.stat().st_size, entry) for entry in root.glob("*.json")]
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        if entry != path:
+            entry.unlink(missing_ok=True)
+            total -= size
+
+
+def _llm_cache_get(key: str, use_cache: bool):
+    """Cached content for `key` when caching is on, counting the hit or miss."""
+    content = None
+    if use_cache and _llm_cache_enabled():
+        content = _llm_cache_lookup(key)
+    with _llm_cache_lock:
+        _llm_cache_stats["hits" if content is not None else "misses"] += 1
+    return content
+
+
+def _llm_cache_discard(key: str) -> None:
+    (post_cache_dir("llm") / f"{key}.json").unlink(missing_ok=True)
+
+
+def _accepted(content: str, validate: Optional[Callable[[str], object]]) -> bool:
+    """Whether `validate` (if any) accepts `content`; any exception means no."""
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+
+def _llm_cache_get_valid(key: str, use_cache: bool, validate: Optional[Callable[[str], object]]):
+    """Like `_llm_cache_get`, but a cached reply that `validate` rejects is discarded and counted as a miss."""
+    content = _llm_cache_get(key, use_cache)
+    if content is not None and not _accepted(content, validate):
+        _llm_cache_discard(key)
+        with _llm_cache_lock:
+            _llm_cache_stats["hits"] -= 1
+            _llm_cache_stats["misses"] += 1
+        return None
+    return content
+
+
+def _llm_cache_put(key: str, result: "LlmResult", validate: Optional[Callable[[str], object]] = None) -> None:
+    """Cache a reply that finished normally (not truncated or empty) and passes `validate`."""
+    if not _llm_cache_enabled():
+        return
+    if result.finish_reason != "stop" or not result.content.strip() or not _accepted(result.content, validate):
+        return
+    try:
+        _llm_cache_store(key, result.model, result.content)
+    except OSError as e:
+        print(f"⚠️  Could not cache the response: {e}")
+
+
+def llm_cache_report() -> str:
+    """One-line summary of response-cache hits and misses in this process."""
+    with _llm_cache_lock:
+        hits, misses = _llm_cache_stats["hits"], _llm_cache_stats["misses"]
+    return f"LLM cache: {hits} hit(s), {misses} miss(es)"
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of `text` (exact with tiktoken installed, otherwise ~4 characters per token)."""
+    try:
+        import tiktoken
+
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    except ImportError:
+        return max(1, len(text) // 4) if text else 0
+
+
+class LlmError(RuntimeError):
+    """An LLM request failed for good: a non-retryable error, or retries ran out."""
+
+
+@dataclass
+class LlmResult:
+    """One completion and how it went (latencies in seconds, from the first attempt)."""
+
+    content: str
+    model: str
+    finish_reason: Optional[str] = None
+    latency: float = 0.0
+    first_token_latency: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 1
+    cached: bool = False
+
+
+def llm_endpoint() -> Tuple[Optional[str], Optional[str]]:
+    """
+    `(api_key, base_url)` for LLM calls.
+
+    `POST_LLM_BASE_URL` points every call at another OpenAI-compatible server, such as
+    `post -llm-standin` for offline load tests; no API key is needed then.
+    """
+    base_url = os.getenv("POST_LLM_BASE_URL") or None
+    api_key = os.getenv("OPENAI_API_KEY") or ("local" if base_url else None)
+    return api_key, base_url
+
+
+_sync_clients: Dict[Tuple[Optional[str], Optional[str]], OpenAI] = {}
+_sync_clients_lock = threading.Lock()
+
+
+def _shared_client() -> OpenAI:
+    """One OpenAI client (and HTTP connection pool) per endpoint, shared by all threads."""
+    api_key, base_url = llm_endpoint()
+    with _sync_clients_lock:
+        client = _sync_clients.get((api_key, base_url))
+        if client is None:
+            # Retries are ours (see _retry_delay), so the SDK's are disabled.
+            client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            _sync_clients[(api_key, base_url)] = client
+    return client
+
+
+def _completion_kwargs(model: str, system_prompt: str, user_prompt: str, response_format, stream: bool, timeout: float) -> dict:
+    kwargs = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "timeout": timeout,
+    }
+    if response_format:
+        kwargs["response_format"] = response_format
+    if stream:
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+    return kwargs
+
+
+def _retryable(error: Exception) -> bool:
+    import openai
+
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError, TimeoutError))
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Exponential backoff with jitter; a server's Retry-After wins when it sends one."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after:
+            return min(float(retry_after), LLM_MAX_BACKOFF_SECONDS)
+    except ValueError:
+        pass
+    delay = min(LLM_BACKOFF_SECONDS * 2 ** (attempt - 1), LLM_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _announce_retry(error: Exception, attempt: int, delay: float) -> None:
+    print(f"⏳ {type(error).__name__}; retrying in {delay:.1f}s (attempt {attempt + 1}/{LLM_MAX_ATTEMPTS})...")
+
+
+class _Completion:
+    """Collects a (streamed or whole) completion into an LlmResult."""
+
+    def __init__(self, model: str, started: float, on_delta: Optional[Callable[[str], None]]) -> None:
+        self.result = LlmResult(content="", model=model)
+        self.started = started
+        self.on_delta = on_delta
+        self.parts: List[str] = []
+
+    def add_usage(self, usage) -> None:
+        if usage is not None:
+            self.result.prompt_tokens = usage.prompt_tokens or 0
+            self.result.completion_tokens = usage.completion_tokens or 0
+
+    def add_chunk(self, chunk) -> None:
+        self.add_usage(getattr(chunk, "usage", None))
+        for choice in chunk.choices:
+            delta = choice.delta.content
+            if delta:
+                if self.result.first_token_latency is None:
+                    self.result.first_token_latency = time.monotonic() - self.started
+                self.parts.append(delta)
+                if self.on_delta is not None:
+                    self.on_delta(delta)
+            if choice.finish_reason:
+                self.result.finish_reason = choice.finish_reason
+
+    def add_response(self, response) -> None:
+        self.add_usage(response.usage)
+        self.parts.append(response.choices[0].message.content or "")
+        self.result.finish_reason = response.choices[0].finish_reason
+
+    def finish(self, attempts: int) -> LlmResult:
+        self.result.content = "".join(self.parts)
+        self.result.latency = time.monotonic() - self.started
+        self.result.attempts = attempts
+        return self.result
+
+
+def _complete_sync(kwargs: dict, started: float, on_delta) -> LlmResult:
+    client = _shared_client()
+    for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+        completion = _Completion(kwargs["model"], started, on_delta)
+        try:
+            if kwargs.get("stream"):
+                for chunk in client.chat.completions.create(**kwargs):
+                    completion.add_chunk(chunk)
+            else:
+                completion.add_response(client.chat.completions.create(**kwargs))
+            return completion.finish(attempt)
+        except Exception as e:
+            # A stream that already produced text cannot be replayed without duplicating it.
+            if attempt == LLM_MAX_ATTEMPTS or completion.parts or not _retryable(e):
+                raise
+            delay = _retry_delay(attempt, e)
+            _announce_retry(e, attempt, delay)
+            time.sleep(delay)
+
+
+def describe_llm_result(result: LlmResult) -> str:
+    """Latency and token usage of one completion, for progress output."""
+    text = f"{result.latency:.1f}s"
+    if result.first_token_latency is not None:
+        text += f" (first token {result.first_token_latency:.1f}s)"
+    text += f", {result.prompt_tokens} prompt + {result.completion_tokens} completion tokens"
+    if result.attempts > 1:
+        text += f", {result.attempts} attempts"
+    return text
+
+
+def call_gpt5(
+    system_prompt: str,
+    user_prompt: str,
+    response_format=None,
+    model: str = "gpt-5",
+    timeout: int = 120,
+    use_cache: bool = True,
+    stream: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+    validate: Optional[Callable[[str], object]] = None,
+) -> str:
     """
     Common function to call GPT-5 API.
+
+    Responses are cached on disk in `post_cache_dir("llm")`, keyed by the model, both
+    prompts and the response format, so rerunning a stage on unchanged input returns
+    instantly without a billable call. Entries expire after `POST_LLM_CACHE_TTL_DAYS`
+    (default 30) and the least recently used are dropped beyond `POST_LLM_CACHE_MB`
+    (default 200). `POST_NO_LLM_CACHE=1` disables the cache, and so does pointing the calls
+    at another server with `POST_LLM_BASE_URL`. Only replies that finished
+    normally (`finish_reason == "stop"`, not empty) and pass `validate` are cached.
+
+    Calls share one pooled client and retry rate limits, timeouts and server errors
+    with exponential backoff. For concurrent or batch work use `LlmClient` instead.
     
     Parameters
     ----------
@@ -188,6 +520,14 @@ def call_gpt5(system_prompt: str, user_prompt: str, response_format=None, model:
         The model to use (default: "gpt-5"). Can be "gpt-5-mini" for faster/cheaper responses.
     timeout:
         Request timeout in seconds (default: 120).
+    use_cache:
+        Read and write the response cache (default: True). A bypassed call still
+        refreshes the cached entry.
+    stream:
+        Stream the response; `on_delta` receives each text fragment as it arrives.
+    validate:
+        Optional check of the reply (e.g. a parser); if it raises, the reply is returned
+        but not cached, and a cached reply it rejects is discarded and requested again.
         
     Returns
     -------
@@ -199,35 +539,37 @@ def call_gpt5(system_prompt: str, user_prompt: str, response_format=None, model:
     SystemExit:
         If OPENAI_API_KEY is not set or API call fails.
     """
-    api_key = os.getenv("OPENAI_API_KEY")
+    key = _llm_cache_key(model, system_prompt, user_prompt, response_format)
+    content = _llm_cache_get_valid(key, use_cache, validate)
+    if content is not None:
+        print(f"💾 Reusing cached {model} response ({len(content)} characters, key {key[:12]}).")
+        if on_delta is not None:
+            on_delta(content)
+        return content
+
+    api_key, _ = llm_endpoint()
     if not api_key:
         print("❌ OPENAI_API_KEY environment variable is not set.")
         raise SystemExit(1)
     
     try:
         print(f"🔄 Calling OpenAI API (model: {model}, timeout: {timeout}s)...")
-        client = OpenAI(api_key=api_key, timeout=timeout)
-        kwargs = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-        }
-        
-        if response_format:
-            kwargs["response_format"] = response_format
-        
-        response = client.chat.completions.create(**kwargs)
-        content = response.choices[0].message.content
+        kwargs = _completion_kwargs(model, system_prompt, user_prompt, response_format, stream, timeout)
+        result = _complete_sync(kwargs, time.monotonic(), on_delta)
+        content = result.content
         
         # Debug output
         print(f"✅ API call successful")
-        print(f"📊 Response stats: {len(content)} characters, finish_reason: {response.choices[0].finish_reason}")
+        print(
+            f"📊 Response stats: {len(content)} characters, finish_reason: {result.finish_reason}, "
+            f"{describe_llm_result(result)}"
+        )
         
         # Show first 200 chars of response for debugging
         preview = content[:200] + "..." if len(content) > 200 else content
         print(f"📝 Response preview: {preview}")
+
+        _llm_cache_put(key, result, validate)
         
         return content
         
@@ -245,3 +587,105 @@ def call_gpt5(system_prompt: str, user_prompt: str, response_format=None, model:
         raise SystemExit(1)
 
 
+class LlmClient:
+    """
+    Async LLM client for concurrent and batch work.
+
+    All requests share one connection pool, at most `max_concurrency` are in flight,
+    and rate limits, timeouts and server errors are retried with exponential backoff.
+    Responses go through the same disk cache as `call_gpt5`. Failures raise LlmError
+    instead of exiting, and every result is kept in `results` for `report()`.
+
+    Create it inside the event loop that uses it::
+
+        async with LlmClient(max_concurrency=4) as client:
+            result = await client.complete(system_prompt, user_prompt, model="gpt-5-mini")
+    """
+
+    def __init__(self, max_concurrency: int = LLM_CONCURRENCY) -> None:
+        api_key, base_url = llm_endpoint()
+        if not api_key:
+            raise LlmError("OPENAI_API_KEY environment variable is not set.")
+        self._client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.results: List[LlmResult] = []
+
+    async def __aenter__(self) -> "LlmClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        response_format=None,
+        model: str = "gpt-5",
+        timeout: float = 120,
+        stream: bool = False,
+        on_delta: Optional[Callable[[str], None]] = None,
+        use_cache: bool = True,
+        validate: Optional[Callable[[str], object]] = None,
+    ) -> LlmResult:
+        """One completion; `validate` works as in `call_gpt5` (rejected replies are returned, not cached)."""
+        key = _llm_cache_key(model, system_prompt, user_prompt, response_format)
+        content = _llm_cache_get_valid(key, use_cache, validate)
+        if content is not None:
+            if on_delta is not None:
+                on_delta(content)
+            result = LlmResult(content=content, model=model, cached=True)
+            self.results.append(result)
+            return result
+
+        kwargs = _completion_kwargs(model, system_prompt, user_prompt, response_format, stream, timeout)
+        async with self._semaphore:
+            started = time.monotonic()
+            for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+                completion = _Completion(model, started, on_delta)
+                try:
+                    if stream:
+                        async for chunk in await self._client.chat.completions.create(**kwargs):
+                            completion.add_chunk(chunk)
+                    else:
+                        completion.add_response(await self._client.chat.completions.create(**kwargs))
+                    result = completion.finish(attempt)
+                    break
+                except Exception as e:
+                    if attempt == LLM_MAX_ATTEMPTS or completion.parts or not _retryable(e):
+                        raise LlmError(f"{model} request failed: {type(e).__name__}: {e}") from e
+                    delay = _retry_delay(attempt, e)
+                    _announce_retry(e, attempt, delay)
+                    await asyncio.sleep(delay)
+
+        _llm_cache_put(key, result, validate)
+        self.results.append(result)
+        return result
+
+    def report(self) -> str:
+        """Request count, latency percentiles, token usage, retries and cache hits so far."""
+        if not self.results:
+            return "no LLM requests"
+        live = [result for result in self.results if not result.cached]
+        parts = [f"{len(self.results)} request(s)"]
+        if live:
+            latencies = sorted(result.latency for result in live)
+            parts.append(f"latency p50 {latencies[len(latencies) // 2]:.1f}s / max {latencies[-1]:.1f}s")
+            first_tokens = sorted(result.first_token_latency for result in live if result.first_token_latency is not None)
+            if first_tokens:
+                parts.append(f"first token p50 {first_tokens[len(first_tokens) // 2]:.1f}s")
+            parts.append(
+                f"{sum(result.prompt_tokens for result in live)} prompt + "
+                f"{sum(result.completion_tokens for result in live)} completion tokens"
+            )
+            retries = sum(result.attempts - 1 for result in live)
+            if retries:
+                parts.append(f"{retries} retried attempt(s)")
+        cached = len(self.results) - len(live)
+        if cached:
+            parts.append(f"{cached} from cache")
+        return ", ".join(parts)
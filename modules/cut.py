@@ -9,6 +9,7 @@ if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
 from .common import StageEnvironment, build_cli_parser, find_preferred_rough_video
+from .remap import write_segment_map
 
 try:
     from video_editing import (
@@ -165,6 +166,8 @@ def cut_ranges(
     except (ValueError, RuntimeError) as e:
         env.abort(str(e))
     
+    map_file = write_segment_map(output_video, input_video, keep_segments)
+    print(f"🧭 post -cut: recorded {len(keep_segments)} keep segment(s) in '{map_file.name}'.")
     print(f"✅ post -cut: wrote cut video to '{output_video.name}'.")
 
 
@@ -250,6 +253,8 @@ def run(args):
           
     Output:
         - Generates `<title>-<take>-intra-rough-cut.mp4`
+        - Writes `<title>-<take>-intra-rough-cut.segments.json` for `post -remap`, so the
+          rough cut's transcript can be reused instead of transcribing the cut
         
     Examples:
         # Cut out two ranges: 10.5s-15.2s and 30s-35.5s
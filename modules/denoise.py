@@ -1,20 +1,35 @@
+from __future__ import annotations
+
+import os
 import sys
 import argparse
+import threading
+import time
 from pathlib import Path
 import subprocess
 import tempfile
 import shutil
 from abc import ABC, abstractmethod
-from typing import Tuple
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 MODULE_DIR = Path(__file__).resolve().parent
 if str(MODULE_DIR) not in sys.path:
     sys.path.insert(0, str(MODULE_DIR))
 
 try:
-    from .common import StageEnvironment  # type: ignore[attr-defined]
+    from .common import StageEnvironment, post_cache_dir  # type: ignore[attr-defined]
+    from .model_cache import load_deepfilternet, load_dns64  # type: ignore[attr-defined]
+    from .pcm_cache import load_audio, native_pcm  # type: ignore[attr-defined]
+    from .serve_models import ModelDaemonError, daemon_request, daemon_status  # type: ignore[attr-defined]
 except ImportError:  # pragma: no cover - handles execution as a standalone script
-    from common import StageEnvironment  # type: ignore[attr-defined]
+    from common import StageEnvironment, post_cache_dir  # type: ignore[attr-defined]
+    from model_cache import load_deepfilternet, load_dns64  # type: ignore[attr-defined]
+    from pcm_cache import load_audio, native_pcm  # type: ignore[attr-defined]
+    from serve_models import ModelDaemonError, daemon_request, daemon_status  # type: ignore[attr-defined]
 
 
 ##############################################################################
@@ -24,40 +39,125 @@ except ImportError:  # pragma: no cover - handles execution as a standalone scri
 
 class DenoiserBackend(ABC):
     """Abstract base class for different denoising models."""
-    
+
+    #: Whether inference runs on PyTorch's intra-op thread pool.
+    torch_inference = False
+
+    def __init__(self) -> None:
+        self.intra_op_threads = 0
+        self.inter_op_threads = 0
+        self._loaded = False
+
     @property
     @abstractmethod
     def name(self) -> str:
         """Human-readable name of the denoiser."""
         pass
-    
+
     @property
     def required_sample_rate(self) -> int:
         """Sample rate required by the model."""
         pass
-    
+
     @abstractmethod
     def check_dependencies(self, env: StageEnvironment) -> None:
         """Check that required dependencies are installed."""
         pass
-    
+
+    def configure(
+        self,
+        *,
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ) -> None:
+        """
+        Apply runtime settings before the model is loaded.
+
+        Thread counts of 0 leave the runtime defaults untouched. Quantization only
+        applies to ONNX backends and is ignored here.
+        """
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> float:
+        """
+        Load the model once and keep it on the backend instance.
+
+        Returns the number of seconds spent loading (0.0 when already loaded).
+        """
+        if self._loaded:
+            return 0.0
+        start_time = time.time()
+        self._load()
+        self._loaded = True
+        return time.time() - start_time
+
     @abstractmethod
-    def denoise(self, input_audio: Path, output_audio: Path, env: StageEnvironment) -> None:
-        """Apply denoising to the audio file."""
+    def _load(self) -> None:
+        """Load model weights (called at most once per backend instance)."""
         pass
 
+    @abstractmethod
+    def enhance(self, audio: np.ndarray) -> np.ndarray:
+        """Denoise mono float32 samples at `required_sample_rate` and return the same length."""
+        pass
+
+    def _apply_torch_threads(self) -> None:
+        import torch
+
+        if self.intra_op_threads > 0:
+            torch.set_num_threads(self.intra_op_threads)
+        if self.inter_op_threads > 0:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                # Can only be set once per process, before any inter-op work starts.
+                pass
+
+    def _channel_threads(self, threads: int) -> int:
+        """`threads`, capped by an explicit --intra-op-threads setting (0 keeps the runtime default)."""
+        if self.intra_op_threads > 0 and threads > 0:
+            return min(self.intra_op_threads, threads)
+        return threads
+
+    def share_cores(self, threads: int) -> Optional[int]:
+        """
+        Size inference for several channels running concurrently, `threads` cores each.
+
+        PyTorch's intra-op thread count is process-wide, so this is called once, before the
+        channel workers start, rather than from each worker. Returns the previous setting
+        (pass it back to restore), or None when nothing changed.
+        """
+        if not self.torch_inference:
+            return None
+        import torch
+
+        previous = torch.get_num_threads()
+        threads = self._channel_threads(threads)
+        if threads == previous:
+            return None
+        torch.set_num_threads(threads)
+        return previous
+
 
 class FacebookDenoiser(DenoiserBackend):
     """Facebook's Denoiser (DNS64) - Good noise removal, may muffle slightly."""
-    
+
+    torch_inference = True
+
     @property
     def name(self) -> str:
         return "Facebook DNS64"
-    
+
     @property
     def required_sample_rate(self) -> int:
         return 16000
-    
+
     def check_dependencies(self, env: StageEnvironment) -> None:
         try:
             import torch  # noqa: F401
@@ -68,64 +168,67 @@ class FacebookDenoiser(DenoiserBackend):
                 f"Required library is not installed: {e}. "
                 "Install with: pip3 install denoiser torch soundfile"
             )
-    
-    def denoise(self, input_audio: Path, output_audio: Path, env: StageEnvironment) -> None:
-        print(f"🧹 post -denoise: removing noise with {self.name}...")
-        
-        try:
-            import time
-            import torch
-            import numpy as np
-            import soundfile as sf
-            from denoiser import pretrained
-            from denoiser.dsp import convert_audio
-            
-            start_time = time.time()
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            
-            print("📥 post -denoise: loading model...")
-            model = pretrained.dns64().to(device)
-            model.eval()
-            model_load_time = time.time()
-            
-            print("📂 post -denoise: reading audio...")
-            wav_np, sr = sf.read(str(input_audio), dtype="float32", always_2d=True)
-            wav_tensor = torch.from_numpy(np.transpose(wav_np)).to(device)
-            wav_tensor = convert_audio(wav_tensor, sr, model.sample_rate, model.chin)
-            
-            processing_start = time.time()
-            print(f"🔄 post -denoise: processing ({wav_tensor.shape[-1] / model.sample_rate:.1f}s)...")
-            
-            with torch.no_grad():
-                denoised = model(wav_tensor.unsqueeze(0))[0]
-            
-            inference_end = time.time()
-            
-            denoised_np = denoised.cpu().transpose(0, 1).numpy()
-            print("💾 post -denoise: writing output...")
-            sf.write(str(output_audio), denoised_np, model.sample_rate)
-            
-            print(
-                f"✨ post -denoise: complete "
-                f"(load: {model_load_time - start_time:.1f}s, "
-                f"process: {inference_end - processing_start:.1f}s)"
+
+    def _load(self) -> None:
+        import torch
+
+        self._apply_torch_threads()
+        self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self._model = load_dns64().to(self._device)
+        self._model.eval()
+
+    def enhance(self, audio: np.ndarray) -> np.ndarray:
+        import torch
+
+        wav_tensor = torch.from_numpy(audio).to(self._device).view(1, 1, -1)
+        with torch.no_grad():
+            denoised = self._model(wav_tensor)[0, 0]
+        return denoised.cpu().numpy()
+
+
+class _DeepFilterStateMixin:
+    """
+    Hands out one DeepFilterLib state per thread.
+
+    The Rust STFT state keeps analysis/synthesis buffers and cannot be shared between
+    channels that are denoised concurrently.
+    """
+
+    def _adopt_df_state(self, state) -> None:
+        """Reuse the state created alongside the model for the loading thread."""
+        self.__dict__.setdefault("_df_local", threading.local()).state = state
+
+    def _thread_df_state(self):
+        local = self.__dict__.setdefault("_df_local", threading.local())
+        state = getattr(local, "state", None)
+        if state is None:
+            from df.model import ModelParams
+            from libdf import DF
+
+            params = ModelParams()
+            state = local.state = DF(
+                sr=params.sr,
+                fft_size=params.fft_size,
+                hop_size=params.hop_size,
+                nb_bands=params.nb_erb,
+                min_nb_erb_freqs=params.min_nb_freqs,
             )
-        except Exception as e:
-            import traceback
-            env.abort(f"Denoising failed: {e}\n{traceback.format_exc()}")
+        return state
 
 
-class DeepFilterNet(DenoiserBackend):
+class DeepFilterNet(_DeepFilterStateMixin, DenoiserBackend):
     """DeepFilterNet3 - Better speech clarity preservation, less muffling."""
-    
+
+    torch_inference = True
+
     @property
     def name(self) -> str:
         return "DeepFilterNet3"
-    
+
     @property
     def required_sample_rate(self) -> int:
         return 48000
-    
+
     def check_dependencies(self, env: StageEnvironment) -> None:
         try:
             import torch  # noqa: F401
@@ -136,55 +239,512 @@ class DeepFilterNet(DenoiserBackend):
                 f"Required library is not installed: {e}. "
                 "Install with: pip3 install deepfilternet torch soundfile"
             )
-    
-    def denoise(self, input_audio: Path, output_audio: Path, env: StageEnvironment) -> None:
-        print(f"🧹 post -denoise: removing noise with {self.name}...")
-        
+
+    def _load(self) -> None:
+        import torch
+
+        self._apply_torch_threads()
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model, df_state = load_deepfilternet()
+        self._adopt_df_state(df_state)
+        self._model = model.to(device)
+
+    def enhance(self, audio: np.ndarray) -> np.ndarray:
+        import torch
+        from df.enhance import enhance
+
+        enhanced = enhance(self._model, self._thread_df_state(), torch.from_numpy(audio).unsqueeze(0))
+        return enhanced[0].numpy()
+
+
+##############################################################################
+# ONNX Runtime Backends
+##############################################################################
+
+
+class OnnxDenoiserBackend(DenoiserBackend):
+    """
+    Base class for ONNX Runtime variants of the PyTorch denoisers.
+
+    The PyTorch model is exported once into the shared cache (`post_cache_dir("onnx")`),
+    optionally followed by dynamic int8 quantization, and then served by an
+    `onnxruntime.InferenceSession` with explicit thread settings.
+    """
+
+    #: Registry key of the PyTorch backend this model is exported from.
+    reference_model: str = ""
+    #: File stem used for the exported model inside the cache.
+    export_name: str = ""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.quantize = False
+        self._session = None
+        self._model_file: Optional[Path] = None
+        # One session per intra-op thread count (0 = runtime default); `_session` is the active one.
+        self._sessions: Dict[int, object] = {}
+        self._session_threads = 0
+
+    def configure(
+        self,
+        *,
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ) -> None:
+        super().configure(intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+        if quantize != self.quantize:
+            self._loaded = False
+        self.quantize = quantize
+
+    def _check_onnx_dependencies(self, env: StageEnvironment) -> None:
         try:
-            import time
-            import torch
-            from df.enhance import enhance, init_df, load_audio, save_audio
-            
-            start_time = time.time()
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            
-            print("📥 post -denoise: loading model...")
-            model, df_state, _ = init_df(config_allow_defaults=True)
-            model = model.to(device)
-            model_load_time = time.time()
-            
-            print("📂 post -denoise: reading audio...")
-            audio, metadata = load_audio(str(input_audio), sr=df_state.sr())
-            sample_rate = df_state.sr()
-            
-            processing_start = time.time()
-            duration_seconds = audio.shape[-1] / sample_rate
-            print(f"🔄 post -denoise: processing ({duration_seconds:.1f}s)...")
-            
-            enhanced = enhance(model, df_state, audio)
-            
-            inference_end = time.time()
-            
-            print("💾 post -denoise: writing output...")
-            save_audio(str(output_audio), enhanced, sample_rate)
-            
-            print(
-                f"✨ post -denoise: complete "
-                f"(load: {model_load_time - start_time:.1f}s, "
-                f"process: {inference_end - processing_start:.1f}s)"
+            import onnx  # noqa: F401
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            env.abort(
+                f"Required library is not installed: {e}. "
+                "Install with: pip3 install onnx onnxruntime"
+            )
+
+    def model_path(self) -> Path:
+        """Location of the (possibly quantized) ONNX model inside the cache."""
+        suffix = "-int8" if self.quantize else ""
+        return post_cache_dir("onnx") / f"{self.export_name}{suffix}.onnx"
+
+    @abstractmethod
+    def _export(self, destination: Path) -> None:
+        """Export the float32 PyTorch model to `destination`."""
+        pass
+
+    def _ensure_exported(self) -> Path:
+        float_path = post_cache_dir("onnx") / f"{self.export_name}.onnx"
+        if not float_path.exists():
+            print(f"📦 post -denoise: exporting {self.name} to ONNX (first run only)...")
+            partial = float_path.with_suffix(".onnx.partial")
+            self._export(partial)
+            partial.replace(float_path)
+
+        if not self.quantize:
+            return float_path
+
+        quantized_path = self.model_path()
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"🗜️  post -denoise: quantizing {self.name} weights to int8 (first run only)...")
+            partial = quantized_path.with_suffix(".onnx.partial")
+            quantize_dynamic(str(float_path), str(partial), weight_type=QuantType.QInt8)
+            partial.replace(quantized_path)
+        return quantized_path
+
+    def _create_session(self, model_file: Path, intra_op_threads: int):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        if self.inter_op_threads > 0:
+            options.inter_op_num_threads = self.inter_op_threads
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        return ort.InferenceSession(
+            str(model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def _open_session(self, model_file: Path) -> None:
+        self._model_file = model_file
+        self._session_threads = self.intra_op_threads
+        self._session = self._create_session(model_file, self._session_threads)
+        self._sessions = {self._session_threads: self._session}
+
+    def share_cores(self, threads: int) -> Optional[int]:
+        """
+        Switch to a session whose intra-op pool is sized for one of several concurrent channels.
+
+        A session's thread pool is fixed when it is created and shared by every thread
+        calling `run`, so the per-channel session is created once and kept for later files.
+        """
+        if self._model_file is None:
+            return None
+        threads = self._channel_threads(threads)
+        previous = self._session_threads
+        if threads == previous:
+            return None
+        if threads not in self._sessions:
+            self._sessions[threads] = self._create_session(self._model_file, threads)
+        self._session, self._session_threads = self._sessions[threads], threads
+        return previous
+
+
+class OnnxFacebookDenoiser(OnnxDenoiserBackend):
+    """Facebook DNS64 exported to ONNX and run with ONNX Runtime."""
+
+    reference_model = "facebook"
+    export_name = "dns64"
+
+    @property
+    def name(self) -> str:
+        return "Facebook DNS64 (ONNX)" + (" int8" if self.quantize else "")
+
+    @property
+    def required_sample_rate(self) -> int:
+        return 16000
+
+    def check_dependencies(self, env: StageEnvironment) -> None:
+        DENOISERS[self.reference_model].check_dependencies(env)
+        self._check_onnx_dependencies(env)
+
+    def _export(self, destination: Path) -> None:
+        import torch
+
+        model = load_dns64().eval()
+        # Export on a valid length so Demucs' internal padding traces to a no-op;
+        # enhance() pads every input to a valid length before inference.
+        example = torch.zeros(1, 1, model.valid_length(4 * self.required_sample_rate))
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                example,
+                str(destination),
+                input_names=["noisy"],
+                output_names=["clean"],
+                dynamic_axes={"noisy": {2: "samples"}, "clean": {2: "samples"}},
+                opset_version=17,
+            )
+
+    def _load(self) -> None:
+        from denoiser.demucs import Demucs
+
+        # An uninitialised Demucs with the DNS64 hyper-parameters only answers valid_length().
+        self._valid_length = Demucs(hidden=64).valid_length
+        self._open_session(self._ensure_exported())
+
+    def enhance(self, audio: np.ndarray) -> np.ndarray:
+        import numpy as np
+
+        length = audio.shape[-1]
+        padded = np.zeros((1, 1, self._valid_length(length)), dtype=np.float32)
+        padded[0, 0, :length] = audio
+        clean = self._session.run(["clean"], {"noisy": padded})[0]
+        return clean[0, 0, :length]
+
+
+class OnnxDeepFilterNet(_DeepFilterStateMixin, OnnxDenoiserBackend):
+    """
+    DeepFilterNet3 exported to ONNX.
+
+    Feature extraction and synthesis still run through DeepFilterLib (Rust); only the
+    neural network itself is executed by ONNX Runtime.
+    """
+
+    reference_model = "deepfilter"
+    export_name = "deepfilternet3"
+
+    @property
+    def name(self) -> str:
+        return "DeepFilterNet3 (ONNX)" + (" int8" if self.quantize else "")
+
+    @property
+    def required_sample_rate(self) -> int:
+        return 48000
+
+    def check_dependencies(self, env: StageEnvironment) -> None:
+        DENOISERS[self.reference_model].check_dependencies(env)
+        self._check_onnx_dependencies(env)
+
+    def _df_model(self):
+        from df.model import ModelParams
+
+        model, df_state = load_deepfilternet()
+        self._nb_df = getattr(model, "nb_df", getattr(model, "df_bins", ModelParams().nb_df))
+        return model.cpu().eval(), df_state
+
+    def _export(self, destination: Path) -> None:
+        import torch
+        from df.enhance import df_features
+
+        model, df_state = self._torch_model, self._thread_df_state()
+        example_audio = torch.zeros(1, 4 * self.required_sample_rate)
+        spec, erb_feat, spec_feat = df_features(example_audio, df_state, self._nb_df, device="cpu")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (spec, erb_feat, spec_feat),
+                str(destination),
+                input_names=["spec", "feat_erb", "feat_spec"],
+                output_names=["enhanced", "mask", "lsnr", "coefs"],
+                dynamic_axes={
+                    "spec": {2: "frames"},
+                    "feat_erb": {2: "frames"},
+                    "feat_spec": {2: "frames"},
+                    "enhanced": {2: "frames"},
+                },
+                opset_version=17,
             )
-        except Exception as e:
-            import traceback
-            env.abort(f"Denoising failed: {e}\n{traceback.format_exc()}")
+
+    def _load(self) -> None:
+        # DeepFilterLib's state is still needed for STFT analysis/synthesis; the
+        # PyTorch model is only kept around long enough to export it on first use.
+        self._torch_model, df_state = self._df_model()
+        self._adopt_df_state(df_state)
+        try:
+            self._open_session(self._ensure_exported())
+        finally:
+            self._torch_model = None
+
+    def enhance(self, audio: np.ndarray) -> np.ndarray:
+        import torch
+        import torch.nn.functional as F
+        from df.enhance import df_features
+        from df.utils import as_complex
+
+        # Mirrors df.enhance.enhance(), swapping the model call for ONNX Runtime.
+        df_state = self._thread_df_state()
+        length = audio.shape[-1]
+        n_fft, hop = df_state.fft_size(), df_state.hop_size()
+        padded = F.pad(torch.from_numpy(audio).unsqueeze(0), (0, n_fft))
+        spec, erb_feat, spec_feat = df_features(padded, df_state, self._nb_df, device="cpu")
+        enhanced = self._session.run(
+            ["enhanced"],
+            {
+                "spec": spec.numpy(),
+                "feat_erb": erb_feat.numpy(),
+                "feat_spec": spec_feat.numpy(),
+            },
+        )[0]
+        enhanced = as_complex(torch.from_numpy(enhanced).squeeze(1))
+        output = df_state.synthesis(enhanced.numpy())
+        delay = n_fft - hop
+        return output[0, delay:length + delay]
 
 
 # Registry of available denoisers
 DENOISERS = {
     "facebook": FacebookDenoiser(),
     "deepfilter": DeepFilterNet(),
+    "facebook-onnx": OnnxFacebookDenoiser(),
+    "deepfilter-onnx": OnnxDeepFilterNet(),
 }
 
 
+##############################################################################
+# SNR Gating
+##############################################################################
+
+# Analysis frames are short enough to resolve pauses between words.
+SNR_FRAME_SECONDS = 0.02
+# Gating granularity: each block is either denoised or passed through.
+SNR_BLOCK_SECONDS = 1.0
+# Blocks on either side used to track the local noise floor.
+SNR_NOISE_CONTEXT_BLOCKS = 1
+# Context added around noisy regions so the model never starts cold on speech.
+SNR_REGION_PADDING_SECONDS = 0.5
+# Crossfade between denoised and passed-through audio at region edges.
+SNR_CROSSFADE_SECONDS = 0.05
+# Blocks whose speech-to-noise ratio is at least this high skip the model.
+DEFAULT_SKIP_SNR_DB = 35.0
+
+
+@dataclass(frozen=True)
+class SnrAnalysis:
+    """Noise floor and speech level of a mono recording, globally and per block."""
+
+    sample_rate: int
+    total_samples: int
+    block_samples: int
+    speech_level_db: float
+    noise_floor_db: float
+    block_snr_db: np.ndarray
+
+    @property
+    def snr_db(self) -> float:
+        return self.speech_level_db - self.noise_floor_db
+
+    def noisy_regions(self, skip_snr_db: float) -> List[Tuple[int, int]]:
+        """Sample ranges (padded and merged) whose blocks fall below `skip_snr_db`."""
+        import numpy as np
+
+        noisy = np.flatnonzero(self.block_snr_db < skip_snr_db)
+        if noisy.size == 0:
+            return []
+
+        padding = int(SNR_REGION_PADDING_SECONDS * self.sample_rate)
+        # Split the noisy block indices into runs of consecutive blocks.
+        breaks = np.flatnonzero(np.diff(noisy) > 1) + 1
+        regions: List[Tuple[int, int]] = []
+        for run in np.split(noisy, breaks):
+            start = max(0, int(run[0]) * self.block_samples - padding)
+            end = min(self.total_samples, (int(run[-1]) + 1) * self.block_samples + padding)
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+
+def analyse_snr(audio: np.ndarray, sample_rate: int) -> SnrAnalysis:
+    """
+    Estimate speech level, noise floor and per-block SNR in a single vectorized pass.
+
+    Frame energies are computed over non-overlapping 20 ms frames. The speech level is
+    the 95th percentile of all frames; the noise floor is the 10th percentile, both
+    globally and over a sliding window of neighbouring blocks so that noise which only
+    appears in part of a take is still caught.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    total = int(audio.shape[-1])
+    frame = max(1, int(sample_rate * SNR_FRAME_SECONDS))
+    frames_per_block = max(1, int(round(SNR_BLOCK_SECONDS / SNR_FRAME_SECONDS)))
+    block = frame * frames_per_block
+    n_blocks = max(1, -(-total // block))
+
+    padded = np.zeros(n_blocks * block, dtype=np.float64)
+    padded[:total] = audio
+    frame_db = 10.0 * np.log10(np.mean(padded.reshape(-1, frame) ** 2, axis=1) + 1e-12)
+
+    # Zero padding of the last block would read as a perfectly clean floor.
+    real_frames = max(1, -(-total // frame))
+    frame_db[real_frames:] = frame_db[real_frames - 1]
+
+    speech_level = float(np.percentile(frame_db[:real_frames], 95))
+    noise_floor = float(np.percentile(frame_db[:real_frames], 10))
+
+    context = SNR_NOISE_CONTEXT_BLOCKS
+    block_db = np.pad(frame_db.reshape(n_blocks, frames_per_block), ((context, context), (0, 0)), mode="edge")
+    windows = sliding_window_view(block_db, 2 * context + 1, axis=0).reshape(n_blocks, -1)
+    local_noise = np.percentile(windows, 10, axis=1)
+
+    return SnrAnalysis(
+        sample_rate=sample_rate,
+        total_samples=total,
+        block_samples=block,
+        speech_level_db=speech_level,
+        noise_floor_db=noise_floor,
+        block_snr_db=speech_level - local_noise,
+    )
+
+
+def gated_enhance(
+    backend: DenoiserBackend,
+    audio: np.ndarray,
+    regions: Sequence[Tuple[int, int]],
+) -> np.ndarray:
+    """Denoise only `regions`, crossfading into the untouched audio around them."""
+    import numpy as np
+
+    output = audio.copy()
+    fade = int(SNR_CROSSFADE_SECONDS * backend.required_sample_rate)
+    for start, end in regions:
+        original = audio[start:end]
+        enhanced = backend.enhance(np.ascontiguousarray(original))
+        weight = np.ones(end - start, dtype=np.float32)
+        ramp = min(fade, (end - start) // 2)
+        if ramp > 0 and start > 0:
+            weight[:ramp] = np.linspace(0.0, 1.0, ramp, dtype=np.float32)
+        if ramp > 0 and end < audio.shape[-1]:
+            weight[-ramp:] = np.minimum(weight[-ramp:], np.linspace(1.0, 0.0, ramp, dtype=np.float32))
+        output[start:end] = weight * enhanced + (1.0 - weight) * original
+    return output
+
+
+def _report_snr(analysis: SnrAnalysis, regions: Sequence[Tuple[int, int]], skip_snr_db: float) -> None:
+    total_seconds = analysis.total_samples / analysis.sample_rate
+    model_seconds = sum(end - start for start, end in regions) / analysis.sample_rate
+    clean_blocks = int((analysis.block_snr_db >= skip_snr_db).sum())
+    print(
+        f"📶 post -denoise: SNR {analysis.snr_db:.1f} dB "
+        f"(speech {analysis.speech_level_db:.1f} dBFS, noise floor {analysis.noise_floor_db:.1f} dBFS)"
+    )
+    print(
+        f"⏭  post -denoise: {clean_blocks}/{len(analysis.block_snr_db)} block(s) at or above "
+        f"{skip_snr_db:.0f} dB skip the model; {total_seconds - model_seconds:.1f}s of "
+        f"{total_seconds:.1f}s passed through untouched."
+    )
+
+
+def split_channels(audio: np.ndarray) -> List[np.ndarray]:
+    """Split soundfile-style audio (frames, or frames x channels) into contiguous mono arrays."""
+    import numpy as np
+
+    if audio.ndim == 1:
+        return [audio]
+    return [np.ascontiguousarray(audio[:, channel]) for channel in range(audio.shape[1])]
+
+
+def plan_channel_regions(
+    channels: Sequence[np.ndarray],
+    sample_rate: int,
+    skip_snr_db: float,
+    label: str = "",
+) -> List[Optional[List[Tuple[int, int]]]]:
+    """
+    Run the SNR analysis on each channel separately (each microphone has its own noise).
+
+    Returns, per channel, the noisy sample ranges to denoise: None means the whole
+    channel and an empty list means the channel is passed through untouched.
+    """
+    plans: List[Optional[List[Tuple[int, int]]]] = []
+    for index, channel in enumerate(channels):
+        analysis = analyse_snr(channel, sample_rate)
+        regions = analysis.noisy_regions(skip_snr_db)
+        heading = label
+        if len(channels) > 1:
+            heading = f"{label} channel {index + 1}/{len(channels)}".strip()
+        if heading:
+            print(f"📶 post -denoise: {heading}:")
+        _report_snr(analysis, regions, skip_snr_db)
+        plans.append(None if regions == [(0, analysis.total_samples)] else regions)
+    return plans
+
+
+def enhance_channels(
+    backend: DenoiserBackend,
+    channels: Sequence[np.ndarray],
+    regions: Optional[Sequence[Optional[Sequence[Tuple[int, int]]]]] = None,
+) -> np.ndarray:
+    """
+    Denoise every channel, concurrently when there is more than one.
+
+    Channels run on separate threads with the cores split evenly between them, so a
+    stereo file takes about as long as a mono one on a multi-core machine. Returns a
+    1-D array for mono input and a (frames, channels) array otherwise.
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+
+    plans = list(regions) if regions is not None else [None] * len(channels)
+
+    def _enhance(index: int) -> np.ndarray:
+        channel, plan = channels[index], plans[index]
+        if plan is None:
+            return backend.enhance(channel)
+        if not plan:
+            return channel
+        return gated_enhance(backend, channel, plan)
+
+    if len(channels) == 1:
+        return _enhance(0)
+
+    cores = os.cpu_count() or 1
+    workers = min(len(channels), cores)
+
+    # Thread pools belong to the process (PyTorch) or the session (ONNX Runtime), not to
+    # a thread: split the cores once, before the workers start.
+    previous = backend.share_cores(max(1, cores // workers))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="denoise-channel") as pool:
+            outputs = list(pool.map(_enhance, range(len(channels))))
+    finally:
+        if previous is not None:
+            backend.share_cores(previous)
+    return np.stack(outputs, axis=1)
+
+
 ##############################################################################
 # Helper Functions
 ##############################################################################
@@ -197,65 +757,6 @@ def _ensure_tool(tool: str, env: StageEnvironment) -> None:
         env.abort(f"Required tool '{tool}' is not installed or not in PATH.")
 
 
-def _get_audio_sample_rate(video_path: Path, env: StageEnvironment) -> int:
-    """Get the sample rate of the audio stream in the video."""
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-select_streams",
-        "a:0",
-        "-show_entries",
-        "stream=sample_rate",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(video_path),
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        env.abort(f"Failed to get audio sample rate: {result.stderr}")
-    
-    try:
-        return int(result.stdout.strip())
-    except ValueError:
-        # Default to 48kHz if we can't detect it
-        print("⚠️  post -denoise: couldn't detect sample rate, defaulting to 48000Hz")
-        return 48000
-
-
-def _extract_audio(
-    video_path: Path,
-    audio_path: Path,
-    sample_rate: int,
-    env: StageEnvironment
-) -> None:
-    """Extract audio from video file to WAV format at specified sample rate."""
-    print(f"🎵 post -denoise: extracting audio from '{video_path.name}' at {sample_rate}Hz...")
-    cmd = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-nostdin",
-        "-y",
-        "-i",
-        str(video_path),
-        "-vn",  # No video
-        "-acodec",
-        "pcm_s16le",  # 16-bit PCM
-        "-ar",
-        str(sample_rate),
-        "-ac",
-        "1",  # Mono
-        str(audio_path),
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True)
-    if result.returncode != 0:
-        env.abort(f"Failed to extract audio: {result.stderr.decode()}")
-
-
 def _resample_audio(
     input_audio: Path,
     output_audio: Path,
@@ -345,28 +846,206 @@ def _generate_output_filename(input_path: Path) -> Path:
     return input_path.parent / f"{new_stem}{suffix}"
 
 
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".mkv", ".avi", ".webm")
+
+
+def _collect_input_files(patterns: Sequence[str]) -> List[Path]:
+    """
+    Expand the CLI inputs into an ordered, de-duplicated list of videos.
+
+    Each input may be a file, a glob (quoted so the shell leaves it alone) or a directory.
+    Directories are searched recursively for videos inside `take-*` folders (or taken as
+    a take folder themselves). Outputs of earlier runs ('-denoised') are never picked up.
+    """
+    import glob
+
+    found: List[Path] = []
+    for pattern in patterns:
+        expanded = Path(pattern).expanduser()
+        if any(char in pattern for char in "*?["):
+            candidates = [Path(match) for match in sorted(glob.glob(str(expanded), recursive=True))]
+        elif expanded.is_dir():
+            take_dirs = [expanded] if expanded.name.startswith("take-") else []
+            take_dirs += sorted(path for path in expanded.rglob("take-*") if path.is_dir())
+            candidates = [path for take_dir in take_dirs for path in sorted(take_dir.iterdir())]
+            candidates = [path for path in candidates if path.suffix.lower() in VIDEO_EXTENSIONS]
+        else:
+            candidates = [expanded]
+
+        for candidate in candidates:
+            if candidate.is_dir() or "-denoised" in candidate.stem:
+                continue
+            resolved = candidate.resolve()
+            if resolved not in found:
+                found.append(resolved)
+    return found
+
+
+@dataclass
+class _DenoiseJob:
+    """State of one file moving through extract → denoise → mux."""
+
+    input_file: Path
+    output_file: Path
+    temp_dir: Path
+    original_sample_rate: int = 0
+    duration: float = 0.0
+    channels: Optional[List[np.ndarray]] = None
+    regions: Optional[List[Optional[List[Tuple[int, int]]]]] = None
+    passthrough: bool = False
+    model_seconds: float = 0.0
+    started: float = 0.0
+    wall_seconds: float = 0.0
+
+
+def _prepare_job(
+    job: _DenoiseJob,
+    denoiser: DenoiserBackend,
+    skip_snr_db: Optional[float],
+    keep_channels: bool,
+    env: StageEnvironment,
+) -> _DenoiseJob:
+    """Read and analyse the audio of one file from the shared PCM cache (runs on the worker pool)."""
+    job.started = time.time()
+    try:
+        job.original_sample_rate = native_pcm(job.input_file).sample_rate
+        print(f"🎵 post -denoise: reading '{job.input_file.name}' at {denoiser.required_sample_rate}Hz...")
+        audio, _ = load_audio(job.input_file, denoiser.required_sample_rate, None if keep_channels else 1)
+    except RuntimeError as e:
+        env.abort(f"Failed to extract audio: {e}")
+    job.channels = split_channels(audio)
+    job.duration = job.channels[0].shape[0] / denoiser.required_sample_rate
+
+    if skip_snr_db is not None:
+        job.regions = plan_channel_regions(
+            job.channels, denoiser.required_sample_rate, skip_snr_db, label=f"'{job.input_file.name}'"
+        )
+        job.passthrough = all(plan == [] for plan in job.regions)
+    return job
+
+
+def _denoise_with_daemon(job: _DenoiseJob, model: str, quantize: bool) -> bool:
+    """
+    Hand one prepared job to `post -serve-models`; the daemon writes `denoised.wav`.
+
+    Returns False when the daemon is gone or failed, so the caller can run the model itself.
+    """
+    import numpy as np
+    import soundfile as sf
+
+    extracted_audio = job.temp_dir / "extracted.wav"
+    channels = job.channels[0] if len(job.channels) == 1 else np.stack(job.channels, axis=1)
+    sf.write(str(extracted_audio), channels, DENOISERS[model].required_sample_rate)
+    try:
+        reply = daemon_request(
+            {
+                "op": "denoise",
+                "model": model,
+                "quantize": quantize,
+                "input": str(extracted_audio),
+                "output": str(job.temp_dir / "denoised.wav"),
+                "regions": job.regions,
+            }
+        )
+    except ModelDaemonError as e:
+        print(f"⚠️  post -denoise: model daemon failed ({e}); falling back to an in-process model.")
+        return False
+    if reply is None:
+        print("⚠️  post -denoise: model daemon stopped; falling back to an in-process model.")
+        return False
+    print(f"🛰️  post -denoise: daemon waited {reply['queue_ms']:.0f}ms, ran {reply['run_ms'] / 1000.0:.1f}s.")
+    return True
+
+
+def _finish_job(job: _DenoiseJob, denoised: Optional[np.ndarray], sample_rate: int, env: StageEnvironment) -> _DenoiseJob:
+    """
+    Resample the denoised audio and mux it back into the video (runs on the worker pool).
+
+    `denoised` is None when the model daemon already wrote `denoised.wav`.
+    """
+    try:
+        if job.passthrough:
+            print(f"✨ post -denoise: '{job.input_file.name}' is already clean; copying without model inference.")
+            shutil.copy2(str(job.input_file), str(job.output_file))
+        else:
+            denoised_audio = job.temp_dir / "denoised.wav"
+            if denoised is not None:
+                import soundfile as sf
+
+                sf.write(str(denoised_audio), denoised, sample_rate)
+
+            # Resample back to original sample rate (prevents sync drift)
+            resampled_audio = job.temp_dir / "resampled.wav"
+            _resample_audio(denoised_audio, resampled_audio, job.original_sample_rate, env)
+
+            output_video = job.temp_dir / "output.mp4"
+            _replace_audio_in_video(job.input_file, resampled_audio, output_video, env)
+            shutil.move(str(output_video), str(job.output_file))
+        print(f"✅ post -denoise: successfully created '{job.output_file.name}'.")
+    finally:
+        shutil.rmtree(job.temp_dir, ignore_errors=True)
+        job.channels = None
+        job.wall_seconds = time.time() - job.started
+    return job
+
+
+def _report_batch(jobs: Sequence[_DenoiseJob], load_seconds: float, total_wall: float) -> None:
+    print("\n📊 post -denoise: real-time factor (processing time / audio duration, lower is faster)")
+    for job in jobs:
+        model_rtf = job.model_seconds / job.duration if job.duration else 0.0
+        mode = "skipped" if job.passthrough else f"model {job.model_seconds:6.1f}s (RTF {model_rtf:.3f})"
+        print(f"   • {job.input_file.name}: {job.duration:7.1f}s audio, {mode}, wall {job.wall_seconds:6.1f}s")
+
+    total_audio = sum(job.duration for job in jobs)
+    total_model = sum(job.model_seconds for job in jobs)
+    if total_audio > 0:
+        print(
+            f"   Σ {len(jobs)} file(s), {total_audio:.1f}s audio: model RTF {total_model / total_audio:.3f}, "
+            f"end-to-end RTF {total_wall / total_audio:.3f} "
+            f"({total_wall:.1f}s wall, model loaded once in {load_seconds:.1f}s)"
+        )
+
+
 def run(args):
     """
-    Remove background noise from audio in a video file using AI denoising models.
+    Remove background noise from audio in video files using AI denoising models.
     
-    This command processes a specific file and creates a new denoised version.
-    The video stream is preserved without re-encoding.
+    This command processes one or more files and creates a new denoised version of each.
+    The video stream is preserved without re-encoding. The model is loaded once for the
+    whole batch; a worker pool extracts the next file's audio and muxes finished files
+    while the model runs.
     
     Available Models:
         - deepfilter (default): DeepFilterNet3 - Better speech clarity, less muffling
         - facebook: Facebook DNS64 - Good noise removal, may muffle slightly
+        - deepfilter-onnx / facebook-onnx: the same models exported to ONNX Runtime,
+          optionally with dynamic int8 quantization (--quantize)
     
     Dependencies:
         - For deepfilter: pip3 install deepfilternet torch soundfile
         - For facebook: pip3 install denoiser torch soundfile
+        - For the -onnx variants additionally: pip3 install onnx onnxruntime
     
     Usage:
         post -denoise <video_file>
         post -denoise <video_file> --model facebook
+        post -denoise <video_file> --model deepfilter-onnx --quantize --intra-op-threads 8
+        post -denoise take-*/*-rough.mp4
+        post -denoise 'session/**/*-rough.mp4'
+        post -denoise session/            # every video inside take-* folders
+        post -denoise dual-mic-rough.mp4 --keep-channels
+    
+    SNR gating:
+        - A vectorized analysis pass estimates the noise floor and speech SNR per block.
+        - Blocks at or above --skip-snr dB are passed through without model inference;
+          if the whole file is clean, the video is copied unchanged.
+        - Use --no-snr-gate to always denoise the full file.
     
     Output:
         - Creates a new file with '-denoised' inserted before the last tag.
         - Example: 'video-rough.mp4' -> 'video-denoised-rough.mp4'
+        - Files whose output already exists are skipped.
+        - Reports per-file and aggregate real-time factor.
     """
     parser = argparse.ArgumentParser(
         prog="post -denoise",
@@ -374,9 +1053,9 @@ def run(args):
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument(
-        "file",
-        type=str,
-        help="Path to the video file to denoise.",
+        "files",
+        nargs="+",
+        help="Video files, quoted globs, or directories containing take-* folders.",
     )
     parser.add_argument(
         "--model",
@@ -386,85 +1065,181 @@ def run(args):
         choices=list(DENOISERS.keys()),
         help="Denoising model to use.",
     )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Use dynamic int8 quantization (ONNX models only).",
+    )
+    parser.add_argument(
+        "--intra-op-threads",
+        type=int,
+        default=0,
+        help="Threads used inside a single operator (0 = runtime default).",
+    )
+    parser.add_argument(
+        "--inter-op-threads",
+        type=int,
+        default=0,
+        help="Threads used to run independent operators in parallel (0 = runtime default).",
+    )
+    parser.add_argument(
+        "--skip-snr",
+        type=float,
+        default=DEFAULT_SKIP_SNR_DB,
+        help="Pass audio with a speech-to-noise ratio at or above this many dB through without denoising.",
+    )
+    parser.add_argument(
+        "--no-snr-gate",
+        action="store_true",
+        help="Always run the model over the whole file, even when the audio is already clean.",
+    )
+    parser.add_argument(
+        "--keep-channels",
+        action="store_true",
+        help="Keep the original channel layout and denoise each channel in parallel instead of downmixing to mono.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=2,
+        help="Worker threads for audio extraction and muxing around the model.",
+    )
     
     parsed = parser.parse_args(args)
     
-    # Resolve the input file path
-    input_file = Path(parsed.file).expanduser().resolve()
-    
-    if not input_file.exists():
-        print(f"❌ post -denoise: file '{input_file}' does not exist.")
-        raise SystemExit(1)
-    
-    if not input_file.is_file():
-        print(f"❌ post -denoise: '{input_file}' is not a file.")
-        raise SystemExit(1)
-    
-    # Generate output filename
-    output_file = _generate_output_filename(input_file)
-    
-    # Check if output file already exists
-    if output_file.exists():
-        print(f"❌ post -denoise: output file '{output_file.name}' already exists.")
-        raise SystemExit(1)
-    
     # Create environment for safety checks
     env = StageEnvironment.create(
         stage="denoise",
-        directory=str(input_file.parent),
+        directory=".",
         auto_confirm=True,
     )
     
+    input_files = _collect_input_files(parsed.files)
+    if not input_files:
+        env.abort(f"No video files matched: {' '.join(parsed.files)}")
+    
+    jobs: List[_DenoiseJob] = []
+    for input_file in input_files:
+        if not input_file.is_file():
+            env.abort(f"file '{input_file}' does not exist.")
+        output_file = _generate_output_filename(input_file)
+        if output_file.exists():
+            print(f"⏭  post -denoise: output file '{output_file.name}' already exists; skipping '{input_file.name}'.")
+            continue
+        jobs.append(_DenoiseJob(input_file=input_file, output_file=output_file, temp_dir=Path()))
+    
+    if not jobs:
+        env.abort("Nothing to do: every output already exists.")
+    if parsed.jobs < 1:
+        env.abort("--jobs must be at least 1.")
+    
     # Check for required tools
     _ensure_tool("ffmpeg", env)
     _ensure_tool("ffprobe", env)
     
+    # Prefer resident models from `post -serve-models`; its status lists what it can run.
+    model_name = parsed.model
+    daemon = daemon_status()
+    if daemon is not None:
+        if model_name not in daemon["denoisers"] and model_name.replace("deepfilter", "facebook") in daemon["denoisers"]:
+            print("⚠️  DeepFilterNet not available in the model daemon, falling back to Facebook denoiser...")
+            model_name = model_name.replace("deepfilter", "facebook")
+        if model_name in daemon["denoisers"]:
+            print(f"🛰️  post -denoise: using resident models from 'post -serve-models' (queue depth {daemon['queue_depth']}).")
+        else:
+            daemon = None
+    use_daemon = daemon is not None
+    
     # Get the selected denoiser backend and check dependencies
-    denoiser = DENOISERS[parsed.model]
+    denoiser = DENOISERS[model_name]
     
     # Check if dependencies are available, fallback if needed
     try:
-        denoiser.check_dependencies(env)
+        if not use_daemon:
+            denoiser.check_dependencies(env)
     except (SystemExit, Exception) as e:
-        if parsed.model == "deepfilter":
+        if model_name.startswith("deepfilter"):
             print("⚠️  DeepFilterNet not available, falling back to Facebook denoiser...")
             print("   (Install Rust and deepfilternet, or run ./install.sh)")
-            denoiser = DENOISERS["facebook"]
+            model_name = model_name.replace("deepfilter", "facebook")
+            denoiser = DENOISERS[model_name]
             denoiser.check_dependencies(env)
         else:
             raise
     
-    print(f"🔍 post -denoise: processing '{input_file.name}'...")
+    if parsed.quantize and not isinstance(denoiser, OnnxDenoiserBackend):
+        print("⚠️  post -denoise: --quantize only applies to the -onnx models; ignoring.")
+    denoiser.configure(
+        quantize=parsed.quantize,
+        intra_op_threads=parsed.intra_op_threads,
+        inter_op_threads=parsed.inter_op_threads,
+    )
+    
+    print(f"🔍 post -denoise: processing {len(jobs)} file(s)...")
     print(f"🎯 post -denoise: using {denoiser.name}")
-    print(f"📝 post -denoise: will create '{output_file.name}'")
+    for job in jobs:
+        print(f"📝 post -denoise: will create '{job.output_file.name}'")
     
-    # Get the original audio sample rate to preserve sync
-    original_sample_rate = _get_audio_sample_rate(input_file, env)
-    print(f"📊 post -denoise: original audio sample rate: {original_sample_rate}Hz")
+    from concurrent.futures import ThreadPoolExecutor
     
-    # Use a temporary directory for intermediate files
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        
-        # Step 1: Extract audio at model's required sample rate
-        extracted_audio = temp_path / "extracted.wav"
-        _extract_audio(input_file, extracted_audio, denoiser.required_sample_rate, env)
-        
-        # Step 2: Denoise using selected backend
-        denoised_audio = temp_path / "denoised.wav"
-        denoiser.denoise(extracted_audio, denoised_audio, env)
-        
-        # Step 3: Resample back to original sample rate (prevents sync drift)
-        resampled_audio = temp_path / "resampled.wav"
-        _resample_audio(denoised_audio, resampled_audio, original_sample_rate, env)
-        
-        # Step 4: Replace audio in video
-        output_video = temp_path / "output.mp4"
-        _replace_audio_in_video(input_file, resampled_audio, output_video, env)
-        
-        # Step 5: Save to new file
-        print(f"💾 post -denoise: saving denoised video...")
-        shutil.move(str(output_video), str(output_file))
+    skip_snr_db = None if parsed.no_snr_gate else parsed.skip_snr
+    batch_start = time.time()
+    load_seconds = 0.0
+    failed: List[Path] = []
     
-    print(f"✅ post -denoise: successfully created '{output_file.name}'.")
-
+    with ThreadPoolExecutor(max_workers=parsed.jobs, thread_name_prefix="denoise-io") as pool:
+        def _submit_prepare(job: _DenoiseJob):
+            job.temp_dir = Path(tempfile.mkdtemp(prefix="post-denoise-"))
+            return pool.submit(_prepare_job, job, denoiser, skip_snr_db, parsed.keep_channels, env)
+    
+        # Keep up to --jobs files extracted ahead of the model.
+        prepared = [_submit_prepare(job) for job in jobs[: parsed.jobs]]
+        if skip_snr_db is None and not use_daemon:
+            # Every file needs the model, so load it while the first extractions run.
+            print("📥 post -denoise: loading model (once for the whole batch)...")
+            load_seconds = denoiser.load()
+        finishing = []
+        for index, job in enumerate(jobs):
+            if index + parsed.jobs < len(jobs):
+                prepared.append(_submit_prepare(jobs[index + parsed.jobs]))
+            try:
+                prepared[index].result()
+                denoised = None
+                if not job.passthrough:
+                    print(
+                        f"🧹 post -denoise: removing noise from '{job.input_file.name}' "
+                        f"({job.duration:.1f}s, {len(job.channels)} channel(s))..."
+                    )
+                    model_start = time.time()
+                    if use_daemon:
+                        use_daemon = _denoise_with_daemon(job, model_name, parsed.quantize)
+                        if not use_daemon:
+                            denoiser.check_dependencies(env)
+                    if not use_daemon:
+                        if not denoiser.is_loaded:
+                            print("📥 post -denoise: loading model (once for the whole batch)...")
+                            load_seconds = denoiser.load()
+                        denoised = enhance_channels(denoiser, job.channels, job.regions)
+                    job.model_seconds = time.time() - model_start
+            except (SystemExit, Exception) as e:
+                details = "see above" if isinstance(e, SystemExit) else str(e)
+                print(f"❌ post -denoise: '{job.input_file.name}' failed ({details}); continuing with the batch.")
+                failed.append(job.input_file)
+                shutil.rmtree(job.temp_dir, ignore_errors=True)
+                continue
+            finishing.append((job, pool.submit(_finish_job, job, denoised, denoiser.required_sample_rate, env)))
+    
+        finished = []
+        for job, future in finishing:
+            try:
+                finished.append(future.result())
+            except (SystemExit, Exception) as e:
+                details = "see above" if isinstance(e, SystemExit) else str(e)
+                print(f"❌ post -denoise: '{job.input_file.name}' failed while muxing ({details}).")
+                failed.append(job.input_file)
+    
+    _report_batch(finished, load_seconds, time.time() - batch_start)
+    
+    if failed:
+        env.abort(f"{len(failed)} file(s) failed: {', '.join(path.name for path in failed)}")
@@ -1,10 +1,52 @@
-import json
+import time
 from pathlib import Path
 
 try:
-    from .common import StageEnvironment, build_cli_parser, call_gpt5
+    from .common import StageEnvironment, build_cli_parser, call_gpt5, estimate_tokens, llm_cache_report
+    from .grouping import ends_sentence
+    from .wordstore import open_word_store
 except ImportError:
-    from common import StageEnvironment, build_cli_parser, call_gpt5
+    from common import StageEnvironment, build_cli_parser, call_gpt5, estimate_tokens, llm_cache_report
+    from grouping import ends_sentence
+    from wordstore import open_word_store
+
+
+# Transcript lines end at sentence ends, pauses this long, or this many words.
+TRANSCRIPT_BREAK_GAP_SECONDS = 1.5
+TRANSCRIPT_LINE_MAX_WORDS = 30
+
+
+def _format_timestamp(seconds: float) -> str:
+    # Round to tenths before splitting off the minutes, so 59.96 becomes 1:00.0, not 0:60.0.
+    minutes, tenths = divmod(round(max(0.0, seconds) * 10), 600)
+    return f"{minutes}:{tenths // 10:02d}.{tenths % 10}"
+
+
+def compact_transcript(words) -> str:
+    """
+    The transcript as `[m:ss.s] text` lines, one per sentence or pause-delimited phrase.
+
+    Keeps every word (fillers included) and enough timing for the guidelines' timestamp
+    ranges (a line runs until the next one starts; the last line carries its end time),
+    but drops the SRT cue numbers, millisecond start/end pairs and cue-sized fragmentation.
+    """
+    lines = []
+    first = 0
+    for index in range(len(words)):
+        word = words[index]
+        gap = words[index + 1]['start'] - word['end'] if index + 1 < len(words) else float('inf')
+        if (
+            ends_sentence(word['word'])
+            or gap >= TRANSCRIPT_BREAK_GAP_SECONDS
+            or index + 1 - first >= TRANSCRIPT_LINE_MAX_WORDS
+        ):
+            text = " ".join(words[i]['word'].strip() for i in range(first, index + 1))
+            stamp = _format_timestamp(words[first]['start'])
+            if index + 1 == len(words):
+                stamp += f"-{_format_timestamp(word['end'])}"
+            lines.append(f"[{stamp}] {text}")
+            first = index + 1
+    return "\n".join(lines)
 
 
 def run(args):
@@ -17,14 +59,29 @@ def run(args):
         - Exits safely when the timestamps or subtitle file is missing or when multiple candidates are detected.
         - Aborts if OPENAI_API_KEY is not set.
         - Prompts before overwriting `<title>-<take_id>-rough-tight-essay.txt` unless `--yes` is passed.
+        - Reuses the cached GPT-5 response when the transcript sent to it (the compact word transcript,
+          or the SRT with `--srt-input`) is unchanged; `--no-cache` forces a new call.
     Output:
         - Produces `<title>-<take_id>-rough-tight-essay.txt`, i.e., the JSON basename with
-          `-essay.txt` appended.
+          `-essay.txt` appended. The response is streamed into the file as it arrives.
+    Input:
+        - GPT-5 receives the compact transcript from the word timestamps (see
+          `compact_transcript`) rather than the raw SRT; `--srt-input` sends the SRT.
     """
     parser = build_cli_parser(
         stage="essay",
         summary="Build a human-friendly essay/transcript from the word timestamps.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Call GPT-5 even when a cached response for the same transcript input exists.",
+    )
+    parser.add_argument(
+        "--srt-input",
+        action="store_true",
+        help="Send the raw SRT instead of the compact timestamped transcript.",
+    )
     parsed = parser.parse_args(args)
 
     env = StageEnvironment.create(
@@ -53,10 +110,7 @@ def run(args):
     # Read the JSON file to sanity check availability of word timestamps
     print(f"📖 post -essay: reading word timestamps from '{json_file.name}'...")
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            word_data = json.load(f)
-        if not isinstance(word_data, list):
-            env.abort("Word timestamps JSON is not a list.")
+        word_data = open_word_store(json_file)
         print(f"📘 post -essay: verified word timestamps file contains {len(word_data)} entries.")
     except Exception as e:
         env.abort(f"Failed to read JSON file: {e}")
@@ -81,26 +135,57 @@ def run(args):
     except Exception as e:
         env.abort(f"Failed to read feedback guidelines: {e}")
 
-    # Make API call to OpenAI
+    if parsed.srt_input or not len(word_data):
+        transcript = srt_content
+        user_prompt = (
+            "Please process the following subtitle file (SRT format) according to the format "
+            "specified in your guidelines:\n\n"
+            f"{transcript}"
+        )
+    else:
+        transcript = compact_transcript(word_data)
+        user_prompt = (
+            "Please process the following transcript according to the format specified in your "
+            "guidelines. Each line is `[start] text` (minutes:seconds) and runs until the next line starts:\n\n"
+            f"{transcript}"
+        )
+    srt_tokens = estimate_tokens(srt_content)
+    input_tokens = estimate_tokens(transcript)
+    print(
+        f"📉 post -essay: transcript input is {input_tokens} tokens vs {srt_tokens} for the raw SRT "
+        f"({(1 - input_tokens / max(1, srt_tokens)):.0%} saved)."
+    )
+
+    # Make API call to OpenAI, streaming the response into the essay file
     print(f"🤖 post -essay: calling GPT-5 API...")
-    print(f"📤 post -essay: sending {len(srt_content)} characters of SRT content...")
+    print(f"📤 post -essay: sending {len(transcript)} characters of transcript...")
+    start_time = time.time()
+    first_output = []
     try:
-        essay_content = call_gpt5(
-            system_prompt=guidelines_content,
-            user_prompt=(
-                "Please process the following subtitle file (SRT format) according to the format "
-                "specified in your guidelines:\n\n"
-                f"{srt_content}"
-            ),
-            timeout=180  # 3 minutes for longer transcripts
-        )
+        with open(essay_file, "w", encoding="utf-8") as f:
+            def write_delta(delta: str) -> None:
+                if not first_output:
+                    first_output.append(time.time() - start_time)
+                    print(f"✍️  post -essay: first output after {first_output[0]:.1f}s, streaming to '{essay_file.name}'...")
+                f.write(delta)
+                f.flush()
+
+            essay_content = call_gpt5(
+                system_prompt=guidelines_content,
+                user_prompt=user_prompt,
+                timeout=180,  # 3 minutes for longer transcripts
+                use_cache=not parsed.no_cache,
+                stream=True,
+                on_delta=write_delta,
+            )
     except SystemExit:
+        essay_file.unlink(missing_ok=True)
         env.abort("GPT-5 API call failed")
-
-    # Write the essay output
-    print(f"💾 post -essay: writing essay to '{essay_file.name}'...")
-    try:
-        essay_file.write_text(essay_content, encoding="utf-8")
-        print(f"✅ post -essay: successfully created '{essay_file.name}'")
-    except Exception as e:
+    except OSError as e:
+        essay_file.unlink(missing_ok=True)
         env.abort(f"Failed to write essay file: {e}")
+
+    print(
+        f"✅ post -essay: successfully created '{essay_file.name}' ({len(essay_content)} characters in "
+        f"{time.time() - start_time:.1f}s; {llm_cache_report()})"
+    )
@@ -0,0 +1,296 @@
+"""
+Local caption grouping: the rules of `captions-guidelines.md`, applied by dynamic programming.
+
+Every way of cutting the word list into lines is scored line by line, and the cheapest
+cutting is found in O(words x MAX_LINE_WORDS). A line costs more when it:
+
+- crosses a sentence end or a long pause (never allowed),
+- is wider than the caption band or longer/shorter than 3-4 words,
+- stays on screen for less than MIN_LINE_SECONDS,
+- contains pauses, or ends in the middle of rapid-fire speech.
+
+Ending a line at punctuation or at a pause is rewarded, and a single word may stand
+alone when pauses on both sides give it time to land. The result is deterministic,
+needs no network and takes milliseconds for a 10,000-word transcript.
+
+Groupings are saved with a snapshot of the words they index (`*-grouping.words.json`).
+When the transcript changes, `plan_regroup` aligns the snapshot with the new words,
+carries over every group whose words are untouched (re-indexed), and leaves only the
+changed neighbourhoods to be grouped again.
+"""
+
+import difflib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SENTENCE_END = (".", "?", "!", "…")
+CLAUSE_END = (",", ";", ":", "—", "–")
+
+# Lines never hold more words or characters than this (a single long word is always allowed).
+MAX_LINE_WORDS = 6
+MAX_LINE_CHARS = 24
+# Pauses at least this long always end a line.
+BREAK_GAP_SECONDS = 0.8
+# Gaps shorter than this are rapid-fire speech; breaking there is penalised.
+RAPID_GAP_SECONDS = 0.2
+# Lines shown for less than this (start to next line's start) are penalised.
+MIN_LINE_SECONDS = 0.6
+
+# Cost of a line by word count: 3-4 words is the target.
+_SIZE_COST = {1: 3.0, 2: 1.0, 3: 0.0, 4: 0.0, 5: 1.5, 6: 3.5}
+_COMFORTABLE_CHARS = 18
+
+
+def _stripped(word: str) -> str:
+    return word.rstrip('"\'”’)')
+
+
+def ends_sentence(word: str) -> bool:
+    return _stripped(word).endswith(SENTENCE_END)
+
+
+def _ends_clause(word: str) -> bool:
+    return _stripped(word).endswith(CLAUSE_END)
+
+
+def group_words_locally(words: Sequence[dict], first: int = 0, stop: Optional[int] = None) -> List[dict]:
+    """
+    Group `words[first:stop]` into caption lines.
+
+    Returns `{"indices", "text"}` dicts, like the GPT grouping, with indices into `words`.
+    """
+    stop = len(words) if stop is None else stop
+    if stop <= first:
+        return []
+    window = words[first:stop]
+    texts = [word['word'].strip() for word in window]
+    starts = [float(word['start']) for word in window]
+    ends = [float(word['end']) for word in window]
+    count = len(texts)
+
+    # gaps[k]: pause after word k (the last word is followed by "forever").
+    gaps = [max(0.0, starts[k + 1] - ends[k]) for k in range(count - 1)] + [float('inf')]
+    hard_break = [ends_sentence(texts[k]) or gaps[k] >= BREAK_GAP_SECONDS for k in range(count)]
+
+    # Cost of ending a line after word k.
+    break_cost = [0.0] * count
+    for k in range(count - 1):
+        gap = gaps[k]
+        cost = -min(gap, BREAK_GAP_SECONDS) * 3.0
+        if ends_sentence(texts[k]):
+            cost -= 2.0
+        elif _ends_clause(texts[k]):
+            cost -= 1.0
+        elif gap < RAPID_GAP_SECONDS:
+            cost += 1.5
+        break_cost[k] = cost
+    # Cost of a pause inside a line, after word k.
+    pause_cost = [(gap - 0.3) * 4.0 if gap > 0.3 else 0.0 for gap in gaps]
+    # A word with pauses on both sides and time to land may stand alone.
+    emphatic = [
+        min(gaps[k - 1] if k > 0 else float('inf'), gaps[k]) >= 0.4 and ends[k] - starts[k] >= 0.35
+        for k in range(count)
+    ]
+
+    best = [0.0] + [float('inf')] * count
+    back = [0] * (count + 1)
+    for j in range(1, count + 1):
+        # Grow the line holding words i..j-1 leftwards, accumulating its width and pauses.
+        line_end = starts[j] if j < count else ends[j - 1]
+        chars = -1
+        pauses = 0.0
+        for i in range(j - 1, max(0, j - MAX_LINE_WORDS) - 1, -1):
+            size = j - i
+            # Lines cannot continue past a sentence end or a long pause.
+            if size > 1:
+                if hard_break[i]:
+                    break
+                pauses += pause_cost[i]
+            chars += len(texts[i]) + 1
+            if size > 1 and chars > MAX_LINE_CHARS:
+                break
+            if size == 1 and emphatic[i]:
+                cost = 0.5
+            else:
+                cost = _SIZE_COST[size] + max(0, chars - _COMFORTABLE_CHARS) * 0.3
+            shown = line_end - starts[i]
+            if shown < MIN_LINE_SECONDS:
+                cost += (MIN_LINE_SECONDS - shown) * 10.0
+            total = best[i] + cost + pauses + break_cost[j - 1]
+            if total < best[j]:
+                best[j], back[j] = total, i
+
+    result = []
+    j = count
+    while j > 0:
+        i = back[j]
+        result.append({
+            "indices": list(range(first + i, first + j)),
+            "text": ' '.join(texts[i:j]),
+        })
+        j = i
+    result.reverse()
+    return result
+
+
+SNAPSHOT_SUFFIX = ".words.json"
+# A matched word whose duration or following pause moved by more than this is regrouped.
+STABLE_TIMING_SECONDS = 0.15
+# Unchanged groups on each side of a change that are regrouped together with it.
+REGROUP_CONTEXT_GROUPS = 1
+
+
+def grouping_snapshot_path(grouping_file: Path) -> Path:
+    """`<stem>-grouping.words.json` next to `<stem>-grouping.json`."""
+    return grouping_file.with_name(f"{grouping_file.stem}{SNAPSHOT_SUFFIX}")
+
+
+def write_grouping_snapshot(grouping_file: Path, words: Sequence[dict]) -> Path:
+    """Record the words a grouping's indices refer to."""
+    path = grouping_snapshot_path(grouping_file)
+    data = {"words": [[word['word'], round(float(word['start']), 3), round(float(word['end']), 3)] for word in words]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def load_grouping_snapshot(grouping_file: Path) -> Optional[List[dict]]:
+    """The words recorded with a grouping, or None when there is no (readable) snapshot."""
+    try:
+        with open(grouping_snapshot_path(grouping_file), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return [{"word": word, "start": start, "end": end} for word, start, end in data["words"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+@dataclass
+class RegroupPlan:
+    """Groups that survive a transcript change, and the new-word ranges to group again."""
+
+    carried: List[dict]
+    regions: List[Tuple[int, int]]
+    stable_words: int
+    dropped_groups: int = 0
+    reindexed: bool = False
+
+    @property
+    def regroup_words(self) -> int:
+        return sum(stop - first for first, stop in self.regions)
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.regions and not self.reindexed and not self.dropped_groups
+
+    def merge(self, regrouped: Sequence[dict]) -> List[dict]:
+        """Carried and regrouped groups in word order."""
+        return sorted([*self.carried, *regrouped], key=lambda group: group["indices"][0])
+
+
+def _stable_matches(old_words: Sequence[dict], new_words: Sequence[dict]) -> Dict[int, int]:
+    """Old-to-new index map of words that are unchanged in text and (relative) timing."""
+    def key(word: dict) -> str:
+        return "".join(ch for ch in word['word'].lower() if ch.isalnum()) or word['word']
+
+    matcher = difflib.SequenceMatcher(a=[key(w) for w in old_words], b=[key(w) for w in new_words], autojunk=False)
+    matches: Dict[int, int] = {}
+    for old_first, new_first, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            matches[old_first + offset] = new_first + offset
+
+    def shape(words: Sequence[dict], index: int) -> Tuple[float, Optional[float]]:
+        gap = words[index + 1]['start'] - words[index]['end'] if index + 1 < len(words) else None
+        return words[index]['end'] - words[index]['start'], gap
+
+    stable = {}
+    for old, new in matches.items():
+        if old_words[old]['word'] != new_words[new]['word']:
+            continue  # punctuation or case changed: sentence breaks may have moved
+        old_duration, old_gap = shape(old_words, old)
+        new_duration, new_gap = shape(new_words, new)
+        if abs(old_duration - new_duration) > STABLE_TIMING_SECONDS:
+            continue
+        if (old_gap is None) != (new_gap is None) or (old_gap is not None and abs(old_gap - new_gap) > STABLE_TIMING_SECONDS):
+            continue
+        stable[old] = new
+    return stable
+
+
+def plan_regroup(old_words: Sequence[dict], groups: Sequence[dict], new_words: Sequence[dict]) -> RegroupPlan:
+    """
+    Work out how much of a grouping survives the change from `old_words` to `new_words`.
+
+    Words are aligned by sequence matching on their text; a group is carried over when
+    all of its words are matched, unchanged in timing, and still adjacent. New or changed
+    words and the remaining words of groups that could not be carried, widened by
+    REGROUP_CONTEXT_GROUPS groups on each side, become the regions to regroup. Matched
+    words that no group covered were left ungrouped on purpose and stay that way.
+    """
+    stable = _stable_matches(old_words, new_words)
+    pending = [True] * len(new_words)
+    for index in stable.values():
+        pending[index] = False
+    carried: List[dict] = []
+    reindexed = False
+    for group in groups:
+        indices = [stable.get(index) for index in group.get("indices", [])]
+        if not indices or None in indices or indices != list(range(indices[0], indices[0] + len(indices))):
+            for index in indices:
+                if index is not None:
+                    pending[index] = True
+            continue
+        reindexed = reindexed or indices != group["indices"]
+        carried.append({"indices": indices, "text": group.get("text") or ' '.join(new_words[i]['word'] for i in indices)})
+    carried.sort(key=lambda group: group["indices"][0])
+    dropped = len(groups) - len(carried)
+
+    owner = [-1] * len(new_words)
+    for number, group in enumerate(carried):
+        for index in group["indices"]:
+            owner[index] = number
+            pending[index] = False
+
+    # Widen every pending run by the groups around it.
+    released = set()
+    index = 0
+    while index < len(new_words):
+        if not pending[index]:
+            index += 1
+            continue
+        first = index
+        while index < len(new_words) and pending[index]:
+            index += 1
+        left, right = first, index
+        for _ in range(REGROUP_CONTEXT_GROUPS):
+            if left > 0 and owner[left - 1] >= 0:
+                released.add(owner[left - 1])
+                left = carried[owner[left - 1]]["indices"][0]
+            if right < len(new_words) and owner[right] >= 0:
+                released.add(owner[right])
+                right = carried[owner[right]]["indices"][-1] + 1
+
+    for number in released:
+        for index in carried[number]["indices"]:
+            pending[index] = True
+    if released:
+        carried = [group for number, group in enumerate(carried) if number not in released]
+    regions: List[Tuple[int, int]] = []
+    index = 0
+    while index < len(new_words):
+        if not pending[index]:
+            index += 1
+            continue
+        first = index
+        while index < len(new_words) and pending[index]:
+            index += 1
+        regions.append((first, index))
+
+    return RegroupPlan(
+        carried=carried,
+        regions=regions,
+        stable_words=len(stable),
+        dropped_groups=dropped,
+        reindexed=reindexed,
+    )
@@ -0,0 +1,231 @@
+"""
+Local stand-in for the OpenAI chat completions API, for offline load tests.
+
+`post -llm-standin` answers `POST /v1/chat/completions` (streamed or not) with
+deterministic replies shaped like the ones the stages expect:
+
+- caption grouping prompts (`index|word|start|end|gap` lines) get a JSON grouping of
+  the listed indices, three words per line;
+- other JSON requests get `{"result": "ok"}`;
+- everything else gets the first `--reply-words` words of the prompt back as prose.
+
+Latency is simulated as a fixed time to first token plus a token rate, and
+`--fail-rate` answers a share of requests with 429 + Retry-After so the client's
+backoff can be exercised. Point the stages at it with
+
+    export POST_LLM_BASE_URL=http://127.0.0.1:8765/v1
+
+No API key is needed while POST_LLM_BASE_URL is set, and the GPT response cache is
+neither read nor written, so stand-in replies never leak into real runs.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional, Tuple
+
+try:
+    from .common import StageEnvironment, build_cli_parser, estimate_tokens
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import StageEnvironment, build_cli_parser, estimate_tokens
+
+
+_GROUPING_LINE = re.compile(r"^(\d+)\|([^|]*)\|", re.MULTILINE)
+
+
+def standin_reply(messages, response_format, reply_words: int) -> str:
+    """Deterministic reply for a chat request (see the module docstring)."""
+    user_prompt = "\n".join(message.get("content", "") for message in messages if message.get("role") == "user")
+    grouping_words = _GROUPING_LINE.findall(user_prompt)
+    if grouping_words:
+        groups = []
+        for first in range(0, len(grouping_words), 3):
+            chunk = grouping_words[first:first + 3]
+            groups.append({"indices": [int(index) for index, _ in chunk], "text": " ".join(word for _, word in chunk)})
+        return json.dumps({"groups": groups})
+    if response_format and response_format.get("type") == "json_object":
+        return json.dumps({"result": "ok"})
+    return " ".join(user_prompt.split()[:reply_words]) or "OK."
+
+
+class StandinStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def enter(self) -> None:
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so the client's connection pool is exercised
+
+    def log_message(self, format, *args):  # noqa: A002 - signature fixed by BaseHTTPRequestHandler
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-5", "object": "model"}, {"id": "gpt-5-mini", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path '{self.path}'"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Request body is not JSON"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path '{self.path}'"}})
+            return
+
+        server = self.server
+        if random.random() < server.fail_rate:  # type: ignore[attr-defined]
+            with server.stats.lock:  # type: ignore[attr-defined]
+                server.stats.rejected += 1  # type: ignore[attr-defined]
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_error"}},
+                {"Retry-After": "1"},
+            )
+            return
+
+        server.stats.enter()  # type: ignore[attr-defined]
+        try:
+            self._complete(request)
+        finally:
+            server.stats.leave()  # type: ignore[attr-defined]
+
+    def _complete(self, request: dict) -> None:
+        server = self.server
+        model = request.get("model", "gpt-5")
+        content = standin_reply(request.get("messages", []), request.get("response_format"), server.reply_words)  # type: ignore[attr-defined]
+        prompt_tokens = sum(estimate_tokens(message.get("content", "")) for message in request.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-standin-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        time.sleep(server.latency)  # type: ignore[attr-defined]
+        if not request.get("stream"):
+            time.sleep(completion_tokens / server.tokens_per_second)  # type: ignore[attr-defined]
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(choices, extra=None) -> dict:
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": choices, **(extra or {})}
+
+        for delta, seconds in _fragments(content, server.tokens_per_second):  # type: ignore[attr-defined]
+            time.sleep(seconds)
+            self._send_event(chunk([{"index": 0, "delta": {"content": delta}, "finish_reason": None}]))
+        self._send_event(chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._send_event(chunk([], {"usage": usage}))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _send_event(self, payload: dict) -> None:
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def _fragments(content: str, tokens_per_second: float) -> Iterator[Tuple[str, float]]:
+    """Split `content` into 16-character (about 4-token) stream deltas, each with its simulated generation time."""
+    for start in range(0, len(content), 16):
+        yield content[start:start + 16], 4 / tokens_per_second
+
+
+def run(args):
+    """
+    Serve an OpenAI-compatible chat completions endpoint locally for offline load tests.
+
+    Usage:
+        post -llm-standin
+        post -llm-standin --port 8765 --latency 2 --tokens-per-second 80 --fail-rate 0.1
+
+    Then, in another shell:
+        export POST_LLM_BASE_URL=http://127.0.0.1:8765/v1
+        post -captions --no-cache --yes
+    """
+    parser = build_cli_parser(
+        stage="llm-standin",
+        summary="Serve a local stand-in for the OpenAI chat API (offline load tests of essay/captions).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token of each reply.")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Simulated generation speed.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 429 (0-1).")
+    parser.add_argument("--reply-words", type=int, default=200, help="Length of prose replies, in words.")
+    parsed = parser.parse_args(args)
+
+    env = StageEnvironment.create(stage="llm-standin", directory=parsed.dir, auto_confirm=parsed.yes)
+    if parsed.tokens_per_second <= 0:
+        env.abort("--tokens-per-second must be positive.")
+    if not 0.0 <= parsed.fail_rate <= 1.0:
+        env.abort("--fail-rate must be between 0 and 1.")
+
+    try:
+        server = ThreadingHTTPServer((parsed.host, parsed.port), _StandinHandler)
+    except OSError as e:
+        env.abort(f"Could not listen on {parsed.host}:{parsed.port}: {e}")
+    server.daemon_threads = True
+    server.latency = parsed.latency  # type: ignore[attr-defined]
+    server.tokens_per_second = parsed.tokens_per_second  # type: ignore[attr-defined]
+    server.fail_rate = parsed.fail_rate  # type: ignore[attr-defined]
+    server.reply_words = parsed.reply_words  # type: ignore[attr-defined]
+    server.stats = StandinStats()  # type: ignore[attr-defined]
+
+    base_url = f"http://{parsed.host}:{server.server_address[1]}/v1"
+    print(f"🧪 post -llm-standin: listening on {base_url} (Ctrl+C to stop)")
+    print(f"   export POST_LLM_BASE_URL={base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        stats = server.stats  # type: ignore[attr-defined]
+        print(
+            f"\n🛑 post -llm-standin: served {stats.requests} request(s) "
+            f"(peak {stats.peak_in_flight} in flight, {stats.rejected} rejected with 429)."
+        )
+    finally:
+        server.server_close()
@@ -0,0 +1,259 @@
+"""
+Local weights cache for fast cold model loads.
+
+The first time a model is loaded through its regular loader (`init_df`,
+`pretrained.dns64()`, `stable_whisper.load_model`) its state dict is written to
+`post_cache_dir("weights")`. Later loads build the module skeleton on the meta
+device and attach tensors that are memory-mapped straight from that file
+(`torch.load(mmap=True)` + `load_state_dict(assign=True)`), so nothing is copied
+or re-initialised and concurrent processes share the same page-cache pages.
+Non-persistent buffers are not in the state dict, so they are cached alongside it.
+
+Set `POST_WEIGHTS_CACHE=0` to bypass the cache.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .common import post_cache_dir
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import post_cache_dir
+
+
+CACHE_FORMAT_VERSION = 2
+
+
+def _enabled() -> bool:
+    return os.getenv("POST_WEIGHTS_CACHE", "1") not in {"0", "false", "no"}
+
+
+def cache_path(key: str) -> Path:
+    """File holding the cached weights for `key`."""
+    return post_cache_dir("weights") / f"{key}.pt"
+
+
+def _non_persistent_buffers(model) -> Dict[str, Any]:
+    """Dense buffers missing from the state dict (sparse ones belong in a loader's extras)."""
+    import torch
+
+    persistent = set(model.state_dict())
+    return {
+        name: tensor
+        for name, tensor in model.named_buffers()
+        if name not in persistent and tensor.layout == torch.strided
+    }
+
+
+def _restore_buffers(model, buffers: Dict[str, Any]) -> None:
+    for name, tensor in buffers.items():
+        owner, _, attribute = name.rpartition(".")
+        model.get_submodule(owner).register_buffer(attribute, tensor, persistent=False)
+
+
+def _meta_tensors(model) -> List[str]:
+    """Names of parameters and buffers that are still on the meta device."""
+    tensors = [*model.named_parameters(), *model.named_buffers()]
+    return [name for name, tensor in tensors if tensor.is_meta]
+
+
+def save_weights(key: str, model, metadata: Dict[str, Any], extras: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Write a model's state dict and non-persistent buffers (plus JSON-like metadata and
+    extra tensors) to the cache.
+
+    The file is written next to its final location and renamed into place, so a
+    concurrent reader never sees a partial file.
+    """
+    import torch
+
+    path = cache_path(key)
+    payload = {
+        "format": CACHE_FORMAT_VERSION,
+        "metadata": metadata,
+        "state_dict": {name: tensor.detach().cpu().contiguous() for name, tensor in model.state_dict().items()},
+        "buffers": {name: tensor.detach().cpu().contiguous() for name, tensor in _non_persistent_buffers(model).items()},
+        "extras": {name: tensor.detach().cpu().contiguous() for name, tensor in (extras or {}).items()},
+    }
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    torch.save(payload, partial)
+    partial.replace(path)
+    return path
+
+
+def load_weights(key: str) -> Optional[Dict[str, Any]]:
+    """Memory-map a cached payload, or return None when there is no usable cache entry."""
+    import torch
+
+    path = cache_path(key)
+    if not path.exists():
+        return None
+    try:
+        payload = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable weights cache '{path.name}': {e}")
+        return None
+    if payload.get("format") != CACHE_FORMAT_VERSION:
+        return None
+    return payload
+
+
+def _build_on_meta(build: Callable[[], Any]):
+    """Build the module skeleton without allocating or initialising real weights."""
+    import torch
+
+    try:
+        with torch.device("meta"):
+            return build()
+    except Exception:
+        # Some constructors do real tensor work (e.g. sparse buffers); build them normally.
+        return build()
+
+
+def load_model(
+    key: str,
+    build: Callable[[Dict[str, Any]], Any],
+    load_fresh: Callable[[], Any],
+    describe: Callable[[Any], Tuple[Dict[str, Any], Dict[str, Any]]],
+    finalize: Optional[Callable[[Any, Dict[str, Any]], Any]] = None,
+):
+    """
+    Load a model through the weights cache.
+
+    Parameters
+    ----------
+    key:
+        Cache entry name (should change whenever the architecture does).
+    build:
+        Creates the untrained module from the cached metadata.
+    load_fresh:
+        The regular (slow) loader, used on a cache miss.
+    describe:
+        Returns `(metadata, extras)` for a freshly loaded model: metadata needed by
+        `build` and tensors that are not part of the state dict.
+    finalize:
+        Optional hook applied to a model rebuilt from the cache (receives the extras).
+    """
+    if not _enabled():
+        return load_fresh()
+
+    start_time = time.time()
+    payload = load_weights(key)
+    if payload is not None:
+        try:
+            model = _build_on_meta(lambda: build(payload["metadata"]))
+            model.load_state_dict(payload["state_dict"], assign=True)
+            _restore_buffers(model, payload["buffers"])
+            if finalize is not None:
+                model = finalize(model, payload["extras"]) or model
+            # Non-persistent buffers are not in the state dict: check every tensor.
+            leftovers = _meta_tensors(model)
+            if leftovers:
+                raise RuntimeError(f"tensors missing from cache: {', '.join(leftovers[:3])}")
+            model.eval()
+            print(f"⚡ Loaded '{key}' from the weights cache in {time.time() - start_time:.2f}s")
+            return model
+        except Exception as e:
+            print(f"⚠️  Weights cache for '{key}' is stale ({e}); rebuilding it.")
+
+    model = load_fresh()
+    try:
+        metadata, extras = describe(model)
+        path = save_weights(key, model, metadata, extras)
+        print(f"💾 Cached weights for '{key}' at '{path}' (next load is memory-mapped)")
+    except Exception as e:
+        print(f"⚠️  Could not cache weights for '{key}': {e}")
+    return model
+
+
+##############################################################################
+# Model-specific loaders
+##############################################################################
+
+
+def load_dns64():
+    """Facebook DNS64 (`denoiser.pretrained.dns64()`) on the CPU."""
+    from denoiser import pretrained
+    from denoiser.demucs import Demucs
+
+    # Same hyper-parameters as pretrained.dns64().
+    kwargs = {"hidden": 64, "sample_rate": 16000}
+    return load_model(
+        "dns64",
+        build=lambda metadata: Demucs(**metadata["kwargs"]),
+        load_fresh=pretrained.dns64,
+        describe=lambda model: ({"kwargs": kwargs}, {}),
+    )
+
+
+def load_deepfilternet():
+    """
+    DeepFilterNet3, returned as `(model, df_state)` like `df.enhance.init_df()`.
+
+    DeepFilterNet's global config must be loaded before the network or its DSP state
+    can be built, so the cached path loads the model's `config.ini` first.
+    """
+    from df.config import config
+    from df.enhance import DEFAULT_MODEL, init_df, maybe_download_model
+    from df.model import ModelParams, init_model
+    from libdf import DF
+
+    model_dir = maybe_download_model(DEFAULT_MODEL)
+    config.load(
+        os.path.join(model_dir, "config.ini"),
+        config_must_exist=True,
+        allow_defaults=True,
+        allow_reload=True,
+    )
+    params = ModelParams()
+    df_state = DF(
+        sr=params.sr,
+        fft_size=params.fft_size,
+        hop_size=params.hop_size,
+        nb_bands=params.nb_erb,
+        min_nb_erb_freqs=params.min_nb_freqs,
+    )
+
+    def _load_fresh():
+        model, _, _ = init_df(model_dir, config_allow_defaults=True)
+        return model
+
+    model = load_model(
+        f"deepfilternet-{Path(model_dir).name}",
+        build=lambda metadata: init_model(df_state, run_df=True, train_mask=True),
+        load_fresh=_load_fresh,
+        describe=lambda model: ({"model_dir": str(model_dir)}, {}),
+    )
+    return model, df_state
+
+
+def load_whisper(name: str):
+    """A stable-ts Whisper model, equivalent to `stable_whisper.load_model(name)`."""
+    import stable_whisper
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    def _describe(model):
+        return (
+            {"dims": dict(vars(model.dims))},
+            {"alignment_heads": model.alignment_heads.to_dense()},
+        )
+
+    def _finalize(model, extras):
+        # alignment_heads is a non-persistent (sparse) buffer, so it lives in the extras.
+        model.register_buffer("alignment_heads", extras["alignment_heads"].to_sparse(), persistent=False)
+        stable_whisper.modify_model(model)
+        return model
+
+    model = load_model(
+        f"whisper-{name}",
+        build=lambda metadata: Whisper(ModelDimensions(**metadata["dims"])),
+        load_fresh=lambda: stable_whisper.load_model(name, device="cpu"),
+        describe=_describe,
+        finalize=_finalize,
+    )
+    if torch.cuda.is_available():
+        model = model.to("cuda")
+    return model
@@ -0,0 +1,212 @@
+"""
+Decoded-PCM cache shared by every stage that reads audio.
+
+The first stage that needs a source's audio decodes it once, at its native sample
+rate and channel layout, to raw float32 in `post_cache_dir("pcm", <source key>)`.
+Resampled or downmixed variants (16 kHz mono for Whisper, 48 kHz mono for the
+denoisers, ...) are derived from that file on first use and cached alongside it;
+deriving one only resamples raw PCM and never decodes the container again. Stages
+get copy-on-write memory maps, so reading the audio copies nothing.
+
+The source key covers the resolved path, size and modification time, so an edited
+file gets a fresh entry. The least recently used entries are removed once the cache
+grows beyond `POST_PCM_CACHE_GB` (default 20).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    from .common import post_cache_dir
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import post_cache_dir
+
+
+PCM_CACHE_VERSION = 2
+_META_FILE = "meta.json"
+_NATIVE_FILE = "native.f32"
+
+
+@dataclass(frozen=True)
+class PcmVariant:
+    """Raw interleaved little-endian float32 samples of one rate/channel layout."""
+
+    path: Path
+    sample_rate: int
+    channels: int
+
+    @property
+    def frames(self) -> int:
+        return self.path.stat().st_size // (4 * self.channels)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def array(self):
+        """Copy-on-write memory map shaped (frames, channels)."""
+        import numpy as np
+
+        return np.memmap(self.path, dtype="<f4", mode="c", shape=(self.frames, self.channels))
+
+    def ffmpeg_input(self) -> List[str]:
+        """ffmpeg arguments that read this file as an input."""
+        return ["-f", "f32le", "-ar", str(self.sample_rate), "-ac", str(self.channels), "-i", str(self.path)]
+
+
+def _source_key(source: Path) -> str:
+    resolved = source.resolve()
+    stat = resolved.stat()
+    identity = f"{PCM_CACHE_VERSION}:{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:24]
+
+
+def _run_ffmpeg(cmd: List[str], destination: Path, what: str) -> None:
+    """Run an ffmpeg command writing `destination` through a partial file."""
+    partial = destination.with_name(f"{destination.name}.{os.getpid()}.partial")
+    result = subprocess.run(cmd + [str(partial)], capture_output=True)
+    if result.returncode != 0:
+        partial.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg failed to {what}: {result.stderr.decode().strip()}")
+    partial.replace(destination)
+
+
+def _probe_audio_stream(source: Path) -> Tuple[int, int]:
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=sample_rate,channels",
+            "-of",
+            "csv=p=0",
+            str(source),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        rate, channels = result.stdout.strip().splitlines()[0].split(",")[:2]
+        return int(rate), int(channels)
+    except (IndexError, ValueError):
+        raise RuntimeError(f"'{source.name}' has no readable audio stream: {result.stderr.strip()}")
+
+
+def _decode_native(source: Path, entry: Path) -> PcmVariant:
+    sample_rate, channels = _probe_audio_stream(source)
+    print(f"🎵 pcm-cache: decoding '{source.name}' once ({sample_rate}Hz, {channels} channel(s))...")
+    start_time = time.time()
+    # Stream-copied cut/tighten outputs can carry missing or negative timestamps;
+    # regenerate and rebase them so word and silence times line up with the video.
+    _run_ffmpeg(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-nostdin",
+            "-y",
+            "-fflags",
+            "+genpts",
+            "-i",
+            str(source),
+            "-map",
+            "0:a:0",
+            "-vn",
+            "-avoid_negative_ts",
+            "make_zero",
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+        ],
+        entry / _NATIVE_FILE,
+        f"decode '{source.name}'",
+    )
+    meta = {
+        "version": PCM_CACHE_VERSION,
+        "source": str(source.resolve()),
+        "sample_rate": sample_rate,
+        "channels": channels,
+    }
+    (entry / _META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    variant = PcmVariant(entry / _NATIVE_FILE, sample_rate, channels)
+    print(f"💾 pcm-cache: cached {variant.duration:.1f}s of audio in {time.time() - start_time:.1f}s.")
+    _prune(keep=entry)
+    return variant
+
+
+def native_pcm(source: Path) -> PcmVariant:
+    """The source's audio at its own rate and layout, decoding it on first use."""
+    entry = post_cache_dir("pcm", _source_key(source))
+    meta_path = entry / _META_FILE
+    if meta_path.exists() and (entry / _NATIVE_FILE).exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        os.utime(meta_path)  # LRU bookkeeping
+        return PcmVariant(entry / _NATIVE_FILE, int(meta["sample_rate"]), int(meta["channels"]))
+    return _decode_native(source, entry)
+
+
+def pcm_variant(source: Path, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> PcmVariant:
+    """
+    The source's audio at `sample_rate` with `channels` channels (None keeps the native value).
+
+    Variants are resampled/downmixed by ffmpeg from the cached native PCM, exactly as a
+    direct `-ar/-ac` extraction would, and cached next to it.
+    """
+    native = native_pcm(source)
+    sample_rate = sample_rate or native.sample_rate
+    channels = channels or native.channels
+    if (sample_rate, channels) == (native.sample_rate, native.channels):
+        return native
+
+    variant = PcmVariant(native.path.with_name(f"{sample_rate}x{channels}.f32"), sample_rate, channels)
+    if not variant.path.exists():
+        _run_ffmpeg(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y"]
+            + native.ffmpeg_input()
+            + ["-ar", str(sample_rate), "-ac", str(channels), "-f", "f32le", "-acodec", "pcm_f32le"],
+            variant.path,
+            f"derive {sample_rate}Hz/{channels}ch audio for '{source.name}'",
+        )
+    return variant
+
+
+def load_audio(source: Path, sample_rate: Optional[int] = None, channels: Optional[int] = None):
+    """
+    `(samples, sample_rate)` shaped like `soundfile.read`: 1-D for mono, (frames, channels) otherwise.
+
+    The samples are a copy-on-write memory map of the cache file.
+    """
+    variant = pcm_variant(source, sample_rate, channels)
+    samples = variant.array()
+    return (samples[:, 0] if variant.channels == 1 else samples), variant.sample_rate
+
+
+def _prune(keep: Path) -> None:
+    """Drop least recently used entries while the cache exceeds POST_PCM_CACHE_GB."""
+    limit = float(os.getenv("POST_PCM_CACHE_GB", "20")) * 1024**3
+    root = keep.parent
+    entries = []
+    for entry in root.iterdir():
+        meta_path = entry / _META_FILE
+        if not entry.is_dir() or entry == keep or not meta_path.exists():
+            continue
+        size = sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+        entries.append((meta_path.stat().st_mtime, size, entry))
+    total = sum(size for _, size, _ in entries) + sum(path.stat().st_size for path in keep.iterdir() if path.is_file())
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
@@ -7,17 +7,17 @@ if str(MODULE_DIR) not in sys.path:
 
 try:
     from .common import StageEnvironment, build_cli_parser, find_preferred_rough_video
-    from . import tighten, transcribe, essay, captions
+    from . import tighten, transcribe, remap, essay, captions
 except ImportError:
     from common import StageEnvironment, build_cli_parser, find_preferred_rough_video
-    import tighten, transcribe, essay, captions
+    import tighten, transcribe, remap, essay, captions
 
 
 def check_completion_status(directory: Path, rough_video: Path):
     """
     Check which steps are complete.
     
-    Returns a dict with keys: 'tighten', 'transcribe', 'essay', 'captions'
+    Returns a dict with keys: 'tighten', 'transcribe', 'remap', 'essay', 'captions'
     Each value is the Path to the output file if complete, or None if not.
     """
     base_name = rough_video.name[:-len("-rough.mp4")]
@@ -25,6 +25,7 @@ def check_completion_status(directory: Path, rough_video: Path):
     status = {
         'tighten': None,
         'transcribe': None,
+        'remap': None,
         'essay': None,
         'captions': None
     }
@@ -34,10 +35,15 @@ def check_completion_status(directory: Path, rough_video: Path):
     if tight_video.exists():
         status['tighten'] = tight_video
     
-    # Check for transcription
+    # Check for the rough cut's transcription
+    rough_json = rough_video.with_suffix(".json")
+    if rough_json.exists():
+        status['transcribe'] = rough_json
+    
+    # Check for the transcript of the tightened video
     json_file = directory / f"{base_name}-rough-tight.json"
     if json_file.exists():
-        status['transcribe'] = json_file
+        status['remap'] = json_file
     
     # Check for essay
     essay_file = directory / f"{base_name}-rough-tight-essay.txt"
@@ -73,9 +79,10 @@ def run(args):
     
     This command orchestrates the full pipeline:
     1. tighten - Remove silence from video
-    2. transcribe - Generate word-level timestamps
-    3. essay - Generate essay/transcript from timestamps
-    4. captions - Add captions to video
+    2. transcribe - Generate word-level timestamps for the rough cut
+    3. remap - Move those timestamps onto the tightened video (no second transcription)
+    4. essay - Generate essay/transcript from timestamps
+    5. captions - Add captions to video
     
     Dependencies:
         - Requires a single rough cut named `<title>-<take_id>-rough.mp4` in the working directory.
@@ -86,10 +93,13 @@ def run(args):
         - For completed steps, prompts whether to re-run (unless --yes is provided)
         - For incomplete steps, runs them in order
         - If all steps are complete, prompts whether to re-run the entire pipeline
+        - Re-tightening always re-runs remap; a tightened video without a segment map
+          (from an older tighten) is transcribed directly instead
     
     Output:
         - Produces all intermediate and final outputs from the pipeline:
           - `<title>-<take_id>-rough-tight.mp4` (tightened video)
+          - `<title>-<take_id>-rough.json` (word timestamps of the rough cut)
           - `<title>-<take_id>-rough-tight.json` (word timestamps)
           - `<title>-<take_id>-rough-tight-essay.txt` (essay/transcript)
           - `<title>-<take_id>-rough-tight-captions.mp4` (final captioned video)
@@ -122,11 +132,26 @@ def run(args):
     elif prompt_rerun('tighten', status['tighten'], env.auto_confirm):
         steps_to_run.append('tighten')
     
-    if status['transcribe'] is None:
-        print(f"⏭  Step 'transcribe' not complete. Will run.")
-        steps_to_run.append('transcribe')
-    elif prompt_rerun('transcribe', status['transcribe'], env.auto_confirm):
-        steps_to_run.append('transcribe')
+    # Tighten records its keep segments; without them (older runs) transcribe the tightened video.
+    tight_video = env.directory / f"{rough_video.name[:-len('-rough.mp4')]}-rough-tight.mp4"
+    use_remap = 'tighten' in steps_to_run or remap.segment_map_path(tight_video).exists()
+    
+    if not use_remap:
+        if status['remap'] is None:
+            print(f"⏭  Step 'transcribe' not complete. Will run on '{tight_video.name}' (no segment map to remap through).")
+            steps_to_run.append('transcribe')
+        elif prompt_rerun('transcribe', status['remap'], env.auto_confirm):
+            steps_to_run.append('transcribe')
+    else:
+        if status['transcribe'] is None:
+            print(f"⏭  Step 'transcribe' not complete. Will run.")
+            steps_to_run.append('transcribe')
+        elif prompt_rerun('transcribe', status['transcribe'], env.auto_confirm):
+            steps_to_run.append('transcribe')
+        
+        if status['remap'] is None or 'tighten' in steps_to_run or 'transcribe' in steps_to_run:
+            print(f"⏭  Step 'remap' is out of date. Will run.")
+            steps_to_run.append('remap')
     
     if status['essay'] is None:
         print(f"⏭  Step 'essay' not complete. Will run.")
@@ -167,8 +192,9 @@ def run(args):
             if step == 'tighten':
                 tighten.run(sub_args)
             elif step == 'transcribe':
-                # Add default model for transcribe if not specified
-                transcribe.run(sub_args)
+                transcribe.run(sub_args + [str(rough_video if use_remap else tight_video)])
+            elif step == 'remap':
+                remap.run(sub_args + [str(remap.segment_map_path(tight_video))])
             elif step == 'essay':
                 essay.run(sub_args)
             elif step == 'captions':
@@ -199,7 +225,9 @@ def run(args):
     if final_status['tighten']:
         print(f"   • {final_status['tighten'].name} (tightened video)")
     if final_status['transcribe']:
-        print(f"   • {final_status['transcribe'].name} (word timestamps)")
+        print(f"   • {final_status['transcribe'].name} (rough cut word timestamps)")
+    if final_status['remap']:
+        print(f"   • {final_status['remap'].name} (word timestamps)")
     if final_status['essay']:
         print(f"   • {final_status['essay'].name} (essay/transcript)")
     if final_status['captions']:
@@ -0,0 +1,298 @@
+import bisect
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .common import StageEnvironment, build_cli_parser
+    from .grouping import write_grouping_snapshot
+    from .wordstore import WordStore, open_word_store, write_word_sidecar
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import StageEnvironment, build_cli_parser
+    from grouping import write_grouping_snapshot
+    from wordstore import WordStore, open_word_store, write_word_sidecar
+
+
+SEGMENT_MAP_SUFFIX = ".segments.json"
+
+
+def segment_map_path(video: Path) -> Path:
+    """Where the keep-segment map of an edited video lives (`<stem>.segments.json`)."""
+    return video.with_name(f"{video.stem}{SEGMENT_MAP_SUFFIX}")
+
+
+def write_segment_map(
+    output_video: Path,
+    source_video: Path,
+    segments: Sequence[Tuple[float, float]],
+) -> Path:
+    """
+    Record which source ranges an edited video was concatenated from.
+
+    The map sits next to the edited video and lets `post -remap` move an existing
+    transcript of the source onto the edit without transcribing again.
+    """
+    path = segment_map_path(output_video)
+    data = {
+        "source": source_video.name,
+        "output": output_video.name,
+        "segments": [[round(start, 6), round(end, 6)] for start, end in segments if end > start],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+@dataclass(frozen=True)
+class TimelineMap:
+    """Keep segments (source time) of an edit, in the order they were concatenated."""
+
+    segments: Tuple[Tuple[float, float], ...]
+
+    @classmethod
+    def load(cls, path: Path) -> "TimelineMap":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        segments = tuple(sorted((float(start), float(end)) for start, end in data["segments"]))
+        return cls(segments)
+
+    @property
+    def _starts(self) -> List[float]:
+        return [start for start, _ in self.segments]
+
+    @property
+    def _offsets(self) -> List[float]:
+        """Output time at which each keep segment begins."""
+        offsets, total = [], 0.0
+        for start, end in self.segments:
+            offsets.append(total)
+            total += end - start
+        return offsets
+
+    @property
+    def output_duration(self) -> float:
+        return sum(end - start for start, end in self.segments)
+
+    def segment_index(self, seconds: float) -> Optional[int]:
+        """Index of the keep segment containing `seconds`, or None if it was cut."""
+        index = bisect.bisect_right(self._starts, seconds) - 1
+        if index >= 0 and seconds <= self.segments[index][1]:
+            return index
+        return None
+
+    def to_output(self, seconds: float, index: Optional[int] = None) -> Optional[float]:
+        """Output time of a source time, or None when it falls in a removed range."""
+        if index is None:
+            index = self.segment_index(seconds)
+        if index is None:
+            return None
+        start, end = self.segments[index]
+        return self._offsets[index] + min(max(seconds, start), end) - start
+
+    def to_output_clamped(self, seconds: float, forward: bool) -> float:
+        """Like `to_output`, but a removed time snaps to the next (or previous) kept instant."""
+        index = self.segment_index(seconds)
+        if index is not None:
+            return self.to_output(seconds, index)
+        following = bisect.bisect_right(self._starts, seconds)
+        if forward and following < len(self.segments):
+            return self._offsets[following]
+        if following == 0:
+            return 0.0
+        previous = following - 1
+        return self._offsets[previous] + self.segments[previous][1] - self.segments[previous][0]
+
+
+def remap_words(words: WordStore, timeline: TimelineMap) -> Tuple[List[dict], Dict[int, int]]:
+    """
+    Move word timestamps onto the edited timeline.
+
+    A word survives when its midpoint lies in a keep segment; its edges are clipped to
+    that segment. Only the words each segment's time range covers are visited, so
+    long removed stretches cost nothing. Returns the remapped words and a map from old
+    to new word indices.
+    """
+    kept: List[Tuple[int, int]] = []
+    for index, (start, end) in enumerate(timeline.segments):
+        first, stop = words.index_range(start, end)
+        for old_index in range(first, stop):
+            middle = (words.starts[old_index] + words.ends[old_index]) / 2
+            if timeline.segment_index(middle) == index:
+                kept.append((old_index, index))
+
+    remapped: List[dict] = []
+    index_map: Dict[int, int] = {}
+    for old_index, index in sorted(kept):
+        word = words[old_index]
+        index_map[old_index] = len(remapped)
+        remapped.append({
+            **word,
+            'start': round(timeline.to_output(word["start"], index), 3),
+            'end': round(timeline.to_output(word["end"], index), 3),
+        })
+    return remapped, index_map
+
+
+def remap_groupings(groupings: Sequence[dict], index_map: Dict[int, int], words: Sequence[dict]) -> List[dict]:
+    """Re-index caption groups after `remap_words`; groups that lost every word are dropped."""
+    result = []
+    for group in groupings:
+        indices = [index_map[idx] for idx in group["indices"] if idx in index_map]
+        if not indices:
+            continue
+        text = group.get("text", "")
+        if len(indices) != len(group["indices"]) or not text:
+            text = ' '.join(words[idx]['word'] for idx in indices)
+        result.append({"indices": indices, "text": text})
+    return result
+
+
+_SRT_TIME = re.compile(r"(\d+):(\d+):(\d+),(\d+)")
+
+
+def _parse_srt_time(value: str) -> float:
+    hours, minutes, seconds, milliseconds = (int(part) for part in _SRT_TIME.match(value.strip()).groups())
+    return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
+
+
+def _format_srt_time(seconds: float) -> str:
+    milliseconds_total = int(round(float(seconds) * 1000))
+    hours, remainder = divmod(milliseconds_total, 3600 * 1000)
+    minutes, remainder = divmod(remainder, 60 * 1000)
+    seconds_part, milliseconds = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds_part:02d},{milliseconds:03d}"
+
+
+def remap_srt(srt_text: str, timeline: TimelineMap) -> Tuple[str, int]:
+    """
+    Move SRT cues onto the edited timeline and renumber them.
+
+    Cue edges inside a removed range snap to the nearest kept instant; cues left with no
+    duration were cut entirely. Returns the new SRT text and the number of cues kept.
+    """
+    blocks = []
+    for block in re.split(r"\n\s*\n", srt_text.strip()):
+        lines = block.splitlines()
+        timing = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if timing is None:
+            continue
+        start_text, end_text = lines[timing].split("-->")
+        start = timeline.to_output_clamped(_parse_srt_time(start_text), forward=True)
+        end = timeline.to_output_clamped(_parse_srt_time(end_text), forward=False)
+        if end <= start:
+            continue
+        blocks.append(
+            f"{len(blocks) + 1}\n{_format_srt_time(start)} --> {_format_srt_time(end)}\n"
+            + "\n".join(lines[timing + 1:])
+        )
+    return ("\n\n".join(blocks) + "\n") if blocks else "", len(blocks)
+
+
+def remap_transcript(map_file: Path, env: StageEnvironment) -> Path:
+    """
+    Remap the source video's transcript, subtitles and caption grouping onto an edit.
+
+    Reads `<source>.json` (required), `<source>.srt` and `<source>-grouping.json` (when
+    present) next to the map and writes the same files for the edited video.
+    Returns the path of the edited video's word JSON.
+    """
+    with open(map_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    directory = map_file.parent
+    source_stem = Path(data["source"]).stem
+    output_stem = Path(data["output"]).stem
+    timeline = TimelineMap.load(map_file)
+
+    source_json = directory / f"{source_stem}.json"
+    if not source_json.exists():
+        env.abort(
+            f"Transcript '{source_json.name}' not found. "
+            f"Run 'post -transcribe {data['source']}' first."
+        )
+    output_json = env.ensure_output_path(directory / f"{output_stem}.json")
+
+    # Grouping indices count non-empty words only (see captions.load_words_from_json).
+    try:
+        words = open_word_store(source_json)
+    except ValueError as e:
+        env.abort(str(e))
+    remapped, index_map = remap_words(words, timeline)
+    with open(output_json, 'w', encoding='utf-8') as f:
+        json.dump(remapped, f, indent=2, ensure_ascii=False)
+    write_word_sidecar(output_json, remapped)
+    print(
+        f"🧭 post -{env.stage}: mapped {len(remapped)} of {len(words)} words onto '{output_json.name}' "
+        f"({len(words) - len(remapped)} fell in removed ranges)."
+    )
+
+    source_srt = directory / f"{source_stem}.srt"
+    if source_srt.exists():
+        output_srt = env.ensure_output_path(directory / f"{output_stem}.srt")
+        srt_text, cues = remap_srt(source_srt.read_text(encoding="utf-8"), timeline)
+        output_srt.write_text(srt_text, encoding="utf-8")
+        print(f"🧭 post -{env.stage}: wrote '{output_srt.name}' with {cues} cue(s).")
+
+    source_grouping = directory / f"{source_stem}-grouping.json"
+    if source_grouping.exists():
+        output_grouping = env.ensure_output_path(directory / f"{output_stem}-grouping.json")
+        with open(source_grouping, 'r', encoding='utf-8') as f:
+            groupings = json.load(f).get("groups", [])
+        groups = remap_groupings(groupings, index_map, remapped)
+        with open(output_grouping, 'w', encoding='utf-8') as f:
+            json.dump({"groups": groups}, f, indent=2, ensure_ascii=False)
+        write_grouping_snapshot(output_grouping, remapped)
+        print(f"🧭 post -{env.stage}: wrote '{output_grouping.name}' with {len(groups)} caption group(s).")
+
+    return output_json
+
+
+def run(args):
+    """
+    Move an existing transcript onto a tightened or cut video without re-transcribing.
+
+    `post -tighten` and `post -cut` write `<output>.segments.json`, listing the source
+    ranges the edit keeps. Each word, SRT cue and caption group of the source transcript
+    is translated to output time; words inside removed ranges are dropped.
+
+    Dependencies:
+        - A segment map (`*.segments.json`) written by tighten or cut
+        - The source video's word JSON from `post -transcribe`
+
+    Failure behaviour:
+        - Aborts when no (or more than one) segment map is found and none is given
+        - Prompts before overwriting outputs unless `--yes` is supplied
+
+    Output:
+        - `<output>.json`, plus `<output>.srt` and `<output>-grouping.json` when the
+          source has them
+
+    Usage:
+        post -remap
+        post -remap video-intra-rough-tight.segments.json
+    """
+    parser = build_cli_parser(
+        stage="remap",
+        summary="Remap a source transcript, SRT and caption grouping onto a tightened or cut video.",
+    )
+    parser.add_argument(
+        "segment_map",
+        nargs="?",
+        help="Segment map written by tighten/cut (defaults to the single '*.segments.json' in --dir).",
+    )
+    parsed = parser.parse_args(args)
+
+    env = StageEnvironment.create(stage="remap", directory=parsed.dir, auto_confirm=parsed.yes)
+    if parsed.segment_map:
+        map_file = Path(parsed.segment_map).expanduser()
+        if not map_file.is_absolute():
+            map_file = env.directory / map_file
+        if not map_file.is_file():
+            env.abort(f"Segment map '{map_file}' does not exist.")
+    else:
+        map_file = env.expect_single_file(f"*{SEGMENT_MAP_SUFFIX}", "segment map")
+
+    env.announce_checks_passed(f"All safety checks passed. Remapping through '{map_file.name}'.")
+    output_json = remap_transcript(map_file, env)
+    print(f"✅ post -remap: '{output_json.name}' is ready; no transcription needed.")
@@ -4,8 +4,10 @@ from pathlib import Path
 
 try:
     from .common import StageEnvironment, build_cli_parser
+    from .pcm_cache import pcm_variant
 except ImportError:  # pragma: no cover - script mode fallback
     from common import StageEnvironment, build_cli_parser
+    from pcm_cache import pcm_variant
 
 
 _FORMAT_PRESETS = {
@@ -41,6 +43,9 @@ def _build_output_path(input_path: Path, audio_format: str) -> Path:
 def run(args):
     """
     Extract the audio track from a video file and save it alongside the source.
+
+    The audio is decoded through the shared PCM cache, so a source that another stage
+    already read is only re-encoded, not decoded again.
     """
     parser = build_cli_parser(
         stage="separate-audio",
@@ -84,6 +89,13 @@ def run(args):
     output_path = _build_output_path(input_path, parsed.format)
     env.ensure_output_path(output_path)
 
+    # Encode from the shared decoded-PCM cache instead of decoding the video again
+    print(f"🎧 post -separate-audio: extracting audio from '{input_path.name}'...")
+    try:
+        variant = pcm_variant(input_path, parsed.sample_rate or None, parsed.channels or None)
+    except RuntimeError as e:
+        env.abort(str(e))
+
     cmd = [
         "ffmpeg",
         "-hide_banner",
@@ -91,20 +103,11 @@ def run(args):
         "error",
         "-nostdin",
         "-y",
-        "-i",
-        str(input_path),
-        "-vn",
+        *variant.ffmpeg_input(),
     ]
-
-    if parsed.sample_rate > 0:
-        cmd.extend(["-ar", str(parsed.sample_rate)])
-    if parsed.channels > 0:
-        cmd.extend(["-ac", str(parsed.channels)])
-
     cmd.extend(_FORMAT_PRESETS[parsed.format])
     cmd.append(str(output_path))
 
-    print(f"🎧 post -separate-audio: extracting audio from '{input_path.name}'...")
     result = subprocess.run(cmd, capture_output=True)
     if result.returncode != 0:
         env.abort(f"ffmpeg failed to extract audio: {result.stderr.decode().strip()}")
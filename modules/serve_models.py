@@ -0,0 +1,430 @@
+"""
+Resident model daemon for `post -denoise` and `post -transcribe`.
+
+`post -serve-models` keeps the denoisers and Whisper models loaded in one long-lived
+process and accepts jobs over a Unix socket. Each connection carries one request and
+one reply, both a single line of JSON:
+
+    → {"op": "denoise", "model": "deepfilter", "input": "/tmp/a.wav", "output": "/tmp/b.wav", "regions": null}
+    ← {"ok": true, "result": {...}, "queue_ms": 0.4, "run_ms": 812.0, "queue_depth": 0}
+
+Jobs run one at a time on a single inference thread (the models already use every
+core), in arrival order. `{"op": "status"}` is answered immediately with the queue
+depth and recent per-job latency.
+
+The client side (`daemon_request`, `daemon_status`) only imports the standard library,
+so stages can probe for the daemon without paying for torch.
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .common import StageEnvironment, build_cli_parser, post_cache_dir
+except ImportError:  # pragma: no cover - script mode fallback
+    from common import StageEnvironment, build_cli_parser, post_cache_dir
+
+
+CONNECT_TIMEOUT_SECONDS = 0.5
+RECENT_JOBS = 50
+
+
+class ModelDaemonError(RuntimeError):
+    """The daemon was reachable but could not complete the request."""
+
+
+def daemon_socket_path() -> Path:
+    """Socket the daemon listens on (`POST_MODEL_SOCKET` overrides the cache location)."""
+    override = os.getenv("POST_MODEL_SOCKET")
+    if override:
+        return Path(override).expanduser()
+    return post_cache_dir("run") / "models.sock"
+
+
+def daemon_request(payload: Dict[str, Any], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to a running `post -serve-models` daemon.
+
+    Returns the reply, or None when no daemon is listening (the caller should run the
+    model in-process). Raises ModelDaemonError when the daemon accepted the request but
+    failed it.
+    """
+    path = daemon_socket_path()
+    if os.getenv("POST_NO_DAEMON") or not path.exists():
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT_SECONDS)
+    try:
+        client.connect(str(path))
+    except OSError:
+        client.close()
+        return None
+
+    try:
+        with client:
+            client.settimeout(timeout)
+            client.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            with client.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ModelDaemonError("the daemon closed the connection without replying")
+        reply = json.loads(line)
+    except (OSError, ValueError) as e:
+        raise ModelDaemonError(str(e)) from e
+
+    if not reply.get("ok"):
+        raise ModelDaemonError(reply.get("error", "unknown error"))
+    return reply
+
+
+def daemon_status() -> Optional[Dict[str, Any]]:
+    """Status of the running daemon, or None when it is not running or not answering."""
+    try:
+        reply = daemon_request({"op": "status"}, timeout=CONNECT_TIMEOUT_SECONDS * 4)
+    except ModelDaemonError:
+        return None
+    return None if reply is None else reply["result"]
+
+
+##############################################################################
+# Daemon
+##############################################################################
+
+
+@dataclass
+class _Job:
+    request: Dict[str, Any]
+    queued_at: float = field(default_factory=time.time)
+    done: threading.Event = field(default_factory=threading.Event)
+    reply: Dict[str, Any] = field(default_factory=dict)
+
+
+class ModelServer:
+    """Owns the resident models and the single inference thread."""
+
+    def __init__(self, intra_op_threads: int = 0, inter_op_threads: int = 0) -> None:
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.started = time.time()
+        self.jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self.current: Optional[_Job] = None
+        self.jobs_done = 0
+        self.recent: deque = deque(maxlen=RECENT_JOBS)
+        self.whisper_models: Dict[str, Any] = {}
+        self.available_denoisers: List[str] = []
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "denoise": self._denoise,
+            "transcribe": self._transcribe,
+        }
+
+    # -- models ---------------------------------------------------------------
+
+    def check_denoisers(self, env: StageEnvironment) -> None:
+        try:
+            from .denoise import DENOISERS
+        except ImportError:  # pragma: no cover - script mode fallback
+            from denoise import DENOISERS
+
+        for name, backend in DENOISERS.items():
+            try:
+                backend.check_dependencies(env)
+            except SystemExit:
+                continue
+            backend.configure(intra_op_threads=self.intra_op_threads, inter_op_threads=self.inter_op_threads)
+            self.available_denoisers.append(name)
+
+    def denoiser(self, name: str, quantize: bool = False):
+        try:
+            from .denoise import DENOISERS
+        except ImportError:  # pragma: no cover - script mode fallback
+            from denoise import DENOISERS
+
+        if name not in self.available_denoisers:
+            raise ValueError(f"denoiser '{name}' is not available in this daemon")
+        backend = DENOISERS[name]
+        backend.configure(
+            quantize=quantize,
+            intra_op_threads=self.intra_op_threads,
+            inter_op_threads=self.inter_op_threads,
+        )
+        if not backend.is_loaded:
+            print(f"📥 post -serve-models: loading {backend.name}...")
+            print(f"   loaded in {backend.load():.1f}s")
+        return backend
+
+    def whisper(self, options):
+        """Resident Whisper model for a `transcribe.TranscribeOptions`, loaded on first use."""
+        model = self.whisper_models.get(options.cache_key)
+        if model is None:
+            try:
+                from .transcribe import load_transcriber
+            except ImportError:  # pragma: no cover - script mode fallback
+                from transcribe import load_transcriber
+
+            print(f"📥 post -serve-models: loading Whisper model {options.label}...")
+            start_time = time.time()
+            model = self.whisper_models[options.cache_key] = load_transcriber(options, self.intra_op_threads)
+            print(f"   loaded in {time.time() - start_time:.1f}s")
+        return model
+
+    def loaded_models(self) -> List[str]:
+        try:
+            from .denoise import DENOISERS
+        except ImportError:  # pragma: no cover - script mode fallback
+            from denoise import DENOISERS
+
+        names = [name for name in self.available_denoisers if DENOISERS[name].is_loaded]
+        return names + [f"whisper-{key}" for key in self.whisper_models]
+
+    # -- job handlers ---------------------------------------------------------
+
+    def _denoise(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        import soundfile as sf
+
+        try:
+            from .denoise import enhance_channels, split_channels
+        except ImportError:  # pragma: no cover - script mode fallback
+            from denoise import enhance_channels, split_channels
+
+        backend = self.denoiser(request["model"], quantize=bool(request.get("quantize")))
+        audio, sample_rate = sf.read(request["input"], dtype="float32")
+        if sample_rate != backend.required_sample_rate:
+            raise ValueError(f"expected {backend.required_sample_rate} Hz audio, got {sample_rate} Hz")
+        regions = request.get("regions")
+        if regions is not None:
+            regions = [None if plan is None else [tuple(span) for span in plan] for plan in regions]
+        denoised = enhance_channels(backend, split_channels(audio), regions)
+        sf.write(request["output"], denoised, sample_rate)
+        return {"output": request["output"], "model": backend.name}
+
+    def _transcribe(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            from .transcribe import TranscribeOptions, transcribe_audio
+        except ImportError:  # pragma: no cover - script mode fallback
+            from transcribe import TranscribeOptions, transcribe_audio
+
+        options = TranscribeOptions(
+            model=request["model"],
+            backend=request.get("backend", "openai-whisper"),
+            compute_type=request.get("compute_type", "int8"),
+            batch_size=int(request.get("batch_size", 1)),
+        )
+        return {"segments": transcribe_audio(self.whisper(options), request["audio"], options)}
+
+    # -- queue ----------------------------------------------------------------
+
+    def queue_depth(self) -> int:
+        return self.jobs.qsize() + (1 if self.current is not None else 0)
+
+    def status(self) -> Dict[str, Any]:
+        recent = list(self.recent)
+        run_ms = sorted(entry["run_ms"] for entry in recent)
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "queue_depth": self.queue_depth(),
+            "running": None if self.current is None else self.current.request.get("op"),
+            "jobs_done": self.jobs_done,
+            "denoisers": self.available_denoisers,
+            "loaded": self.loaded_models(),
+            "recent": recent[-10:],
+            "median_run_ms": run_ms[len(run_ms) // 2] if run_ms else None,
+        }
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        job = _Job(request=request)
+        self.jobs.put(job)
+        job.done.wait()
+        return job.reply
+
+    def serve_jobs(self) -> None:
+        """Inference loop: runs on its own thread until a None sentinel is queued."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            self.current = job
+            started = time.time()
+            queue_ms = (started - job.queued_at) * 1000.0
+            op = job.request.get("op")
+            try:
+                handler = self.handlers.get(op)
+                if handler is None:
+                    raise ValueError(f"unknown op '{op}'")
+                job.reply = {"ok": True, "result": handler(job.request)}
+            except Exception as e:
+                job.reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            run_ms = (time.time() - started) * 1000.0
+            self.current = None
+            self.jobs_done += 1
+            depth = self.queue_depth()
+            job.reply.update(queue_ms=round(queue_ms, 1), run_ms=round(run_ms, 1), queue_depth=depth)
+            self.recent.append(
+                {"op": op, "model": job.request.get("model"), "queue_ms": round(queue_ms, 1), "run_ms": round(run_ms, 1)}
+            )
+            marker = "✅" if job.reply["ok"] else "❌"
+            print(
+                f"{marker} post -serve-models: {op} ({job.request.get('model')}) waited {queue_ms:.0f}ms, "
+                f"ran {run_ms / 1000.0:.2f}s, queue depth {depth}"
+                + ("" if job.reply["ok"] else f" — {job.reply['error']}")
+            )
+            job.done.set()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server: ModelServer = self.server.model_server  # type: ignore[attr-defined]
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            reply = {"ok": False, "error": f"invalid request: {e}"}
+        else:
+            op = request.get("op")
+            if op == "status":
+                reply = {"ok": True, "result": server.status()}
+            elif op == "shutdown":
+                reply = {"ok": True, "result": {"stopping": True}}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                reply = server.submit(request)
+        self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _print_status(status: Dict[str, Any]) -> None:
+    print(f"🛰️  post -serve-models: pid {status['pid']}, up {status['uptime_s']:.0f}s")
+    print(f"   queue depth: {status['queue_depth']} (running: {status['running'] or 'idle'})")
+    print(f"   jobs done:   {status['jobs_done']}")
+    print(f"   loaded:      {', '.join(status['loaded']) or 'nothing yet'}")
+    if status["median_run_ms"] is not None:
+        print(f"   median job:  {status['median_run_ms'] / 1000.0:.2f}s")
+    for entry in status["recent"]:
+        print(f"   • {entry['op']} ({entry['model']}): waited {entry['queue_ms']:.0f}ms, ran {entry['run_ms'] / 1000.0:.2f}s")
+
+
+def run(args):
+    """
+    Keep the denoise and transcription models resident and serve jobs over a Unix socket.
+
+    While the daemon is running, `post -denoise` and `post -transcribe` send their model
+    work to it instead of importing torch and loading weights themselves; when it is not
+    running they fall back to in-process models. Back-to-back takes therefore start
+    inference within milliseconds.
+
+    Dependencies:
+        - The dependencies of every model it should serve (unavailable denoisers are skipped)
+
+    Usage:
+        post -serve-models                          # preload DeepFilterNet, DNS64 and Whisper medium
+        post -serve-models --whisper medium large-v3
+        post -serve-models --status
+        post -serve-models --stop
+
+    The socket lives in `~/.cache/post/run/models.sock` (override with POST_MODEL_SOCKET).
+    Set POST_NO_DAEMON=1 to make a stage ignore a running daemon.
+    """
+    parser = build_cli_parser(
+        stage="serve-models",
+        summary="Keep denoise and transcription models resident for fast back-to-back runs.",
+    )
+    parser.add_argument(
+        "--denoisers",
+        nargs="*",
+        default=["deepfilter", "facebook"],
+        help="Denoisers to preload (others load on first use).",
+    )
+    parser.add_argument(
+        "--whisper",
+        nargs="*",
+        default=["medium"],
+        help="Whisper model sizes to preload (others load on first use).",
+    )
+    parser.add_argument(
+        "--backend",
+        default="openai-whisper",
+        choices=["openai-whisper", "faster-whisper"],
+        help="Backend of the preloaded Whisper models.",
+    )
+    parser.add_argument(
+        "--compute-type",
+        default="int8",
+        help="CTranslate2 compute type of preloaded faster-whisper models.",
+    )
+    parser.add_argument("--intra-op-threads", type=int, default=0, help="Intra-op threads (0 = default).")
+    parser.add_argument("--inter-op-threads", type=int, default=0, help="Inter-op threads (0 = default).")
+    parser.add_argument("--status", action="store_true", help="Print the status of the running daemon and exit.")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon.")
+    parsed = parser.parse_args(args)
+
+    env = StageEnvironment.create(stage="serve-models", directory=parsed.dir, auto_confirm=parsed.yes)
+    socket_path = daemon_socket_path()
+
+    if parsed.status or parsed.stop:
+        status = daemon_status()
+        if status is None:
+            env.abort(f"No daemon is listening on '{socket_path}'.")
+        if parsed.stop:
+            daemon_request({"op": "shutdown"})
+            print(f"🛑 post -serve-models: stopped daemon (pid {status['pid']}).")
+        else:
+            _print_status(status)
+        return
+
+    if daemon_status() is not None:
+        env.abort(f"A daemon is already listening on '{socket_path}'. Use --status or --stop.")
+    if socket_path.exists():
+        socket_path.unlink()
+
+    model_server = ModelServer(parsed.intra_op_threads, parsed.inter_op_threads)
+    model_server.check_denoisers(env)
+    if not model_server.available_denoisers:
+        print("⚠️  post -serve-models: no denoiser dependencies are installed; serving transcription only.")
+
+    for name in parsed.denoisers:
+        try:
+            model_server.denoiser(name)
+        except Exception as e:
+            print(f"⚠️  post -serve-models: could not preload '{name}': {e}")
+    try:
+        from .transcribe import TranscribeOptions
+    except ImportError:  # pragma: no cover - script mode fallback
+        from transcribe import TranscribeOptions
+
+    for name in parsed.whisper:
+        try:
+            model_server.whisper(TranscribeOptions(model=name, backend=parsed.backend, compute_type=parsed.compute_type))
+        except Exception as e:
+            print(f"⚠️  post -serve-models: could not preload Whisper '{name}': {e}")
+
+    worker = threading.Thread(target=model_server.serve_jobs, name="serve-models-inference", daemon=True)
+    worker.start()
+
+    server = _UnixServer(str(socket_path), _RequestHandler)
+    server.model_server = model_server  # type: ignore[attr-defined]
+    os.chmod(socket_path, 0o600)
+    print(f"🛰️  post -serve-models: listening on '{socket_path}' (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 post -serve-models: shutting down...")
+    finally:
+        server.server_close()
+        model_server.jobs.put(None)
+        if socket_path.exists():
+            socket_path.unlink()
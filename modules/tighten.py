@@ -1,5 +1,4 @@
 import signal
-import re
 import sys
 import shutil
 import subprocess
@@ -20,12 +19,16 @@ try:
         build_cli_parser,
         find_preferred_rough_video,
     )  # type: ignore[attr-defined]
+    from .pcm_cache import load_audio
+    from .remap import write_segment_map
 except ImportError:  # pragma: no cover - handles execution as a standalone script
     from common import (
         StageEnvironment,
         build_cli_parser,
         find_preferred_rough_video,
     )  # type: ignore[attr-defined]
+    from pcm_cache import load_audio
+    from remap import write_segment_map
 
 # Import shared video editing utilities
 try:
@@ -191,35 +194,47 @@ def _probe_dimensions(path: Path, env: StageEnvironment) -> Tuple[int, int]:
     raise AssertionError("unreachable")  # pragma: no cover
 
 
-def _parse_silences(log_output: str, env: StageEnvironment, duration: float) -> Sequence[SilenceWindow]:
-    start_pattern = re.compile(r"silence_start:\s*([0-9.+-]+)")
-    end_pattern = re.compile(r"silence_end:\s*([0-9.+-]+)")
+# Samples per block scanned by the silence detector (bounds its temporary memory).
+SILENCE_SCAN_BLOCK_FRAMES = 1 << 22
 
-    silences: List[SilenceWindow] = []
-    current_start: float | None = None
 
-    for line in log_output.splitlines():
-        if match := start_pattern.search(line):
-            try:
-                current_start = float(match.group(1))
-            except ValueError:
-                current_start = None
-        elif match := end_pattern.search(line):
-            if current_start is None:
-                continue
-            try:
-                end_time = float(match.group(1))
-            except ValueError:
-                current_start = None
-                continue
-            silences.append(SilenceWindow(start=current_start, end=end_time))
-            current_start = None
-
-    if current_start is not None:
-        silences.append(SilenceWindow(start=current_start, end=duration))
+def detect_silence_windows(
+    samples,
+    sample_rate: int,
+    threshold_db: float,
+    min_duration: float,
+) -> List[Tuple[float, float]]:
+    """
+    NumPy equivalent of ffmpeg's `silencedetect` on (frames,) or (frames, channels) samples.
 
-    silences.sort(key=lambda window: window.start)
-    return tuple(silences)
+    A sample is silent when every channel's amplitude is below `threshold_db`; runs of
+    silent samples lasting at least `min_duration` are returned as (start, end) seconds.
+    A run still open at the end of the audio ends at the last sample.
+    """
+    import numpy as np
+
+    threshold = 10.0 ** (threshold_db / 20.0)
+    min_samples = int(round(min_duration * sample_rate))
+    windows: List[Tuple[float, float]] = []
+    open_start: Optional[int] = None
+    total = samples.shape[0]
+
+    for block_start in range(0, total, SILENCE_SCAN_BLOCK_FRAMES):
+        block = np.abs(samples[block_start : block_start + SILENCE_SCAN_BLOCK_FRAMES])
+        silent = (block.max(axis=1) if block.ndim == 2 else block) < threshold
+        steps = np.diff(np.concatenate(([open_start is not None], silent)).astype(np.int8))
+        starts = np.flatnonzero(steps == 1) + block_start
+        ends = np.flatnonzero(steps == -1) + block_start
+        if open_start is not None:
+            starts = np.concatenate(([open_start], starts))
+        open_start = int(starts[-1]) if len(starts) > len(ends) else None
+        starts = starts[: len(ends)]
+        keep = ends - starts >= min_samples
+        windows.extend((int(start) / sample_rate, int(end) / sample_rate) for start, end in zip(starts[keep], ends[keep]))
+
+    if open_start is not None and total - open_start >= min_samples:
+        windows.append((open_start / sample_rate, total / sample_rate))
+    return windows
 
 
 def _detect_silences(
@@ -228,42 +243,19 @@ def _detect_silences(
     threshold_db: float,
     min_duration: float,
 ) -> Sequence[SilenceWindow]:
-    detect_filter = (
-        f"silencedetect=noise={threshold_db}dB:d={min_duration}"
-    )
-    process = subprocess.Popen(
-        [
-            "ffmpeg",
-            "-hide_banner",
-            "-nostdin",
-            "-threads", "0",  # Use all available CPU cores
-            "-i",
-            str(path),
-            "-vn",  # Skip video processing entirely - only analyze audio
-            "-af",
-            detect_filter,
-            "-f",
-            "null",
-            "-",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-
+    """Silence windows of `path`'s audio, read from the shared PCM cache."""
     try:
-        stdout, stderr = process.communicate()
-        return_code = process.returncode
-    except KeyboardInterrupt:
-        _terminate_process(process)
-        raise
-
-    if return_code != 0:
-        message = stderr.strip() or stdout.strip() or "unknown error"
-        env.abort(f"ffmpeg silencedetect failed: {message}")
+        samples, sample_rate = load_audio(path)
+    except RuntimeError as e:
+        env.abort(str(e))
 
+    # Like silencedetect's unterminated silence, a trailing window runs to the container's end.
     duration = _probe_duration(path, env)
-    return _parse_silences(stderr, env, duration)
+    audio_end = samples.shape[0] / sample_rate
+    return tuple(
+        SilenceWindow(start=start, end=duration if end >= audio_end else end)
+        for start, end in detect_silence_windows(samples, sample_rate, threshold_db, min_duration)
+    )
 
 
 def _clamp(value: float, lower: float, upper: float) -> float:
@@ -618,6 +610,8 @@ def run(args):
     
     Output:
         - Generates `<title>-<take_id>-rough-tight.mp4`, i.e., the same base filename with `-tight` appended before `.mp4`.
+        - Writes `<title>-<take_id>-rough-tight.segments.json`, the kept source ranges, so
+          `post -remap` can move a transcript of the rough cut onto the tightened video.
     """
     parser = build_cli_parser(
         stage="tighten",
@@ -731,6 +725,8 @@ def run(args):
 
     # Encode the tightened video
     _encode_tightened(rough_video, tightened_video, keep_segments, env)
+    map_file = write_segment_map(tightened_video, rough_video, keep_segments)
+    print(f"🧭 post -tighten: recorded {len(keep_segments)} keep segment(s) in '{map_file.name}'.")
 
     print(
         f"✅ post -tighten: wrote tightened cut to '{tightened_video.name}'."
@@ -1,13 +1,853 @@
+import base64
+import bisect
+import hashlib
+import itertools
 import json
+import math
+import os
 import shutil
 import subprocess
 import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
 
 try:
-    from .common import StageEnvironment, build_cli_parser
+    from .common import StageEnvironment, build_cli_parser, post_cache_dir
+    from .model_cache import load_whisper
+    from .pcm_cache import load_audio
+    from .serve_models import ModelDaemonError, daemon_request, daemon_status
+    from .wordstore import write_word_sidecar
 except ImportError:
-    from common import StageEnvironment, build_cli_parser
+    from common import StageEnvironment, build_cli_parser, post_cache_dir
+    from model_cache import load_whisper
+    from pcm_cache import load_audio
+    from serve_models import ModelDaemonError, daemon_request, daemon_status
+    from wordstore import write_word_sidecar
+
+
+def segments_from_result(result):
+    """
+    Convert a stable-ts result into plain segment dicts.
+
+    Each segment is {"start", "end", "text", "words": [{"word", "start", "end"}]}; words
+    without text or timestamps are dropped. Words also carry the model's "probability"
+    when it reports one. The same shape is returned by the model daemon.
+    """
+    segments = []
+    for segment in result.segments:
+        words = []
+        for word in getattr(segment, "words", []):
+            text = (word.word or "").strip()
+            start = getattr(word, "start", None)
+            end = getattr(word, "end", None)
+            if not text or start is None or end is None:
+                continue
+            entry = {
+                'word': text,
+                'start': float(start),
+                'end': float(end)
+            }
+            probability = getattr(word, "probability", None)
+            if probability is not None:
+                entry['probability'] = float(probability)
+            words.append(entry)
+        start = getattr(segment, "start", None)
+        end = getattr(segment, "end", None)
+        segments.append({
+            'start': None if start is None else float(start),
+            'end': None if end is None else float(end),
+            'text': getattr(segment, "text", "") or "",
+            'words': words,
+        })
+    return segments
+
+
+# ============================================================================
+# TRANSCRIPTION BACKENDS
+# ============================================================================
+
+WHISPER_MODELS = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
+BACKENDS = ["openai-whisper", "faster-whisper"]
+# CTranslate2 compute types offered for faster-whisper (int8 variants are fastest on CPU).
+COMPUTE_TYPES = ["int8", "int8_float32", "int8_float16", "float16", "float32"]
+
+
+@dataclass(frozen=True)
+class TranscribeOptions:
+    """Which model runs and how; picklable so worker processes can load the same model."""
+
+    model: str = "medium"
+    backend: str = "openai-whisper"
+    compute_type: str = "int8"
+    batch_size: int = 1
+
+    @property
+    def label(self) -> str:
+        if self.backend == "faster-whisper":
+            batching = f", batch {self.batch_size}" if self.batch_size > 1 else ""
+            return f"{self.model} via faster-whisper ({self.compute_type}{batching})"
+        return f"{self.model} via openai-whisper"
+
+    @property
+    def cache_key(self) -> str:
+        """Transcript-cache namespace; backends and quantizations transcribe differently."""
+        if self.backend == "faster-whisper":
+            return f"{self.model}-faster-whisper-{self.compute_type}"
+        return self.model
+
+
+def load_transcriber(options: TranscribeOptions, threads: int = 0):
+    """
+    Load the Whisper model for `options`.
+
+    openai-whisper goes through the memory-mapped weights cache; faster-whisper uses
+    stable-ts's CTranslate2 integration with the requested compute type.
+    """
+    if options.backend == "faster-whisper":
+        import stable_whisper
+
+        device = "cpu"
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                device = "cuda"
+        except ImportError:
+            pass
+        return stable_whisper.load_faster_whisper(
+            options.model,
+            device=device,
+            compute_type=options.compute_type,
+            cpu_threads=threads,
+        )
+
+    if threads > 0:
+        import torch
+
+        torch.set_num_threads(threads)
+    return load_whisper(options.model)
+
+
+def transcribe_audio(model, audio, options: TranscribeOptions) -> List[dict]:
+    """Transcribe a path or 16 kHz float32 array into plain segment dicts."""
+    if options.backend == "faster-whisper":
+        transcribe = getattr(model, "transcribe_stable", model.transcribe)
+        extra = {"batch_size": options.batch_size} if options.batch_size > 1 else {}
+        result = transcribe(audio, word_timestamps=True, **extra)
+    else:
+        result = model.transcribe(audio, word_timestamps=True)
+    return segments_from_result(result)
+
+
+# ============================================================================
+# SILENCE-SPLIT CHUNKING
+# ============================================================================
+
+SAMPLE_RATE = 16000
+
+# Frames quieter than this are silence (matches tighten's low threshold).
+CHUNK_SILENCE_THRESHOLD_DB = -50.0
+CHUNK_FRAME_SECONDS = 0.02
+# Only pauses at least this long split the audio; shorter ones stay inside a span.
+CHUNK_MIN_SILENCE_SECONDS = 0.7
+# Silence kept around each speech span so word edges are not clipped.
+CHUNK_SPAN_PADDING_SECONDS = 0.2
+# Zeros inserted between joined spans so Whisper still hears a pause.
+CHUNK_JOIN_GAP_SECONDS = 0.3
+# Chunk length bounds; the target inside them depends on the worker count.
+CHUNK_MIN_SECONDS = 30.0
+CHUNK_MAX_SECONDS = 120.0
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """Speech spans (sample ranges of the source audio) that are transcribed together."""
+
+    spans: Tuple[Tuple[int, int], ...]
+
+    @property
+    def gap_samples(self) -> int:
+        return int(CHUNK_JOIN_GAP_SECONDS * SAMPLE_RATE)
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.spans) / SAMPLE_RATE
+
+    def render(self, audio):
+        """The chunk's audio: its spans joined by short gaps of silence."""
+        import numpy as np
+
+        gap = np.zeros(self.gap_samples, dtype=np.float32)
+        pieces = []
+        for index, (start, end) in enumerate(self.spans):
+            if index:
+                pieces.append(gap)
+            pieces.append(audio[start:end])
+        return np.concatenate(pieces).astype(np.float32, copy=False)
+
+    def source_time(self, seconds: float) -> float:
+        """Map a time inside the rendered chunk back to the source audio (exact per sample)."""
+        position = seconds * SAMPLE_RATE
+        offset = 0
+        for start, end in self.spans:
+            length = end - start
+            if position < offset + length:
+                return (start + max(0.0, position - offset)) / SAMPLE_RATE
+            offset += length
+            if position < offset + self.gap_samples:
+                # Inside the inserted gap: snap to the end of the span before it.
+                return end / SAMPLE_RATE
+            offset += self.gap_samples
+        return self.spans[-1][1] / SAMPLE_RATE
+
+
+def _frame_levels_db(audio):
+    """RMS level of each CHUNK_FRAME_SECONDS frame in dBFS."""
+    import numpy as np
+
+    frame = int(CHUNK_FRAME_SECONDS * SAMPLE_RATE)
+    frames = audio[: len(audio) // frame * frame].reshape(-1, frame).astype(np.float64)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def find_speech_spans(audio) -> List[Tuple[int, int]]:
+    """Sample ranges between pauses of at least CHUNK_MIN_SILENCE_SECONDS, padded at both edges."""
+    import numpy as np
+
+    frame = int(CHUNK_FRAME_SECONDS * SAMPLE_RATE)
+    voiced = _frame_levels_db(audio) > CHUNK_SILENCE_THRESHOLD_DB
+    if not voiced.any():
+        return []
+
+    voiced_frames = np.flatnonzero(voiced)
+    min_gap = int(round(CHUNK_MIN_SILENCE_SECONDS / CHUNK_FRAME_SECONDS))
+    breaks = np.flatnonzero(np.diff(voiced_frames) > min_gap)
+    starts = np.concatenate(([voiced_frames[0]], voiced_frames[breaks + 1]))
+    ends = np.concatenate((voiced_frames[breaks], [voiced_frames[-1]])) + 1
+
+    padding = int(CHUNK_SPAN_PADDING_SECONDS * SAMPLE_RATE)
+    return [
+        (max(0, int(start) * frame - padding), min(len(audio), int(end) * frame + padding))
+        for start, end in zip(starts, ends)
+    ]
+
+
+def _split_long_span(audio, start: int, end: int, max_samples: int) -> List[Tuple[int, int]]:
+    """Cut a span longer than max_samples at its quietest frames."""
+    import numpy as np
+
+    frame = int(CHUNK_FRAME_SECONDS * SAMPLE_RATE)
+    pieces = []
+    while end - start > max_samples:
+        # Look for the quietest frame in the second half of the allowed window.
+        window_start = start + max_samples // 2
+        levels = _frame_levels_db(audio[window_start : start + max_samples])
+        cut = window_start + int(np.argmin(levels)) * frame if levels.size else start + max_samples
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def plan_chunks(audio, spans: Sequence[Tuple[int, int]], max_seconds: float) -> List[AudioChunk]:
+    """Greedily pack consecutive speech spans into chunks no longer than max_seconds."""
+    max_samples = int(max_seconds * SAMPLE_RATE)
+    gap = int(CHUNK_JOIN_GAP_SECONDS * SAMPLE_RATE)
+
+    chunks: List[AudioChunk] = []
+    current: List[Tuple[int, int]] = []
+    current_length = 0
+    for span_start, span_end in spans:
+        for piece in _split_long_span(audio, span_start, span_end, max_samples):
+            length = piece[1] - piece[0]
+            if current and current_length + gap + length > max_samples:
+                chunks.append(AudioChunk(tuple(current)))
+                current, current_length = [], 0
+            current_length += (gap if current else 0) + length
+            current.append(piece)
+    if current:
+        chunks.append(AudioChunk(tuple(current)))
+    return chunks
+
+
+def _default_workers() -> int:
+    """One decoding stream per four cores on CPU; a single stream on a GPU."""
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return 1
+    except ImportError:
+        pass
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+_WORKER_MODEL = None
+_WORKER_OPTIONS: Optional[TranscribeOptions] = None
+
+
+def _init_chunk_worker(options: TranscribeOptions, threads: int) -> None:
+    """Process-pool initializer: load the model once per worker with its share of the threads."""
+    global _WORKER_MODEL, _WORKER_OPTIONS
+    _WORKER_OPTIONS = options
+    _WORKER_MODEL = load_transcriber(options, threads)
+
+
+def _transcribe_chunk_audio(audio) -> List[dict]:
+    return transcribe_audio(_WORKER_MODEL, audio, _WORKER_OPTIONS)
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+class ChunkTranscriber:
+    """
+    Loads the model in the background and transcribes chunks in order.
+
+    Created before the audio is extracted when the transcript cache cannot serve the
+    run, so model loading (one load per worker process, or a loader thread for a single
+    stream) overlaps with ffmpeg; otherwise only once the cache lookup leaves chunks to
+    decode, so a fully cached rerun never loads a model.
+    """
+
+    def __init__(self, options: TranscribeOptions, workers: int) -> None:
+        self.options = options
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._loader: Optional[ThreadPoolExecutor] = None
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            print(f"📦 post -transcribe: starting {workers} worker(s) with {threads} thread(s) each ({options.label})...")
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_chunk_worker,
+                initargs=(options, threads),
+            )
+            # Spawn every worker now; each loads its model while the audio is extracted.
+            for _ in range(workers):
+                self._pool.submit(_worker_ready)
+        else:
+            print(f"📦 post -transcribe: loading Whisper model {options.label} in the background...")
+            self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcribe-load")
+            self._model = self._loader.submit(load_transcriber, options)
+
+    def transcribe(self, rendered: Sequence) -> Iterator[List[dict]]:
+        """Yield the segments of each rendered chunk, in chunk order, as soon as it is decoded."""
+        if self._pool is not None:
+            yield from self._pool.map(_transcribe_chunk_audio, rendered)
+            return
+        model = self._model.result()
+        for chunk_audio in rendered:
+            yield transcribe_audio(model, chunk_audio, self.options)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._loader is not None:
+            self._loader.shutdown(wait=False)
+
+
+def _transcribe_chunks_with_daemon(chunks, audio, options: TranscribeOptions, temp_dir: Path) -> Iterator[List[dict]]:
+    """Send chunks to `post -serve-models` one by one; raises ModelDaemonError if it fails or stops."""
+    import soundfile as sf
+
+    for index, chunk in enumerate(chunks):
+        chunk_path = temp_dir / f"chunk-{index:04d}.wav"
+        sf.write(str(chunk_path), chunk.render(audio), SAMPLE_RATE)
+        reply = daemon_request(
+            {
+                "op": "transcribe",
+                "model": options.model,
+                "backend": options.backend,
+                "compute_type": options.compute_type,
+                "batch_size": options.batch_size,
+                "audio": str(chunk_path),
+            }
+        )
+        if reply is None:
+            raise ModelDaemonError("the daemon stopped")
+        yield reply["result"]["segments"]
+
+
+def stitch_chunk_segments(chunks: Sequence[AudioChunk], chunk_segments: Sequence[List[dict]]) -> List[dict]:
+    """Shift each chunk's segments and words back onto the source timeline."""
+    stitched = []
+    for chunk, segments in zip(chunks, chunk_segments):
+        for segment in segments:
+            stitched.append({
+                'start': None if segment["start"] is None else chunk.source_time(segment["start"]),
+                'end': None if segment["end"] is None else chunk.source_time(segment["end"]),
+                'text': segment["text"],
+                'words': [
+                    {**word, 'start': chunk.source_time(word["start"]), 'end': chunk.source_time(word["end"])}
+                    for word in segment["words"]
+                ],
+            })
+    return stitched
+
+
+def shift_segments(segments: Sequence[dict], offset: float) -> List[dict]:
+    """Copy of `segments` with every segment and word time moved by `offset` seconds."""
+    return [
+        {
+            'start': None if segment["start"] is None else segment["start"] + offset,
+            'end': None if segment["end"] is None else segment["end"] + offset,
+            'text': segment["text"],
+            'words': [
+                {**word, 'start': word["start"] + offset, 'end': word["end"] + offset}
+                for word in segment["words"]
+            ],
+        }
+        for segment in segments
+    ]
+
+
+def assign_segments_to_spans(segments: Sequence[dict], spans: Sequence[Tuple[int, int]]) -> List[List[dict]]:
+    """
+    Distribute stitched segments over the speech spans they came from.
+
+    Words belong to the span containing their midpoint; a segment whose words cross a
+    span boundary is split there, with its text rebuilt from the words.
+    """
+    starts = [start / SAMPLE_RATE for start, _ in spans]
+
+    def _span_index(seconds: float) -> int:
+        return max(0, bisect.bisect_right(starts, seconds) - 1)
+
+    per_span: List[List[dict]] = [[] for _ in spans]
+    for segment in segments:
+        if not segment["words"]:
+            if segment["start"] is not None:
+                per_span[_span_index(segment["start"])].append(segment)
+            continue
+        parts = [
+            (index, list(words))
+            for index, words in itertools.groupby(
+                segment["words"], key=lambda word: _span_index((word["start"] + word["end"]) / 2)
+            )
+        ]
+        if len(parts) == 1:
+            per_span[parts[0][0]].append(segment)
+            continue
+        for index, words in parts:
+            per_span[index].append({
+                'start': words[0]["start"],
+                'end': words[-1]["end"],
+                'text': " " + " ".join(word["word"] for word in words),
+                'words': words,
+            })
+    return per_span
+
+
+# ============================================================================
+# TRANSCRIPT CACHE
+# ============================================================================
+
+# Fingerprint frames follow Whisper's own analysis grid (25 ms windows, 10 ms hop).
+FINGERPRINT_WINDOW = 400
+FINGERPRINT_HOP = 160
+# FFT bins bounding the fingerprint bands (~220 Hz to 4 kHz, log spaced).
+FINGERPRINT_BAND_EDGES = (7, 128, 18)
+# A re-extracted span may start a few frames earlier or later than the cached one.
+FINGERPRINT_MAX_SHIFT_FRAMES = 5
+# Share of differing fingerprint bits tolerated for the same audio (resampling noise).
+FINGERPRINT_MAX_BIT_ERROR_RATE = 0.2
+# Spans shorter than this only reuse exact matches.
+FINGERPRINT_MIN_FUZZY_FRAMES = 50
+
+
+def span_fingerprint(samples):
+    """
+    Bit fingerprint of a speech span: the signs of band-energy differences across
+    neighbouring bands and frames. Robust to the small sample-level changes that a
+    re-cut and re-extraction introduce, unlike a hash of the raw PCM.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    low, high, count = FINGERPRINT_BAND_EDGES
+    bits_per_frame = count - 2
+    if len(samples) < FINGERPRINT_WINDOW + FINGERPRINT_HOP:
+        return np.zeros((0, bits_per_frame), dtype=bool)
+
+    frames = sliding_window_view(samples, FINGERPRINT_WINDOW)[::FINGERPRINT_HOP] * np.hanning(FINGERPRINT_WINDOW)
+    power = np.abs(np.fft.rfft(frames, n=512, axis=1)) ** 2
+    edges = np.unique(np.round(np.geomspace(low, high, count)).astype(int))
+    bands = np.log(np.add.reduceat(power, edges, axis=1)[:, :-1] + 1e-10)
+    band_diff = bands[:, :-1] - bands[:, 1:]
+    return (band_diff[1:] - band_diff[:-1]) > 0
+
+
+def _fingerprint_offset(cached, current) -> Optional[int]:
+    """Frames by which `current` lags `cached`, or None when they are different audio."""
+    import numpy as np
+
+    best_offset, best_error = None, FINGERPRINT_MAX_BIT_ERROR_RATE
+    longest = max(len(cached), len(current))
+    for offset in range(-FINGERPRINT_MAX_SHIFT_FRAMES, FINGERPRINT_MAX_SHIFT_FRAMES + 1):
+        a = cached[max(0, -offset):]
+        b = current[max(0, offset):]
+        overlap = min(len(a), len(b))
+        if overlap < 0.8 * longest:
+            continue
+        error = float(np.mean(a[:overlap] != b[:overlap]))
+        if error <= best_error:
+            best_offset, best_error = offset, error
+    return best_offset
+
+
+class TranscriptCache:
+    """
+    Transcribed segments per speech span, keyed by a fingerprint of the span's PCM.
+
+    Entries live in `post_cache_dir("transcripts", <model>)` as
+    `<frames>-<pcm digest>.json`, with times relative to the span start. An identical
+    span is found by name; otherwise spans of similar length are compared by
+    fingerprint and the matched frame offset shifts the cached words.
+    """
+
+    def __init__(self, model_key: str) -> None:
+        self.directory = post_cache_dir("transcripts", model_key)
+
+    def is_empty(self) -> bool:
+        """True when nothing has been cached for this model yet, so every lookup will miss."""
+        return next(self.directory.glob("*.json"), None) is None
+
+    @staticmethod
+    def _digest(samples) -> str:
+        import numpy as np
+
+        pcm = np.round(np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        return hashlib.sha256(pcm.tobytes()).hexdigest()[:20]
+
+    def lookup(self, samples) -> Optional[Tuple[List[dict], float]]:
+        """Cached segments (relative to the span start) and the extra shift in seconds to apply."""
+        import numpy as np
+
+        fingerprint = span_fingerprint(samples)
+        frames = len(fingerprint)
+        exact = self.directory / f"{frames:06d}-{self._digest(samples)}.json"
+        if exact.exists():
+            return json.loads(exact.read_text(encoding="utf-8"))["segments"], 0.0
+        if frames < FINGERPRINT_MIN_FUZZY_FRAMES:
+            return None
+
+        for candidate_frames in range(frames - FINGERPRINT_MAX_SHIFT_FRAMES, frames + FINGERPRINT_MAX_SHIFT_FRAMES + 1):
+            for path in sorted(self.directory.glob(f"{candidate_frames:06d}-*.json")):
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                    packed = np.frombuffer(base64.b64decode(entry["fingerprint"]), dtype=np.uint8)
+                    cached = np.unpackbits(packed)[: entry["frames"] * entry["bits"]].reshape(entry["frames"], entry["bits"])
+                except (OSError, ValueError, KeyError):
+                    continue
+                if cached.shape[1] != fingerprint.shape[1]:
+                    continue
+                offset = _fingerprint_offset(cached.astype(bool), fingerprint)
+                if offset is not None:
+                    return entry["segments"], offset * FINGERPRINT_HOP / SAMPLE_RATE
+        return None
+
+    def store(self, samples, segments: Sequence[dict]) -> None:
+        import numpy as np
+
+        fingerprint = span_fingerprint(samples)
+        entry = {
+            "frames": int(fingerprint.shape[0]),
+            "bits": int(fingerprint.shape[1]),
+            "fingerprint": base64.b64encode(np.packbits(fingerprint).tobytes()).decode("ascii"),
+            "segments": list(segments),
+        }
+        path = self.directory / f"{len(fingerprint):06d}-{self._digest(samples)}.json"
+        partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+        partial.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        partial.replace(path)
+
+
+# ============================================================================
+# FORCED ALIGNMENT
+# ============================================================================
+
+# Aligned words shorter than this were squeezed in: the audio does not say them.
+ALIGN_MIN_WORD_SECONDS = 0.02
+# Aligned words below this probability are treated as mismatches too.
+ALIGN_MIN_PROBABILITY = 0.1
+# Context added around each mismatched region before it is re-transcribed.
+ALIGN_MISMATCH_PADDING_SECONDS = 0.3
+
+
+def _merge_regions(regions: List[dict], total_seconds: float) -> List[dict]:
+    """Pad, clip and merge overlapping mismatch regions (sorted by start)."""
+    merged: List[dict] = []
+    for region in sorted(regions, key=lambda item: item["start"]):
+        start = max(0.0, region["start"] - ALIGN_MISMATCH_PADDING_SECONDS)
+        end = min(total_seconds, region["end"] + ALIGN_MISMATCH_PADDING_SECONDS)
+        if merged and start <= merged[-1]["end"]:
+            last = merged[-1]
+            last["end"] = max(last["end"], end)
+            if region["reason"] not in last["reason"]:
+                last["reason"] += f"; {region['reason']}"
+            last["script_text"] = " ".join(filter(None, [last["script_text"], region["script_text"]]))
+        else:
+            merged.append({"start": start, "end": end, "reason": region["reason"], "script_text": region["script_text"]})
+    return merged
+
+
+def align_to_script(model, audio, spans: Sequence[Tuple[int, int]], text: str, language: str) -> Tuple[List[dict], List[dict]]:
+    """
+    Force-align a known script with stable-ts and flag the regions where it does not fit.
+
+    Returns `(segments, mismatches)`. A mismatch is a run of script words that could not
+    be placed (no duration or very low probability) or a speech span that no script word
+    landed in (ad-libbed speech). Each mismatch is {"start", "end", "reason", "script_text"}.
+    """
+    result = model.align(audio, text, language=language)
+
+    regions: List[dict] = []
+    run: List = []
+
+    def _close_run() -> None:
+        if run:
+            regions.append({
+                "start": float(run[0].start),
+                "end": float(run[-1].end),
+                "reason": "script words not found in the audio",
+                "script_text": " ".join((word.word or "").strip() for word in run),
+            })
+            run.clear()
+
+    placed = []
+    for segment in result.segments:
+        for word in getattr(segment, "words", []):
+            if word.start is None or word.end is None:
+                continue
+            probability = getattr(word, "probability", None)
+            if (word.end - word.start) < ALIGN_MIN_WORD_SECONDS or (
+                probability is not None and probability < ALIGN_MIN_PROBABILITY
+            ):
+                run.append(word)
+                continue
+            _close_run()
+            placed.append((word.start + word.end) / 2)
+    _close_run()
+
+    placed.sort()
+    for start, end in spans:
+        lo = bisect.bisect_left(placed, start / SAMPLE_RATE)
+        if lo == len(placed) or placed[lo] > end / SAMPLE_RATE:
+            regions.append({
+                "start": start / SAMPLE_RATE,
+                "end": end / SAMPLE_RATE,
+                "reason": "speech not in the script",
+                "script_text": "",
+            })
+
+    return segments_from_result(result), _merge_regions(regions, len(audio) / SAMPLE_RATE)
+
+
+def transcribe_regions(model, regions: Sequence[dict], audio, options: TranscribeOptions) -> List[dict]:
+    """Open transcription of each region's audio on its own, on the source timeline."""
+    fresh: List[dict] = []
+    for region in regions:
+        chunk = AudioChunk(((int(region["start"] * SAMPLE_RATE), int(region["end"] * SAMPLE_RATE)),))
+        fresh.extend(stitch_chunk_segments([chunk], [transcribe_audio(model, chunk.render(audio), options)]))
+    return fresh
+
+
+def splice_regions(segments: Sequence[dict], regions: Sequence[dict], fresh: Sequence[dict]) -> List[dict]:
+    """Drop the words of `segments` inside `regions` and merge in the `fresh` segments."""
+
+    def _inside(word: dict) -> bool:
+        middle = (word["start"] + word["end"]) / 2
+        return any(region["start"] <= middle <= region["end"] for region in regions)
+
+    kept: List[dict] = []
+    for segment in segments:
+        if not any(_inside(word) for word in segment["words"]):
+            kept.append(segment)
+            continue
+        # Keep the words on either side of a region as separate segments.
+        for inside, words in itertools.groupby(segment["words"], key=_inside):
+            words = list(words)
+            if not inside:
+                kept.append({
+                    'start': words[0]["start"],
+                    'end': words[-1]["end"],
+                    'text': " " + " ".join(word["word"] for word in words),
+                    'words': words,
+                })
+    return sorted(kept + list(fresh), key=lambda segment: segment["start"] if segment["start"] is not None else 0.0)
+
+
+def retranscribe_regions(segments: Sequence[dict], regions: Sequence[dict], audio, options: TranscribeOptions) -> List[dict]:
+    """Replace the words inside `regions` with an open transcription of just that audio."""
+    print(f"📦 post -transcribe: loading Whisper model {options.label} for the mismatched regions...")
+    model = load_transcriber(options)
+    return splice_regions(segments, regions, transcribe_regions(model, regions, audio, options))
+
+
+# ============================================================================
+# MODEL CASCADE
+# ============================================================================
+
+# Draft words below this probability are re-decoded by the large model.
+CASCADE_MIN_PROBABILITY = 0.5
+# Confident words kept on each side of a low-confidence run as decoding context.
+CASCADE_CONTEXT_WORDS = 1
+# Escalated regions are widened word by word to at least this length.
+CASCADE_MIN_REGION_SECONDS = 1.5
+
+
+def low_confidence_regions(
+    segments: Sequence[dict], span: Tuple[int, int], threshold: float = CASCADE_MIN_PROBABILITY
+) -> List[dict]:
+    """
+    Regions of one speech span whose draft words fall below `threshold`.
+
+    Every run of low-probability words is widened by CASCADE_CONTEXT_WORDS on each side
+    (and further, up to CASCADE_MIN_REGION_SECONDS) so the large model hears some
+    context; regions start and end on word boundaries and never leave the span. Words
+    without a probability count as confident.
+    """
+    words = [word for segment in segments for word in segment["words"]]
+    low = [index for index, word in enumerate(words) if word.get("probability", 1.0) < threshold]
+    span_start, span_end = span[0] / SAMPLE_RATE, span[1] / SAMPLE_RATE
+
+    ranges: List[List[int]] = []
+    for index in low:
+        first = max(0, index - CASCADE_CONTEXT_WORDS)
+        last = min(len(words) - 1, index + CASCADE_CONTEXT_WORDS)
+        while words[last]["end"] - words[first]["start"] < CASCADE_MIN_REGION_SECONDS and (
+            first > 0 or last < len(words) - 1
+        ):
+            first, last = max(0, first - 1), min(len(words) - 1, last + 1)
+        if ranges and first <= ranges[-1][1] + 1:
+            ranges[-1][1] = max(ranges[-1][1], last)
+        else:
+            ranges.append([first, last])
+
+    return [
+        {
+            "start": max(span_start, words[first]["start"]),
+            "end": min(span_end, words[last]["end"]),
+            "words": last - first + 1,
+        }
+        for first, last in ranges
+    ]
+
+
+class CascadeRefiner:
+    """
+    Re-decodes the low-confidence regions of draft transcripts with a larger model.
+
+    The large model loads in a background thread as soon as the refiner is created; the
+    caller only waits for it when the first low-confidence region comes up.
+    """
+
+    def __init__(self, options: TranscribeOptions, threshold: float = CASCADE_MIN_PROBABILITY) -> None:
+        self.options = options
+        self.threshold = threshold
+        self.regions = 0
+        self.escalated_seconds = 0.0
+        self.escalated_words = 0
+        self.draft_words = 0
+        print(f"📦 post -transcribe: loading escalation model {options.label} in the background...")
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cascade-load")
+        self._model = self._loader.submit(load_transcriber, options)
+
+    def refine(self, segments: List[dict], span: Tuple[int, int], audio) -> List[dict]:
+        """The span's segments with every low-confidence region re-decoded and spliced in."""
+        self.draft_words += sum(len(segment["words"]) for segment in segments)
+        regions = low_confidence_regions(segments, span, self.threshold)
+        if not regions:
+            return segments
+        self.regions += len(regions)
+        self.escalated_seconds += sum(region["end"] - region["start"] for region in regions)
+        self.escalated_words += sum(region["words"] for region in regions)
+        fresh = transcribe_regions(self._model.result(), regions, audio, self.options)
+        return splice_regions(segments, regions, fresh)
+
+    def report(self, speech_seconds: float) -> None:
+        share = self.escalated_seconds / speech_seconds if speech_seconds > 0 else 0.0
+        print(
+            f"🪜 post -transcribe: cascade escalated {self.escalated_seconds:.1f}s of {speech_seconds:.1f}s of speech "
+            f"({share:.1%}) in {self.regions} region(s) to {self.options.model}; "
+            f"{self.escalated_words} of {self.draft_words} draft word(s) re-decoded."
+        )
+
+    def close(self) -> None:
+        self._loader.shutdown(wait=False)
+
+
+def _format_timestamp(seconds: float) -> str:
+    milliseconds_total = int(round(float(seconds) * 1000))
+    hours, remainder = divmod(milliseconds_total, 3600 * 1000)
+    minutes, remainder = divmod(remainder, 60 * 1000)
+    seconds_part, milliseconds = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds_part:02d},{milliseconds:03d}"
+
+
+class TranscriptStream:
+    """
+    Writes finished segments as soon as they are final, in timeline order.
+
+    Every segment becomes one line of the NDJSON stream and one SRT block; both files
+    are flushed per segment so downstream tools can follow along. The stream ends with
+    a `{"done": ...}` line. The word JSON is written once, at the end.
+    """
+
+    def __init__(self, stream_path: Path, srt_path: Path, started: float) -> None:
+        self._stream = open(stream_path, "w", encoding="utf-8")
+        self._srt = open(srt_path, "w", encoding="utf-8")
+        self.started = started
+        self.first_word_seconds: Optional[float] = None
+        self.srt_blocks = 0
+        self.words: List[dict] = []
+
+    def write(self, segments: Sequence[dict]) -> None:
+        for segment in segments:
+            self._stream.write(json.dumps(segment, ensure_ascii=False) + "\n")
+            self.words.extend(segment["words"])
+            if self.words and self.first_word_seconds is None:
+                self.first_word_seconds = time.time() - self.started
+
+            start, end = segment["start"], segment["end"]
+            cleaned_text = segment["text"].strip()
+            if start is None or end is None or not cleaned_text:
+                continue
+            self.srt_blocks += 1
+            separator = "\n" if self.srt_blocks > 1 else ""
+            self._srt.write(
+                f"{separator}{self.srt_blocks}\n{_format_timestamp(start)} --> {_format_timestamp(end)}\n{cleaned_text}\n"
+            )
+        self._stream.flush()
+        self._srt.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._stream.closed
+
+    def close(self, complete: bool) -> None:
+        self._stream.write(json.dumps({"done": complete, "words": len(self.words)}) + "\n")
+        self._stream.close()
+        self._srt.close()
+
+
+def _probe_duration(path: Path) -> Optional[float]:
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
 
 def run(args):
     """
@@ -22,9 +862,27 @@ def run(args):
         - Aborts when no video is found or when multiple video candidates are present (unless video file is specified)
         - Prompts before overwriting an existing JSON/SRT file unless `--yes` is supplied
     
+    Performance:
+        - The audio is split at pauses of at least 0.7s; silent stretches are never sent to the model.
+        - Speech is packed into chunks of 30-120s that decode in parallel worker processes
+          (--workers), each with an equal share of the CPU threads.
+        - Word timestamps are mapped back onto the original timeline sample-exactly.
+        - Results are cached per speech span under a fingerprint of its audio, so a rerun
+          after a cut only transcribes new or changed spans (--no-cache to disable).
+    
     Output:
-        - Produces `<video_basename>.json`, containing word-level timestamps
+        - Produces `<video_basename>.json`, containing word-level timestamps, and its columnar
+          `<video_basename>.words.bin` sidecar for memory-mapped loading
         - Produces `<video_basename>.srt`, containing segment-level subtitles with timecodes
+        - Produces `<video_basename>.transcript.ndjson`, one segment per line, written as
+          segments are decoded and terminated by a {"done": true, "words": N} line
+        - The SRT and NDJSON grow while decoding runs; model loading overlaps audio extraction
+        - With --cascade: a fast --draft-model transcribes everything and only the words it is
+          unsure of (plus a little context) are re-decoded by --model and spliced in; the
+          share of escalated audio is reported
+        - With --script: the known text is force-aligned (no open decoding), regions where it
+          does not match the audio are listed in `<video_basename>.mismatches.json`, and
+          --retranscribe-mismatches transcribes just those regions and splices them in
         - JSON format: [{"word": "text", "start": 0.0, "end": 0.5}, ...]
     """
     parser = build_cli_parser(
@@ -40,9 +898,71 @@ def run(args):
         "--model",
         "-m",
         default="medium",
-        choices=["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"],
+        choices=WHISPER_MODELS,
         help="Whisper model size to use for transcription.",
     )
+    parser.add_argument(
+        "--backend",
+        "-b",
+        default="openai-whisper",
+        choices=BACKENDS,
+        help="Inference engine: PyTorch Whisper, or CTranslate2 via faster-whisper.",
+    )
+    parser.add_argument(
+        "--compute-type",
+        default="int8",
+        choices=COMPUTE_TYPES,
+        help="CTranslate2 compute type (faster-whisper only).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Decode this many segments of a chunk together with faster-whisper's batched pipeline (1 = sequential).",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=0,
+        help="Parallel decoding processes; cores are split evenly between them (0 = one per four cores, 1 on a GPU).",
+    )
+    parser.add_argument(
+        "--script",
+        help="Known script (plain text). Force-align it to the audio instead of transcribing.",
+    )
+    parser.add_argument(
+        "--language",
+        default="en",
+        help="Language of the --script text.",
+    )
+    parser.add_argument(
+        "--retranscribe-mismatches",
+        action="store_true",
+        help="With --script, transcribe the regions where the script does not match the audio and splice them in.",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Transcribe with --draft-model and re-decode only its low-confidence words with --model.",
+    )
+    parser.add_argument(
+        "--draft-model",
+        default="small",
+        choices=WHISPER_MODELS,
+        help="Fast model for the first pass of --cascade.",
+    )
+    parser.add_argument(
+        "--cascade-threshold",
+        type=float,
+        default=CASCADE_MIN_PROBABILITY,
+        help="Draft words below this probability are escalated to --model.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Transcribe every span again instead of reusing (and updating) the transcript cache.",
+    )
     parsed = parser.parse_args(args)
 
     env = StageEnvironment.create(
@@ -51,6 +971,29 @@ def run(args):
         auto_confirm=parsed.yes,
     )
 
+    if parsed.batch_size < 1:
+        env.abort("--batch-size must be at least 1.")
+    if parsed.backend == "openai-whisper" and parsed.batch_size > 1:
+        print("⚠️  post -transcribe: --batch-size only applies to --backend faster-whisper; ignoring.")
+        parsed.batch_size = 1
+    options = TranscribeOptions(
+        model=parsed.model,
+        backend=parsed.backend,
+        compute_type=parsed.compute_type,
+        batch_size=parsed.batch_size,
+    )
+    escalation_options: Optional[TranscribeOptions] = None
+    if parsed.cascade:
+        if parsed.script:
+            env.abort("--cascade cannot be combined with --script.")
+        if parsed.draft_model == parsed.model:
+            env.abort(f"--draft-model must be smaller than --model (both are '{parsed.model}').")
+        if not 0.0 < parsed.cascade_threshold <= 1.0:
+            env.abort("--cascade-threshold must be between 0 and 1.")
+        # The draft pass goes through the usual chunked pipeline and cache; --model only sees escalations.
+        escalation_options = options
+        options = replace(options, model=parsed.draft_model)
+
     def _ensure_tool(tool: str) -> None:
         if shutil.which(tool) is None:
             env.abort(f"Required dependency '{tool}' was not found on PATH. Install FFmpeg and try again.")
@@ -89,121 +1032,226 @@ def run(args):
         
         video_file = video_files[0]
     
+    script_text = None
+    if parsed.script:
+        script_path = Path(parsed.script).expanduser()
+        if not script_path.is_file():
+            env.abort(f"Script file not found: '{script_path}'")
+        script_text = script_path.read_text(encoding="utf-8").strip()
+        if not script_text:
+            env.abort(f"Script file '{script_path.name}' is empty.")
+    elif parsed.retranscribe_mismatches:
+        env.abort("--retranscribe-mismatches requires --script.")
+
     json_file = video_file.with_suffix(".json")
     srt_file = video_file.with_suffix(".srt")
+    stream_file = video_file.with_suffix(".transcript.ndjson")
 
     env.ensure_output_path(json_file)
     env.ensure_output_path(srt_file)
+    env.ensure_output_path(stream_file)
+    mismatch_file = video_file.with_suffix(".mismatches.json")
+    if script_text is not None:
+        env.ensure_output_path(mismatch_file)
     env.announce_checks_passed(
         f"All safety checks passed. Ready to transcribe '{video_file.name}' into "
-        f"'{json_file.name}' and '{srt_file.name}' using model '{parsed.model}'."
+        f"'{json_file.name}' and '{srt_file.name}' using model {options.label}."
+        + (f" Low-confidence words go to {escalation_options.model}." if escalation_options else "")
     )
 
     # Generate word-level timestamps using stable-ts
-    print(f"🎙️  post -transcribe: transcribing audio with stable-ts (model: {parsed.model})...")
-    try:
-        import stable_whisper
-    except ImportError:
-        env.abort(
-            "stable-ts is not installed. Install it with: pip install stable-ts\n"
-            "Note: This will also install torch and faster-whisper as dependencies."
-        )
+    print(f"🎙️  post -transcribe: transcribing audio with stable-ts (model: {options.label})...")
+    # Forced alignment always runs in-process with the PyTorch model.
+    daemon = daemon_status() if script_text is None else None
+    # Cascade escalations also run in-process.
+    if daemon is None or escalation_options is not None:
+        try:
+            import stable_whisper  # noqa: F401
+        except ImportError:
+            env.abort(
+                "stable-ts is not installed. Install it with: pip install stable-ts\n"
+                "Note: This will also install torch and faster-whisper as dependencies."
+            )
+        if options.backend == "faster-whisper":
+            try:
+                import faster_whisper  # noqa: F401
+            except ImportError:
+                env.abort("faster-whisper is not installed. Install it with: pip install faster-whisper")
+    else:
+        print(f"🛰️  post -transcribe: using resident models from 'post -serve-models' (queue depth {daemon['queue_depth']}).")
 
-    try:
-        # Load the model
-        print(f"📦 post -transcribe: loading Whisper model '{parsed.model}'...")
-        model = stable_whisper.load_model(parsed.model)
+    # Start loading the model(s) right away so it overlaps with audio extraction, unless
+    # the transcript cache may cover the whole run
+    run_start = time.time()
+    workers = parsed.workers or _default_workers()
+    duration = _probe_duration(video_file) if shutil.which("ffprobe") else None
+    if duration is not None:
+        workers = min(workers, max(1, math.ceil(duration / CHUNK_MIN_SECONDS)))
+    cache = None if parsed.no_cache or script_text is not None else TranscriptCache(options.cache_key)
+    transcriber: Optional[ChunkTranscriber] = None
+    aligner_loader: Optional[ThreadPoolExecutor] = None
+    refiner: Optional[CascadeRefiner] = None
+    if script_text is not None:
+        print(f"📦 post -transcribe: loading Whisper model '{options.model}' for forced alignment in the background...")
+        aligner_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcribe-load")
+        aligner_model = aligner_loader.submit(load_whisper, options.model)
+    elif daemon is None and (cache is None or cache.is_empty()):
+        transcriber = ChunkTranscriber(options, workers)
+    if escalation_options is not None:
+        refiner = CascadeRefiner(escalation_options, parsed.cascade_threshold)
 
+    stream: Optional[TranscriptStream] = None
+    try:
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_audio = Path(temp_dir) / "transcribe-audio.wav"
-            print(f"🎧 post -transcribe: extracting clean audio for transcription...")
-            cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-nostdin",
-                "-y",
-                "-fflags",
-                "+genpts",
-                "-i",
-                str(video_file),
-                "-vn",
-                "-map",
-                "0:a:0",
-                "-acodec",
-                "pcm_s16le",
-                "-ar",
-                "16000",
-                "-ac",
-                "1",
-                "-avoid_negative_ts",
-                "make_zero",
-                str(temp_audio),
-            ]
-            ffmpeg_result = subprocess.run(cmd, capture_output=True)
-            if ffmpeg_result.returncode != 0:
-                stderr = ffmpeg_result.stderr.decode().strip()
-                env.abort(
-                    "FFmpeg failed to extract audio for transcription"
-                    + (f": {stderr}" if stderr else ".")
+            # 16 kHz mono view of the shared decoded-PCM cache (decoded once per source)
+            print(f"🎧 post -transcribe: reading {SAMPLE_RATE}Hz mono audio for transcription...")
+            try:
+                audio, _ = load_audio(video_file, SAMPLE_RATE, 1)
+            except RuntimeError as e:
+                env.abort(str(e))
+
+            # Split at long pauses so silence never reaches the model and chunks decode in parallel
+            total_seconds = len(audio) / SAMPLE_RATE
+            spans = find_speech_spans(audio)
+            speech_seconds = sum(end - start for start, end in spans) / SAMPLE_RATE
+
+            transcribe_start = time.time()
+            if script_text is not None:
+                print(f"📐 post -transcribe: aligning '{Path(parsed.script).name}' to the audio...")
+                segments, mismatches = align_to_script(aligner_model.result(), audio, spans, script_text, parsed.language)
+                mismatch_seconds = sum(region["end"] - region["start"] for region in mismatches)
+                if mismatches:
+                    print(
+                        f"⚠️  post -transcribe: {len(mismatches)} region(s) ({mismatch_seconds:.1f}s) do not match the script:"
+                    )
+                    for region in mismatches:
+                        print(
+                            f"   • {_format_timestamp(region['start'])} → {_format_timestamp(region['end'])}: "
+                            f"{region['reason']}"
+                        )
+                if mismatches and parsed.retranscribe_mismatches:
+                    segments = retranscribe_regions(segments, mismatches, audio, options)
+                    print(f"🔁 post -transcribe: re-transcribed {len(mismatches)} region(s) ({mismatch_seconds:.1f}s).")
+                with open(mismatch_file, 'w', encoding='utf-8') as f:
+                    json.dump(mismatches, f, indent=2, ensure_ascii=False)
+                print(f"📝 post -transcribe: wrote alignment report to '{mismatch_file.name}'.")
+                stream = TranscriptStream(stream_file, srt_file, run_start)
+                stream.write(segments)
+                stream.close(complete=True)
+            else:
+                # Reuse words for spans whose audio was transcribed before (e.g. after a re-tighten)
+                span_segments: List[Optional[List[dict]]] = [None] * len(spans)
+                if cache is not None:
+                    for index, (start, end) in enumerate(spans):
+                        hit = cache.lookup(audio[start:end])
+                        if hit is not None:
+                            cached_segments, shift = hit
+                            span_segments[index] = shift_segments(cached_segments, start / SAMPLE_RATE + shift)
+                missing_index = [index for index, cached in enumerate(span_segments) if cached is None]
+                missing = [spans[index] for index in missing_index]
+                missing_seconds = sum(end - start for start, end in missing) / SAMPLE_RATE
+                if cache is not None and len(missing) < len(spans):
+                    print(
+                        f"♻️  post -transcribe: reused {len(spans) - len(missing)} of {len(spans)} speech span(s) "
+                        f"from the transcript cache ({speech_seconds - missing_seconds:.1f}s)."
+                    )
+
+                chunk_seconds = min(CHUNK_MAX_SECONDS, max(CHUNK_MIN_SECONDS, missing_seconds / (2 * workers)))
+                chunks = plan_chunks(audio, missing, chunk_seconds)
+                print(
+                    f"✂️  post -transcribe: {len(chunks)} chunk(s) covering {missing_seconds:.1f}s of speech; "
+                    f"skipping {total_seconds - speech_seconds:.1f}s of silence."
                 )
 
-            # Transcribe with word-level timestamps
-            print(f"🔊 post -transcribe: processing audio from '{temp_audio.name}'...")
-            result = model.transcribe(str(temp_audio), word_timestamps=True)
+                # A long span may be split over several chunks; it is final once all its pieces are decoded.
+                missing_starts = [start for start, _ in missing]
+
+                def _owner(piece: Tuple[int, int]) -> int:
+                    return bisect.bisect_right(missing_starts, piece[0]) - 1
+
+                pieces_left = Counter(_owner(piece) for chunk in chunks for piece in chunk.spans)
+                pending: List[List[dict]] = [[] for _ in missing]
+
+                def _chunk_results() -> Iterator[List[dict]]:
+                    nonlocal transcriber
+                    done = 0
+                    if daemon is not None:
+                        try:
+                            for result in _transcribe_chunks_with_daemon(chunks, audio, options, Path(temp_dir)):
+                                done += 1
+                                yield result
+                            return
+                        except ModelDaemonError as e:
+                            print(f"⚠️  post -transcribe: model daemon failed ({e}); transcribing in-process instead.")
+                    if transcriber is None:
+                        # Not started up front (daemon run, or the cache might have covered everything)
+                        transcriber = ChunkTranscriber(options, workers)
+                    yield from transcriber.transcribe([chunk.render(audio) for chunk in chunks[done:]])
+
+                # Transcribe with word-level timestamps, streaming each span out once it is final
+                print(f"📡 post -transcribe: streaming segments to '{stream_file.name}' and '{srt_file.name}'...")
+                stream = TranscriptStream(stream_file, srt_file, run_start)
+                next_span = 0
+
+                def _flush_ready_spans() -> None:
+                    nonlocal next_span
+                    while next_span < len(spans) and span_segments[next_span] is not None:
+                        if refiner is not None:
+                            span_segments[next_span] = refiner.refine(span_segments[next_span], spans[next_span], audio)
+                        stream.write(span_segments[next_span])
+                        next_span += 1
+
+                _flush_ready_spans()
+                if chunks:
+                    for chunk, chunk_result in zip(chunks, _chunk_results()):
+                        stitched = stitch_chunk_segments([chunk], [chunk_result])
+                        for position, per_span in enumerate(assign_segments_to_spans(stitched, missing)):
+                            pending[position].extend(per_span)
+                        for piece in chunk.spans:
+                            position = _owner(piece)
+                            pieces_left[position] -= 1
+                            if pieces_left[position] == 0:
+                                index = missing_index[position]
+                                span_segments[index] = pending[position]
+                                if cache is not None:
+                                    start, end = spans[index]
+                                    cache.store(audio[start:end], shift_segments(pending[position], -start / SAMPLE_RATE))
+                        _flush_ready_spans()
+                stream.close(complete=True)
+                if refiner is not None:
+                    refiner.report(speech_seconds)
+
+            elapsed = time.time() - transcribe_start
+            if total_seconds > 0:
+                print(
+                    f"⏱️  post -transcribe: transcribed {total_seconds:.1f}s of audio in {elapsed:.1f}s "
+                    f"(RTF {elapsed / total_seconds:.3f}, {options.backend})."
+                )
 
         # Extract words with timestamps
         print(f"💾 post -transcribe: extracting word-level timestamps to '{json_file.name}'...")
-        words = []
-        for segment in result.segments:
-            for word in getattr(segment, "words", []):
-                text = (word.word or "").strip()
-                start = getattr(word, "start", None)
-                end = getattr(word, "end", None)
-                if not text or start is None or end is None:
-                    continue
-                words.append({
-                    'word': text,
-                    'start': float(start),
-                    'end': float(end)
-                })
+        # Word probabilities only steer the cascade; the JSON keeps its documented shape.
+        words = [{'word': word["word"], 'start': word["start"], 'end': word["end"]} for word in stream.words]
         
         # Write to JSON
         with open(json_file, 'w', encoding='utf-8') as f:
             json.dump(words, f, indent=2, ensure_ascii=False)
+        write_word_sidecar(json_file, words)
 
         print(f"✅ post -transcribe: successfully generated '{json_file.name}' with {len(words)} words!")
-
-        # Build SRT content from segments
-        def _format_timestamp(seconds: float) -> str:
-            milliseconds_total = int(round(float(seconds) * 1000))
-            hours, remainder = divmod(milliseconds_total, 3600 * 1000)
-            minutes, remainder = divmod(remainder, 60 * 1000)
-            seconds_part, milliseconds = divmod(remainder, 1000)
-            return f"{hours:02d}:{minutes:02d}:{seconds_part:02d},{milliseconds:03d}"
-
-        srt_lines = []
-        segment_counter = 0
-        for segment in result.segments:
-            start = getattr(segment, "start", None)
-            end = getattr(segment, "end", None)
-            text = getattr(segment, "text", "")
-            if start is None or end is None:
-                continue
-            cleaned_text = text.strip()
-            if not cleaned_text:
-                continue
-            segment_counter += 1
-            srt_lines.append(str(segment_counter))
-            srt_lines.append(f"{_format_timestamp(start)} --> {_format_timestamp(end)}")
-            srt_lines.append(cleaned_text)
-            srt_lines.append("")
-
-        srt_content = "\n".join(srt_lines).strip() + "\n" if srt_lines else ""
-        srt_file.write_text(srt_content, encoding='utf-8')
-        print(f"✅ post -transcribe: wrote subtitles to '{srt_file.name}' with {segment_counter} segments.")
+        print(f"✅ post -transcribe: wrote subtitles to '{srt_file.name}' with {stream.srt_blocks} segments.")
+        first_word = "no words" if stream.first_word_seconds is None else f"first words after {stream.first_word_seconds:.1f}s"
+        print(f"⏱️  post -transcribe: {first_word}, {time.time() - run_start:.1f}s wall in total.")
 
     except Exception as e:
+        if stream is not None and not stream.closed:
+            stream.close(complete=False)
         env.abort(f"Failed to generate timestamps: {e}")
+    finally:
+        if transcriber is not None:
+            transcriber.close()
+        if aligner_loader is not None:
+            aligner_loader.shutdown(wait=False)
+        if refiner is not None:
+            refiner.close()
 
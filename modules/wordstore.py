@@ -0,0 +1,169 @@
+"""
+Columnar word-timestamp store, written next to each transcript JSON.
+
+`<stem>.words.bin` holds the same words as `<stem>.json` laid out for fast loading:
+
+    header   8-byte magic, uint64 word count, uint64 text size (little-endian)
+    starts   float64[count]
+    ends     float64[count]
+    offsets  uint64[count + 1]   byte offsets of each word in the text blob
+    text     UTF-8 words, back to back
+
+`WordStore` memory-maps the file, so opening a multi-hour transcript costs a few
+page faults instead of a JSON parse, and answers time lookups by binary search over
+the (sorted) start times. The JSON stays the editable source of truth: a sidecar
+older than its JSON is rebuilt on open.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+_MAGIC = b"POSTWRD1"
+_HEADER = struct.Struct("<8sQQ")
+SIDECAR_SUFFIX = ".words.bin"
+
+
+def sidecar_path(json_path: Path) -> Path:
+    """`<stem>.words.bin` next to `<stem>.json`."""
+    return json_path.with_suffix(SIDECAR_SUFFIX)
+
+
+def write_word_store(path: Path, words: Iterable[dict]) -> Path:
+    """Write `words` ({"word", "start", "end"} dicts, in time order) as a columnar sidecar."""
+    import numpy as np
+
+    words = list(words)
+    encoded = [word["word"].encode("utf-8") for word in words]
+    offsets = np.zeros(len(words) + 1, dtype="<u8")
+    np.cumsum([len(text) for text in encoded], out=offsets[1:])
+    starts = np.array([word["start"] for word in words], dtype="<f8")
+    ends = np.array([word["end"] for word in words], dtype="<f8")
+
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    with open(partial, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(words), int(offsets[-1])))
+        f.write(starts.tobytes())
+        f.write(ends.tobytes())
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+    partial.replace(path)
+    return path
+
+
+def write_word_sidecar(json_path: Path, words: Iterable[dict]) -> Path:
+    """Write the sidecar of a transcript JSON that was just written with `words` (empty words are dropped)."""
+    return write_word_store(sidecar_path(json_path), (word for word in words if word.get("word", "").strip()))
+
+
+class WordStore(Sequence):
+    """
+    Read-only, memory-mapped view of a `.words.bin` file.
+
+    Behaves like the list of word dicts that `json.load` would return (indexing,
+    `len`, iteration), and adds `index_at` / `index_range` lookups in O(log n).
+    """
+
+    def __init__(self, path: Path) -> None:
+        import numpy as np
+
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size < _HEADER.size:
+            raise ValueError(f"'{path.name}' is not a word store")
+        magic, count, text_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"'{path.name}' is not a word store")
+
+        offset = _HEADER.size
+        self.starts = np.frombuffer(self._mmap, dtype="<f8", count=count, offset=offset)
+        offset += 8 * count
+        self.ends = np.frombuffer(self._mmap, dtype="<f8", count=count, offset=offset)
+        offset += 8 * count
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count + 1, offset=offset)
+        self._text_start = offset + 8 * (count + 1)
+        if self._text_start + text_size > size:
+            raise ValueError(f"'{path.name}' is truncated")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        begin = self._text_start + int(self._offsets[index])
+        end = self._text_start + int(self._offsets[index + 1])
+        return bytes(self._mmap[begin:end]).decode("utf-8")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return {"word": self.text(index), "start": float(self.starts[index]), "end": float(self.ends[index])}
+
+    def index_at(self, seconds: float) -> Optional[int]:
+        """Index of the word being spoken at `seconds`, or None between words."""
+        import numpy as np
+
+        index = int(np.searchsorted(self.starts, seconds, side="right")) - 1
+        if index >= 0 and seconds <= self.ends[index]:
+            return index
+        return None
+
+    def index_range(self, start: float, end: float) -> Tuple[int, int]:
+        """`(first, stop)` indices of the words overlapping [start, end], edges included."""
+        import numpy as np
+
+        stop = int(np.searchsorted(self.starts, end, side="right"))
+        first = int(np.searchsorted(self.starts, start, side="left"))
+        # Words that started before `start` may still be running.
+        while first > 0 and self.ends[first - 1] >= start:
+            first -= 1
+        return first, max(first, stop)
+
+    def words_between(self, start: float, end: float) -> List[dict]:
+        first, stop = self.index_range(start, end)
+        return self[first:stop]
+
+
+def open_word_store(json_path: Path) -> WordStore:
+    """
+    Open the word store of a transcript JSON, (re)building the sidecar when it is
+    missing or older than the JSON. Empty words are dropped, as in the JSON loaders.
+    Raises ValueError when the JSON is not a list of timed words.
+    """
+    store_path = sidecar_path(json_path)
+    try:
+        if store_path.stat().st_mtime_ns >= json_path.stat().st_mtime_ns:
+            return WordStore(store_path)
+    except (OSError, ValueError):
+        pass
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list) or not all(isinstance(word, dict) for word in data):
+        raise ValueError(f"Word timestamps JSON '{json_path.name}' is not a list of words.")
+    words = [word for word in data if word.get("word", "").strip()]
+    for word in words:
+        if not isinstance(word.get("start"), (int, float)) or not isinstance(word.get("end"), (int, float)):
+            raise ValueError(f"Word timestamps JSON '{json_path.name}' has a word without numeric start/end.")
+    try:
+        write_word_store(store_path, words)
+        return WordStore(store_path)
+    except OSError:
+        # Read-only directory: work from a private copy instead.
+        import tempfile
+
+        fd, temp_name = tempfile.mkstemp(suffix=SIDECAR_SUFFIX)
+        os.close(fd)
+        write_word_store(Path(temp_name), words)
+        store = WordStore(Path(temp_name))
+        os.unlink(temp_name)
+        return store
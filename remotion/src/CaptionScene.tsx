@@ -13,11 +13,13 @@ export const CaptionScene: React.FC<CaptionSceneProps> = ({ inputProps }) => {
   const frame = useCurrentFrame();
   const { fps, width, height } = useVideoConfig();
 
-  const { groups, videoHeight } = inputProps;
+  const { groups, videoHeight, bandTop = 0 } = inputProps;
 
   // Calculate margin (15% from bottom, matching the Python code)
   const marginV = Math.floor(videoHeight * 0.27);
   const baselineY = videoHeight - marginV;
+  // In caption-band renders the frame starts at bandTop (see caption_band in caption_render.py)
+  const bandBaselineY = baselineY - bandTop;
 
   // Process groups to calculate timing
   const processedGroups = groups.map((wordGroup) => {
@@ -59,7 +61,7 @@ export const CaptionScene: React.FC<CaptionSceneProps> = ({ inputProps }) => {
         }
 
         // No drop animation - captions stay at baseline position
-        const currentY = baselineY;
+        const currentY = bandBaselineY;
 
         // Calculate word positions (0 = leftmost, 1 = rightmost)
         // We'll use a simple approach: divide the line into equal segments
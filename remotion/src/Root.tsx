@@ -2,6 +2,7 @@ import { Composition } from "remotion";
 import { CaptionScene } from "./CaptionScene";
 import { CaptionScenePreview } from "./CaptionScenePreview";
 import { CaptionComposition } from "./CaptionComposition";
+import { SparseCaptionComposition } from "./SparseCaptionComposition";
 import { PREVIEW_DATA } from "./PreviewData";
 import { CompanyScene } from "./token/CompanyScene";
 import { LogoScene } from "./token/LogoScene";
@@ -41,13 +42,55 @@ export const RemotionRoot: React.FC = () => {
               fps: number;
               videoWidth: number;
               videoHeight: number;
+              bandHeight?: number;
             };
           };
           return {
             durationInFrames: data.inputProps.durationInFrames,
             fps: data.inputProps.fps,
             width: data.inputProps.videoWidth,
-            height: data.inputProps.videoHeight,
+            height: data.inputProps.bandHeight ?? data.inputProps.videoHeight,
+          };
+        }}
+      />
+
+      {/* Sparse production composition - only the frames where a caption is visible */}
+      <Composition
+        id="SparseCaptionComposition"
+        component={SparseCaptionComposition}
+        durationInFrames={300}
+        fps={30}
+        width={1920}
+        height={1080}
+        defaultProps={{
+          inputProps: {
+            groups: [],
+            videoWidth: 1920,
+            videoHeight: 1080,
+            fps: 30,
+            durationInFrames: 300,
+            ranges: [],
+          },
+        }}
+        calculateMetadata={({ props }) => {
+          const data = props as {
+            inputProps: {
+              fps: number;
+              videoWidth: number;
+              videoHeight: number;
+              bandHeight?: number;
+              ranges: [number, number][];
+            };
+          };
+          const activeFrames = data.inputProps.ranges.reduce(
+            (total, [start, end]) => total + (end - start),
+            0
+          );
+          return {
+            durationInFrames: Math.max(1, activeFrames),
+            fps: data.inputProps.fps,
+            width: data.inputProps.videoWidth,
+            height: data.inputProps.bandHeight ?? data.inputProps.videoHeight,
           };
         }}
       />
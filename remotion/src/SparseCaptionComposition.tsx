@@ -0,0 +1,61 @@
+import React, { useMemo } from "react";
+import { AbsoluteFill, Freeze, useCurrentFrame } from "remotion";
+import { CaptionScene } from "./CaptionScene";
+import { SparseCaptionData } from "./types";
+
+interface SparseCaptionCompositionProps {
+  inputProps: SparseCaptionData;
+}
+
+/**
+ * Renders only the listed frames of the caption timeline.
+ *
+ * `ranges` lists [start, end) frames of the full caption timeline; they are
+ * played back to back, so frame N of this composition shows the Nth listed
+ * frame. Python records the same ranges and puts the frames back on the full
+ * timeline: gaps are filled with a transparent clip and a one-frame range of
+ * a static stretch is held for the whole stretch, so the browser never
+ * rasterizes an empty or repeated frame.
+ */
+export const SparseCaptionComposition: React.FC<SparseCaptionCompositionProps> = ({
+  inputProps,
+}) => {
+  const frame = useCurrentFrame();
+
+  // offsets[i]: frame of this composition at which ranges[i] begins
+  const offsets = useMemo(() => {
+    const result: number[] = [];
+    let total = 0;
+    for (const [start, end] of inputProps.ranges) {
+      result.push(total);
+      total += end - start;
+    }
+    return result;
+  }, [inputProps.ranges]);
+
+  if (offsets.length === 0) {
+    return <AbsoluteFill />;
+  }
+
+  // Last range starting at or before this frame (binary search: there can be thousands)
+  let low = 0;
+  let high = offsets.length - 1;
+  while (low < high) {
+    const middle = Math.ceil((low + high) / 2);
+    if (offsets[middle] <= frame) {
+      low = middle;
+    } else {
+      high = middle - 1;
+    }
+  }
+  const timelineFrame = inputProps.ranges[low][0] + frame - offsets[low];
+
+  return (
+    <AbsoluteFill>
+      {/* CaptionScene sees its frame on the full timeline */}
+      <Freeze frame={timelineFrame}>
+        <CaptionScene inputProps={inputProps} />
+      </Freeze>
+    </AbsoluteFill>
+  );
+};
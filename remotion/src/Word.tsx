@@ -11,6 +11,7 @@ interface WordProps {
 }
 
 // Light effect constants - three-stage softbox style
+// (mirrored by frame_segments in modules/caption_render.py to find static frames)
 const LIGHT_WIDTH = 0.7; // How wide the light beam is (0-1, proportion of line width)
 const UNREACHED_OPACITY = 0.35; // Opacity for words not yet reached - subtle gray
 const ACTIVE_OPACITY = 1.0; // Full opacity when currently active
@@ -25,4 +25,11 @@ export interface CaptionData {
   videoHeight: number;
   fps: number;
   durationInFrames: number;
+  // Caption-band rendering: the frame is only the rows bandTop..bandTop+bandHeight of the video
+  bandTop?: number;
+  bandHeight?: number;
+}
+
+export interface SparseCaptionData extends CaptionData {
+  ranges: [number, number][]; // [start, end) frames of the full timeline to render, in order
 }
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "modules"))
+
+from grouping import plan_regroup  # noqa: E402
+
+
+def _words(*texts):
+    return [{"word": text, "start": index * 0.5, "end": index * 0.5 + 0.4} for index, text in enumerate(texts)]
+
+
+WORDS = _words("so", "um", "the", "cat", "sat", "down.", "then", "it", "left.")
+# The user dropped the filler "um" from the grouping by hand.
+GROUPS = [
+    {"indices": [0], "text": "so"},
+    {"indices": [2, 3], "text": "the cat"},
+    {"indices": [4, 5], "text": "sat down."},
+    {"indices": [6, 7, 8], "text": "then it left."},
+]
+
+
+def test_identical_transcript_keeps_hand_ungrouped_words():
+    plan = plan_regroup(WORDS, GROUPS, WORDS)
+    assert plan.unchanged
+    assert plan.regions == []
+    assert plan.carried == GROUPS
+
+
+def test_changed_word_regroups_only_its_neighbourhood():
+    new_words = [dict(word) for word in WORDS]
+    new_words[7]["word"] = "she"
+    plan = plan_regroup(WORDS, GROUPS, new_words)
+    assert not plan.unchanged
+    # "then she left." plus the group before it; "um" stays ungrouped.
+    assert plan.regions == [(4, 9)]
+    assert [group["indices"] for group in plan.carried] == [[0], [2, 3]]
+
+
+def test_new_word_next_to_ungrouped_word_does_not_absorb_it():
+    new_words = _words("so", "um", "well", "the", "cat", "sat", "down.", "then", "it", "left.")
+    plan = plan_regroup(WORDS, GROUPS, new_words)
+    assert 1 not in {index for first, stop in plan.regions for index in range(first, stop)}
+    assert all(1 not in group["indices"] for group in plan.carried)
@@ -0,0 +1,90 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "modules"))
+
+from remap import TimelineMap, remap_words  # noqa: E402
+from wordstore import open_word_store  # noqa: E402
+
+WORDS = [
+    {"word": "so", "start": 0.0, "end": 0.4},
+    {"word": "the", "start": 0.4, "end": 0.6},
+    {"word": "cat", "start": 0.6, "end": 1.0},
+    # 1 s gap
+    {"word": "sat", "start": 2.0, "end": 2.5},
+    {"word": "down.", "start": 2.5, "end": 3.0},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "take.json"
+    path.write_text(json.dumps(WORDS), encoding="utf-8")
+    return open_word_store(path)
+
+
+def test_store_reads_back_the_json_words(store):
+    assert len(store) == len(WORDS)
+    assert list(store) == WORDS
+    assert store[-1] == WORDS[-1]
+    assert store[1:3] == WORDS[1:3]
+
+
+def test_index_at_boundaries_and_gaps(store):
+    assert store.index_at(0.0) == 0
+    assert store.index_at(0.2) == 0
+    # A shared edge belongs to the word that starts there.
+    assert store.index_at(0.4) == 1
+    assert store.index_at(1.0) == 2
+    assert store.index_at(1.5) is None
+    assert store.index_at(3.0) == 4
+    assert store.index_at(3.1) is None
+    assert store.index_at(-0.1) is None
+
+
+def test_index_range_includes_words_touching_either_edge(store):
+    assert store.index_range(0.0, 3.0) == (0, 5)
+    assert store.index_range(0.5, 0.5) == (1, 2)
+    assert store.index_range(1.0, 2.0) == (2, 4)
+    assert store.index_range(1.2, 1.8) == (3, 3)
+    assert store.index_range(3.5, 4.0) == (5, 5)
+    assert store.words_between(0.45, 0.7) == WORDS[1:3]
+    assert store.words_between(1.2, 1.8) == []
+
+
+def test_empty_store(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text("[]", encoding="utf-8")
+    store = open_word_store(path)
+    assert len(store) == 0
+    assert list(store) == []
+    assert store.index_at(0.0) is None
+    assert store.index_range(0.0, 10.0) == (0, 0)
+    assert store.words_between(0.0, 10.0) == []
+
+
+def test_open_word_store_rejects_non_word_json(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"words": WORDS}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        open_word_store(path)
+
+
+def test_remap_words_keeps_words_whose_midpoint_survives(store):
+    # Keep "so the" and "sat down."; "cat" falls in the removed range.
+    timeline = TimelineMap(((0.0, 0.6), (1.9, 3.0)))
+    remapped, index_map = remap_words(store, timeline)
+    assert [word["word"] for word in remapped] == ["so", "the", "sat", "down."]
+    assert index_map == {0: 0, 1: 1, 3: 2, 4: 3}
+    assert remapped[2]["start"] == pytest.approx(0.7)
+    assert remapped[3]["end"] == pytest.approx(1.7)
+
+
+def test_remap_words_with_adjacent_segments_keeps_each_word_once(store):
+    timeline = TimelineMap(((0.0, 0.5), (0.5, 3.0)))
+    remapped, index_map = remap_words(store, timeline)
+    assert [word["word"] for word in remapped] == [word["word"] for word in WORDS]
+    assert index_map == {index: index for index in range(len(WORDS))}